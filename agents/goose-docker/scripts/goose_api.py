@@ -2,14 +2,43 @@
 
 import asyncio
 import json
+import queue
 import subprocess
 import threading
 import time
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from collections import deque
+from itertools import islice
 from urllib.parse import urlparse, parse_qs
 import os
 import signal
 import re
+import uuid
+
+# Output lines kept per session; clients further behind are told they missed some
+OUTPUT_BUFFER_LINES = int(os.getenv("GOOSE_OUTPUT_BUFFER_LINES", "1000"))
+# Warm Goose sessions kept ready for POST /sessions
+GOOSE_POOL_SIZE = int(os.getenv("GOOSE_POOL_SIZE", "1"))
+# Upper bounds on sessions (warm + in use) and their combined memory
+GOOSE_POOL_MAX_SESSIONS = int(os.getenv("GOOSE_POOL_MAX_SESSIONS", "4"))
+GOOSE_POOL_MAX_MEMORY_MB = int(os.getenv("GOOSE_POOL_MAX_MEMORY_MB", "4096"))
+# Start-up readiness: seconds before giving up, and what to look for in Goose's output
+GOOSE_START_DEADLINE = float(os.getenv("GOOSE_START_DEADLINE", "60"))
+GOOSE_READY_PATTERN = re.compile(
+    os.getenv("GOOSE_READY_PATTERN", r"Goose is running|Enter your instructions")
+)
+GOOSE_FAILURE_PATTERN = re.compile(
+    os.getenv(
+        "GOOSE_FAILURE_PATTERN",
+        r"(?i)failed to (start|add|load|initialize) extension|extension error|"
+        r"no api key|authentication error",
+    )
+)
+# The unstuck MCP extension counts as loaded once this tool shows up in "list tools"
+GOOSE_REQUIRED_TOOL = os.getenv("GOOSE_REQUIRED_TOOL", "request_visual_help")
+# Goose namespaces tools as <extension>__<tool>
+TOOL_NAME_PATTERN = re.compile(r"\b([a-z][a-z0-9_-]*__[a-z][a-z0-9_]*)\b")
+# The tool list is complete once output has been quiet this long (seconds)
+TOOL_LIST_SETTLE = 0.5
 
 
 def strip_ansi_codes(text):
@@ -18,13 +47,74 @@ def strip_ansi_codes(text):
     return ansi_escape.sub("", text)
 
 
+def process_group_rss(pgid):
+    """Resident memory in bytes of every process in a process group (Linux only)"""
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                # Fields after the ")" that closes the command name: state, ppid, pgrp
+                fields = f.read().rsplit(")", 1)[1].split()
+            if int(fields[2]) != pgid:
+                continue
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+
 class GooseSession:
     def __init__(self):
         self.process = None
         self.input_queue = []
-        self.output_buffer = []
+        # (sequence number, line) pairs, oldest dropped first
+        self.output_buffer = deque(maxlen=OUTPUT_BUFFER_LINES)
+        self.buffer_lock = threading.Lock()
+        self.last_seq = 0
         self.running = False
         self.last_output_time = time.time()
+        # Callbacks run on the reader thread as ("output", line) / ("status", text)
+        self.listeners = []
+        # Phases and timings of the last start, reported on /status
+        self.startup = {"phase": "not started"}
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def lines_since(self, since):
+        """
+        Buffered lines with a sequence number above `since`.
+
+        Returns (lines, fell_behind), where fell_behind means lines the client
+        hasn't seen were already dropped from the buffer.
+        """
+        with self.buffer_lock:
+            first_seq = self.output_buffer[0][0] if self.output_buffer else self.last_seq + 1
+            # Sequence numbers are contiguous, so skip straight to the first new line
+            skip = max(0, since - first_seq + 1)
+            lines = list(islice(self.output_buffer, skip, None))
+        return lines, since < first_seq - 1
+
+    def recent_lines(self, count):
+        """Text of the last `count` buffered lines"""
+        with self.buffer_lock:
+            start = max(0, len(self.output_buffer) - count)
+            return [line for _, line in islice(self.output_buffer, start, None)]
+
+    def _notify(self, kind, value):
+        for callback in list(self.listeners):
+            try:
+                callback(kind, value)
+            except Exception as e:
+                print(f"❌ Error notifying listener: {e}")
 
     def start_session(self):
         """Start a Goose session with Computer Controller enabled"""
@@ -94,6 +184,8 @@ class GooseSession:
             else:
                 print(f"❌ Warning: MCP config not found at {mcp_config_path}")
 
+            started = time.perf_counter()
+            self.startup = {"phase": "starting"}
             self.process = subprocess.Popen(
                 cmd,
                 stdin=subprocess.PIPE,
@@ -107,30 +199,34 @@ class GooseSession:
                 preexec_fn=os.setsid,  # Create new process group
             )
 
-            # Start output reader thread
-            threading.Thread(target=self._read_output, daemon=True).start()
+            # Watch the output for readiness instead of sleeping
+            startup_lines = queue.Queue()
 
-            # Wait a bit and check if process is still alive
-            time.sleep(3)
+            def on_startup_output(kind, value):
+                if kind == "output":
+                    startup_lines.put(value[1])
 
-            if self.process.poll() is not None:
-                # Process has already exited
-                return_code = self.process.returncode
-                error_output = "".join(self.output_buffer)
-                return f"ERROR: Goose process exited with code {return_code}. Output: {error_output}"
+            self.add_listener(on_startup_output)
+            try:
+                # Start output reader thread
+                threading.Thread(target=self._read_output, daemon=True).start()
+                error = self._wait_until_ready(startup_lines, started)
+            finally:
+                self.remove_listener(on_startup_output)
+
+            if error:
+                self.startup.update(phase="failed", error=error)
+                print(f"❌ Goose start failed: {error}")
+                self.stop_session()
+                return f"ERROR: {error}"
 
             self.running = True
             self.last_output_time = time.time()
-
-            # Give it more time to fully initialize
-            time.sleep(2)
-
-            # Send a test command to check available tools
-            self.process.stdin.write("list tools\n")
-            self.process.stdin.flush()
-            time.sleep(2)
-
-            return "Goose session started successfully with Unstuck MCP extension"
+            self._notify("status", self.get_status())
+            return (
+                "Goose session started successfully with Unstuck MCP extension "
+                f"in {self.startup['ready_ms'] / 1000:.1f}s"
+            )
 
         except FileNotFoundError:
             return (
@@ -139,6 +235,75 @@ class GooseSession:
         except Exception as e:
             return f"ERROR starting Goose: {str(e)}"
 
+    def _wait_until_ready(self, lines, started):
+        """
+        Follow Goose's start-up output: wait for the prompt, ask for the tool
+        list and wait for the unstuck tool to appear in it.
+
+        Returns None when ready, otherwise a description of what went wrong.
+        """
+        deadline = started + GOOSE_START_DEADLINE
+        tools = set()
+        required_seen = False
+        self.startup["phase"] = "waiting for prompt"
+
+        while True:
+            now = time.perf_counter()
+            if now > deadline:
+                recent = " | ".join(self.recent_lines(5))
+                if self.startup["phase"] == "waiting for prompt":
+                    return (
+                        f"Goose showed no prompt within {GOOSE_START_DEADLINE:.0f}s. "
+                        f"Recent output: {recent}"
+                    )
+                return (
+                    f"'{GOOSE_REQUIRED_TOOL}' was not in Goose's tools after "
+                    f"{GOOSE_START_DEADLINE:.0f}s, the unstuck MCP extension did not load. "
+                    f"Tools seen: {sorted(tools) or 'none'}"
+                )
+
+            try:
+                wait = TOOL_LIST_SETTLE if required_seen else 0.2
+                line = lines.get(timeout=min(wait, max(deadline - now, 0.01)))
+            except queue.Empty:
+                if self.process.poll() is not None:
+                    recent = " | ".join(self.recent_lines(10))
+                    return (
+                        f"Goose process exited with code {self.process.returncode} "
+                        f"while {self.startup['phase']}. Output: {recent}"
+                    )
+                if required_seen:
+                    # The tool list has stopped growing
+                    break
+                continue
+
+            if GOOSE_FAILURE_PATTERN.search(line):
+                return f"Goose reported a start-up failure: {line}"
+
+            if self.startup["phase"] == "waiting for prompt":
+                if GOOSE_READY_PATTERN.search(line):
+                    self.startup["prompt_ms"] = round((time.perf_counter() - started) * 1000)
+                    self.startup["phase"] = "waiting for tools"
+                    # Ask for the tool list to confirm the MCP extension is loaded
+                    self.process.stdin.write("list tools\n")
+                    self.process.stdin.flush()
+                continue
+
+            tools.update(TOOL_NAME_PATTERN.findall(line))
+            if GOOSE_REQUIRED_TOOL in line:
+                required_seen = True
+
+        self.startup.update(
+            phase="ready",
+            ready_ms=round((time.perf_counter() - started) * 1000),
+            tools=sorted(tools),
+        )
+        print(
+            f"✅ Goose ready in {self.startup['ready_ms']}ms "
+            f"(prompt after {self.startup['prompt_ms']}ms, {len(tools)} tools)"
+        )
+        return None
+
     def send_command(self, command):
         """Send a command to Goose (non-blocking)"""
         if not self.running or not self.process:
@@ -148,7 +313,7 @@ class GooseSession:
         if self.process.poll() is not None:
             self.running = False
             return_code = self.process.returncode
-            error_output = "".join(self.output_buffer[-10:])
+            error_output = "\n".join(self.recent_lines(10))
             return f"Goose session died (exit code: {return_code}). Recent output: {error_output}. Please restart session."
 
         try:
@@ -159,8 +324,7 @@ class GooseSession:
                 return f"Command sent: {command}"
             else:
                 # Just return recent output for polling
-                recent_lines = self.output_buffer[-20:] if self.output_buffer else []
-                return "\n".join(recent_lines)
+                return "\n".join(self.recent_lines(20))
 
         except BrokenPipeError:
             self.running = False
@@ -178,12 +342,12 @@ class GooseSession:
                     # Strip ANSI color codes for clean web display
                     clean_line = strip_ansi_codes(line)
                     print(f"📥 Goose output: {clean_line}")  # Debug logging
-                    self.output_buffer.append(clean_line)
+                    with self.buffer_lock:
+                        self.last_seq += 1
+                        seq = self.last_seq
+                        self.output_buffer.append((seq, clean_line))
                     self.last_output_time = time.time()
-
-                    # Keep only last 100 lines to prevent memory issues
-                    if len(self.output_buffer) > 100:
-                        self.output_buffer = self.output_buffer[-50:]
+                    self._notify("output", (seq, clean_line))
                 else:
                     time.sleep(0.1)
             except Exception as e:
@@ -191,6 +355,7 @@ class GooseSession:
                 break
 
         print("📊 Output reader thread ended")
+        self._notify("status", self.get_status())
 
     def get_status(self):
         """Get session status"""
@@ -202,13 +367,23 @@ class GooseSession:
             self.running = False
             return f"Stopped (exit code: {self.process.returncode if self.process else 'unknown'})"
 
+    def memory_bytes(self):
+        """Memory used by Goose and the extensions it started"""
+        if not self.process or self.process.poll() is not None:
+            return 0
+        # start_session puts Goose in its own process group
+        return process_group_rss(self.process.pid)
+
     def stop_session(self):
         """Stop the Goose session"""
         if self.process:
             try:
                 # Try graceful shutdown first
                 os.killpg(os.getpgid(self.process.pid), signal.SIGTERM)
-                time.sleep(2)
+                try:
+                    self.process.wait(timeout=2)
+                except subprocess.TimeoutExpired:
+                    pass
 
                 # Force kill if still alive
                 if self.process.poll() is None:
@@ -219,88 +394,467 @@ class GooseSession:
 
         self.running = False
         self.process = None
+        self._notify("status", self.get_status())
         return "Session stopped"
 
 
+class GooseSessionPool:
+    """
+    Keeps `size` Goose sessions started and idle, so handing one out is
+    instant. Sessions in use are tracked by id; consumed warm sessions are
+    replaced in the background within the session and memory caps.
+    """
+
+    def __init__(self, size, max_sessions, max_memory_bytes, extra_sessions=()):
+        self.size = size
+        self.max_sessions = max_sessions
+        self.max_memory_bytes = max_memory_bytes
+        # Sessions outside the pool (the legacy /start session) still count toward memory
+        self.extra_sessions = list(extra_sessions)
+        self.lock = threading.Lock()
+        self.idle = deque()
+        self.active = {}
+        self.starting = 0
+        self.stats = {"warm_hits": 0, "cold_starts": 0, "start_failures": 0}
+
+    def _total_sessions(self):
+        return len(self.idle) + len(self.active) + self.starting
+
+    def memory_bytes(self):
+        with self.lock:
+            sessions = list(self.idle) + list(self.active.values())
+        return sum(s.memory_bytes() for s in sessions + self.extra_sessions)
+
+    def _has_room(self):
+        """Whether one more session fits, estimating its size from the running ones"""
+        with self.lock:
+            if self._total_sessions() >= self.max_sessions:
+                return False
+            running = list(self.idle) + list(self.active.values())
+        used = sum(s.memory_bytes() for s in running + self.extra_sessions)
+        per_session = used / len(running) if running else 0
+        return used + per_session <= self.max_memory_bytes
+
+    def refill(self):
+        """Start warm sessions in the background until `size` are idle or starting"""
+        while True:
+            with self.lock:
+                if len(self.idle) + self.starting >= self.size:
+                    return
+            if not self._has_room():
+                print("⚠️ Session pool at its session or memory cap, not warming more")
+                return
+            with self.lock:
+                self.starting += 1
+            threading.Thread(target=self._start_warm, daemon=True).start()
+
+    def _start_warm(self):
+        session = GooseSession()
+        result = session.start_session()
+        with self.lock:
+            self.starting -= 1
+            if result.startswith("Goose session started"):
+                self.idle.append(session)
+                print(f"🔥 Warm Goose session ready ({len(self.idle)} idle)")
+                return
+            self.stats["start_failures"] += 1
+        # No retry here, the next acquire or release tries again
+        print(f"❌ Could not warm a Goose session: {result}")
+
+    def acquire(self):
+        """
+        Hand out a session, warm if one is ready.
+
+        Returns (session_id, session, warm) or raises RuntimeError.
+        """
+        session = None
+        with self.lock:
+            while self.idle:
+                candidate = self.idle.popleft()
+                if candidate.process and candidate.process.poll() is None:
+                    session = candidate
+                    break
+            warm = session is not None
+            if warm:
+                self.stats["warm_hits"] += 1
+
+        if not warm:
+            # Cold starts are held to the same session and memory caps as refills
+            if not self._has_room():
+                raise RuntimeError("Goose sessions are at their session or memory cap")
+            with self.lock:
+                if self._total_sessions() >= self.max_sessions:
+                    raise RuntimeError(f"All {self.max_sessions} Goose sessions are in use")
+                self.starting += 1
+            session = GooseSession()
+            result = session.start_session()
+            with self.lock:
+                self.starting -= 1
+                self.stats["cold_starts"] += 1
+            if not result.startswith("Goose session started"):
+                raise RuntimeError(result)
+
+        session_id = uuid.uuid4().hex
+        with self.lock:
+            self.active[session_id] = session
+        self.refill()
+        return session_id, session, warm
+
+    def get(self, session_id):
+        with self.lock:
+            return self.active.get(session_id)
+
+    def release(self, session_id):
+        """Stop a session and free its slot"""
+        with self.lock:
+            session = self.active.pop(session_id, None)
+        if session is None:
+            return False
+        session.stop_session()
+        self.refill()
+        return True
+
+    def status(self):
+        memory = self.memory_bytes()
+        with self.lock:
+            return {
+                "idle": len(self.idle),
+                "active": len(self.active),
+                "starting": self.starting,
+                "size": self.size,
+                "max_sessions": self.max_sessions,
+                "memory_mb": round(memory / (1024 * 1024), 1),
+                "max_memory_mb": round(self.max_memory_bytes / (1024 * 1024), 1),
+                **self.stats,
+            }
+
+
 # Global Goose session
 goose_session = GooseSession()
+# Pool behind the /sessions API
+session_pool = GooseSessionPool(
+    GOOSE_POOL_SIZE,
+    GOOSE_POOL_MAX_SESSIONS,
+    GOOSE_POOL_MAX_MEMORY_MB * 1024 * 1024,
+    extra_sessions=[goose_session],
+)
+
+
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    503: "Service Unavailable",
+}
+
 
+class GooseAPIServer:
+    """
+    Asyncio HTTP server for the chat page and JSON API.
+
+    Goose output is pushed to browsers over Server-Sent Events on /stream as
+    soon as the reader thread sees it, instead of being polled. The /start,
+    /command and /stream endpoints drive the single legacy session; /sessions
+    hands out sessions from the warm pool.
+    """
+
+    def __init__(self, session, pool=None):
+        self.session = session
+        self.pool = pool
+        self.loop = None
+
+    async def serve(self, host="0.0.0.0", port=8888):
+        self.loop = asyncio.get_running_loop()
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"🦆 Goose API server starting on port {port}...")
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one keep-alive connection"""
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, _ = lines[0].split(" ", 2)
+                except ValueError:
+                    await self.send_json(writer, {"error": "Bad request"}, 400)
+                    break
 
-class GooseAPIHandler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        """Handle GET requests"""
-        if self.path == "/":
-            self.serve_chat_interface()
-        elif self.path == "/status":
-            self.serve_json({"status": goose_session.get_status()})
-        elif self.path == "/poll":
-            # Get recent output for polling
-            recent_output = (
-                goose_session.output_buffer[-50:] if goose_session.output_buffer else []
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0) or 0)
+                body = await reader.readexactly(length) if length else b""
+
+                url = urlparse(target)
+                keep_alive = await self.route(
+                    method, url.path, parse_qs(url.query), headers, body, reader, writer
+                )
+                if not keep_alive or headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, path, query, headers, body, reader, writer):
+        """Dispatch a request, returns False if the connection should be closed"""
+        parts = path.strip("/").split("/")
+        if parts[0] == "sessions" and self.pool is not None:
+            return await self.route_sessions(
+                method, parts, query, headers, body, reader, writer
             )
-            self.serve_json(
-                {
-                    "output": recent_output,
-                    "running": goose_session.running,
-                    "buffer_size": len(goose_session.output_buffer),
+
+        if method == "GET":
+            if path == "/":
+                await self.send_response(
+                    writer, 200, "text/html; charset=utf-8", CHAT_INTERFACE_HTML.encode("utf-8")
+                )
+            elif path == "/status":
+                await self.send_json(
+                    writer,
+                    {"status": self.session.get_status(), "startup": self.session.startup},
+                )
+            elif path == "/stream":
+                await self.stream_session(self.session, query, headers, reader, writer)
+                return False
+            elif path == "/poll":
+                await self.send_json(writer, self.poll_output(self.session, query))
+            elif path == "/debug":
+                debug_info = {
+                    "running": self.session.running,
+                    "process_alive": self.session.process is not None
+                    and self.session.process.poll() is None,
+                    "recent_output": self.session.recent_lines(10),
+                    "buffered_lines": len(self.session.output_buffer),
+                    "last_seq": self.session.last_seq,
+                    "stream_clients": len(self.session.listeners),
+                    "env_vars": {
+                        "DISPLAY": os.environ.get("DISPLAY"),
+                        "ANTHROPIC_API_KEY": (
+                            "SET" if os.environ.get("ANTHROPIC_API_KEY") else "NOT SET"
+                        ),
+                        "HOME": os.environ.get("HOME"),
+                        "PWD": os.getcwd(),
+                    },
                 }
-            )
-        elif self.path == "/debug":
-            # Your existing debug endpoint
-            debug_info = {
-                "running": goose_session.running,
-                "process_alive": goose_session.process is not None
-                and goose_session.process.poll() is None,
-                "recent_output": (
-                    goose_session.output_buffer[-10:]
-                    if goose_session.output_buffer
-                    else []
-                ),
-                "env_vars": {
-                    "DISPLAY": os.environ.get("DISPLAY"),
-                    "ANTHROPIC_API_KEY": (
-                        "SET" if os.environ.get("ANTHROPIC_API_KEY") else "NOT SET"
-                    ),
-                    "HOME": os.environ.get("HOME"),
-                    "PWD": os.getcwd(),
-                },
-            }
-            self.serve_json(debug_info)
+                await self.send_json(writer, debug_info)
+            else:
+                await self.send_json(writer, {"error": "Not found"}, 404)
+        elif method == "POST":
+            if path == "/start":
+                # Starting takes seconds, keep serving other clients meanwhile
+                result = await asyncio.to_thread(self.session.start_session)
+                await self.send_json(writer, {"result": result})
+            elif path == "/command":
+                await self.run_command(self.session, body, writer)
+            else:
+                await self.send_json(writer, {"error": "Not found"}, 404)
         else:
-            self.send_error(404)
-
-    def do_POST(self):
-        """Handle POST requests"""
-        if self.path == "/start":
-            result = goose_session.start_session()
-            self.serve_json({"result": result})
-        elif self.path == "/command":
-            content_length = int(self.headers["Content-Length"])
-            post_data = self.rfile.read(content_length).decode("utf-8")
-            data = json.loads(post_data)
-            command = data.get("command", "")
-
-            if command:
-                result = goose_session.send_command(command)
-                self.serve_json({"result": result, "command": command})
+            await self.send_json(writer, {"error": "Not found"}, 404)
+        return True
+
+    async def route_sessions(self, method, parts, query, headers, body, reader, writer):
+        """
+        Multi-session API backed by the warm pool:
+
+          GET    /sessions                  pool status
+          POST   /sessions                  take a session, returns its id
+          GET    /sessions/{id}/status
+          POST   /sessions/{id}/command     {"command": "..."}
+          GET    /sessions/{id}/stream      Server-Sent Events, like /stream
+          GET    /sessions/{id}/poll?since=N
+          DELETE /sessions/{id}             stop the session
+        """
+        if len(parts) == 1:
+            if method == "GET":
+                await self.send_json(writer, self.pool.status())
+            elif method == "POST":
+                started = time.perf_counter()
+                try:
+                    session_id, _, warm = await asyncio.to_thread(self.pool.acquire)
+                except RuntimeError as e:
+                    await self.send_json(writer, {"error": str(e)}, 503)
+                    return True
+                await self.send_json(
+                    writer,
+                    {
+                        "session_id": session_id,
+                        "warm": warm,
+                        "acquire_ms": round((time.perf_counter() - started) * 1000, 1),
+                    },
+                )
             else:
-                self.serve_json({"error": "No command provided"})
+                await self.send_json(writer, {"error": "Not found"}, 404)
+            return True
+
+        session = self.pool.get(parts[1])
+        if session is None:
+            await self.send_json(writer, {"error": "Unknown session"}, 404)
+            return True
+
+        action = parts[2] if len(parts) > 2 else ""
+        if method == "DELETE" and not action:
+            await asyncio.to_thread(self.pool.release, parts[1])
+            await self.send_json(writer, {"result": "Session stopped"})
+        elif method == "GET" and action == "status":
+            await self.send_json(
+                writer, {"status": session.get_status(), "startup": session.startup}
+            )
+        elif method == "GET" and action == "stream":
+            await self.stream_session(session, query, headers, reader, writer)
+            return False
+        elif method == "GET" and action == "poll":
+            await self.send_json(writer, self.poll_output(session, query))
+        elif method == "POST" and action == "command":
+            await self.run_command(session, body, writer)
+        else:
+            await self.send_json(writer, {"error": "Not found"}, 404)
+        return True
+
+    def poll_output(self, session, query):
+        since = self.parse_seq(query.get("since", [None])[0])
+        if since is None:
+            # No cursor: the last 50 lines, as before
+            since = max(0, session.last_seq - 50)
+        # A cursor past the end is from before a restart, start over
+        reset = since > session.last_seq
+        if reset:
+            since = 0
+        lines, fell_behind = session.lines_since(since)
+        return {
+            "output": [line for _, line in lines],
+            "lines": [{"seq": seq, "text": line} for seq, line in lines],
+            "next_since": lines[-1][0] if lines else max(since, 0),
+            "fell_behind": fell_behind,
+            "reset": reset,
+            "running": session.running,
+            "buffer_size": session.last_seq,
+        }
+
+    async def run_command(self, session, body, writer):
+        try:
+            data = json.loads(body.decode("utf-8"))
+        except ValueError:
+            await self.send_json(writer, {"error": "Invalid JSON"}, 400)
+            return
+        command = data.get("command", "")
+
+        if command:
+            result = await asyncio.to_thread(session.send_command, command)
+            await self.send_json(writer, {"result": result, "command": command})
+        else:
+            await self.send_json(writer, {"error": "No command provided"})
+
+    async def stream_session(self, session, query, headers, reader, writer):
+        # EventSource sends Last-Event-ID when it reconnects
+        since = headers.get("last-event-id") or query.get("since", [None])[0]
+        await self.stream_output(session, reader, writer, self.parse_seq(since))
+
+    @staticmethod
+    def parse_seq(value):
+        try:
+            return max(0, int(value))
+        except (TypeError, ValueError):
+            return None
+
+    async def stream_output(self, session, reader, writer, since=None):
+        """
+        Push Goose output and status changes as Server-Sent Events.
+
+        Each output event carries its sequence number as the event id. With
+        `since`, buffered lines after that number are replayed first, preceded
+        by a "gap" event if some of them were already dropped. A `since` past
+        the last line is from before a restart: a "reset" event is sent and the
+        whole buffer replayed.
+        """
+        queue = asyncio.Queue()
+
+        def on_event(kind, value):
+            # Called from the reader thread
+            self.loop.call_soon_threadsafe(queue.put_nowait, (kind, value))
+
+        session.add_listener(on_event)
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Access-Control-Allow-Origin: *\r\n"
+            b"Connection: close\r\n\r\n"
+        )
+        # Subscribe before reading the buffer so no line falls in between
+        if since is None:
+            replay, fell_behind = [], False
+            last_sent = session.last_seq
         else:
-            self.send_error(404)
+            if since > session.last_seq:
+                writer.write(f"event: reset\ndata: {session.last_seq}\n\n".encode("utf-8"))
+                since = 0
+            replay, fell_behind = session.lines_since(since)
+            last_sent = since
+        if fell_behind:
+            dropped = (replay[0][0] if replay else session.last_seq + 1) - since - 1
+            writer.write(f"event: gap\ndata: {dropped}\n\n".encode("utf-8"))
+        for seq, line in replay:
+            writer.write(f"id: {seq}\ndata: {line}\n\n".encode("utf-8"))
+            last_sent = seq
+        queue.put_nowait(("status", session.get_status()))
 
-    def serve_json(self, data):
+        # Nothing is sent while Goose is idle; a read returning EOF means the browser left
+        disconnected = asyncio.ensure_future(reader.read())
+        try:
+            while True:
+                next_event = asyncio.ensure_future(queue.get())
+                await asyncio.wait(
+                    [next_event, disconnected], return_when=asyncio.FIRST_COMPLETED
+                )
+                if not next_event.done():
+                    next_event.cancel()
+                    break
+                kind, value = next_event.result()
+                if kind == "output":
+                    seq, line = value
+                    if seq <= last_sent:
+                        # Already sent as part of the replay
+                        continue
+                    last_sent = seq
+                    event = f"id: {seq}\ndata: {line}\n\n"
+                else:
+                    event = f"event: status\ndata: {value}\n\n"
+                writer.write(event.encode("utf-8"))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            session.remove_listener(on_event)
+            disconnected.cancel()
+
+    async def send_response(self, writer, status, content_type, body):
+        writer.write(
+            (
+                f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Access-Control-Allow-Origin: *\r\n"
+                "Access-Control-Allow-Methods: GET, POST\r\n"
+                "Access-Control-Allow-Headers: Content-Type\r\n\r\n"
+            ).encode("latin-1")
+            + body
+        )
+        await writer.drain()
+
+    async def send_json(self, writer, data, status=200):
         """Send JSON response"""
-        self.send_response(200)
-        self.send_header("Content-type", "application/json")
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "GET, POST")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        self.end_headers()
-        self.wfile.write(json.dumps(data).encode())
-
-    def serve_chat_interface(self):
-        """Serve the chat interface HTML"""
-        html = """
+        await self.send_response(
+            writer, status, "application/json", json.dumps(data).encode()
+        )
+
+
+CHAT_INTERFACE_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -410,9 +964,8 @@ class GooseAPIHandler(BaseHTTPRequestHandler):
         </div>
 
         <script>
-            let lastBufferSize = 0;
-            let pollingInterval = null;
-            let isPolling = false;
+            let eventSource = null;
+            let isStreaming = false;
 
             function log(message) {
                 const chatLog = document.getElementById('chatLog');
@@ -428,17 +981,29 @@ class GooseAPIHandler(BaseHTTPRequestHandler):
                 statusText.textContent = status;
                 statusElement.className = 'status ' + (status === 'Running' ? 'running' : 'stopped');
                 
-                // Update polling status indicator
-                if (isPolling) {
+                // Update live stream indicator
+                if (isStreaming) {
                     pollingStatus.textContent = '🔄 Live updates active';
                 } else {
                     pollingStatus.textContent = '';
                 }
             }
 
-            function resetOutput() {
-                lastBufferSize = 0;
-                log('🔄 Reset - will show all output');
+            async function resetOutput() {
+                // Show everything still in the server's buffer
+                try {
+                    const response = await fetch('/poll?since=0');
+                    const data = await response.json();
+                    log('🔄 Reset - showing all buffered output');
+                    if (data.fell_behind) {
+                        log('⚠️ Older output is no longer buffered');
+                    }
+                    if (data.output.length > 0) {
+                        log('Goose: ' + data.output.join('\\n'));
+                    }
+                } catch (error) {
+                    log('Error fetching output: ' + error);
+                }
             }
 
             async function copyChat() {
@@ -466,27 +1031,14 @@ class GooseAPIHandler(BaseHTTPRequestHandler):
             }
 
             async function startSession() {
-                console.log('🔍 startSession() called');
                 log('Starting Goose session...');
                 
                 try {
-                    console.log('🔍 About to make fetch request to /start');
                     const response = await fetch('/start', { method: 'POST' });
-                    console.log('🔍 Got response:', response);
-                    
                     const data = await response.json();
-                    console.log('🔍 Response data:', data);
-                    
                     log('Start result: ' + data.result);
-                    
-                    // Auto-start polling when session starts
-                    setTimeout(() => {
-                        checkStatus();
-                        startPolling();
-                    }, 1000);
-                    
                 } catch (error) {
-                    console.error('🔍 Error in startSession:', error);
+                    console.error('Error in startSession:', error);
                     log('Error starting session: ' + error);
                 }
             }
@@ -496,58 +1048,39 @@ class GooseAPIHandler(BaseHTTPRequestHandler):
                     const response = await fetch('/status');
                     const data = await response.json();
                     updateStatus(data.status);
-                    
-                    // Auto-manage polling based on status
-                    if (data.status === 'Running' && !isPolling) {
-                        startPolling();
-                    } else if (data.status !== 'Running' && isPolling) {
-                        stopPolling();
-                    }
-                    
                 } catch (error) {
                     log('Error checking status: ' + error);
                 }
             }
 
-            function startPolling() {
-                if (pollingInterval) return; // Already polling
-                
-                isPolling = true;
-                updateStatus(document.getElementById('status-text').textContent); // Refresh status display
-                
-                pollingInterval = setInterval(async () => {
-                    try {
-                        const response = await fetch('/poll');
-                        const data = await response.json();
-                        
-                        // Show new output
-                        if (data.buffer_size > lastBufferSize) {
-                            const newLines = data.output.slice(-(data.buffer_size - lastBufferSize));
-                            if (newLines.length > 0) {
-                                log('Goose: ' + newLines.join('\\n'));
-                            }
-                            lastBufferSize = data.buffer_size;
-                        }
-                        
-                        // Auto-stop polling if session ends
-                        if (!data.running && isPolling) {
-                            log('⚠️ Goose session ended');
-                            stopPolling();
-                        }
-                        
-                    } catch (error) {
-                        console.log('Polling error:', error);
+            function connectStream() {
+                // The server pushes each output line as it arrives. Start with what is
+                // buffered; on reconnect EventSource resumes after the last event id it saw
+                eventSource = new EventSource('/stream?since=0');
+                eventSource.onopen = () => {
+                    isStreaming = true;
+                    updateStatus(document.getElementById('status-text').textContent);
+                };
+                eventSource.onmessage = (event) => {
+                    log('Goose: ' + event.data);
+                };
+                eventSource.addEventListener('reset', () => {
+                    log('⚠️ The server restarted, showing its output from the start');
+                });
+                eventSource.addEventListener('gap', (event) => {
+                    log('⚠️ ' + event.data + ' lines of output were missed');
+                });
+                eventSource.addEventListener('status', (event) => {
+                    const previous = document.getElementById('status-text').textContent;
+                    if (previous === 'Running' && event.data !== 'Running') {
+                        log('⚠️ Goose session ended');
                     }
-                }, 1000); // Poll every 1 second
-            }
-
-            function stopPolling() {
-                if (pollingInterval) {
-                    clearInterval(pollingInterval);
-                    pollingInterval = null;
-                    isPolling = false;
-                    updateStatus(document.getElementById('status-text').textContent); // Refresh status display
-                }
+                    updateStatus(event.data);
+                });
+                eventSource.onerror = () => {
+                    isStreaming = false;
+                    updateStatus(document.getElementById('status-text').textContent);
+                };
             }
 
             async function sendCommand() {
@@ -559,11 +1092,6 @@ class GooseAPIHandler(BaseHTTPRequestHandler):
                 log('You: ' + command);
                 input.value = '';
                 
-                // Auto-start polling if not already active (shouldn't be needed, but just in case)
-                if (!isPolling) {
-                    startPolling();
-                }
-                
                 try {
                     const response = await fetch('/command', {
                         method: 'POST',
@@ -585,25 +1113,18 @@ class GooseAPIHandler(BaseHTTPRequestHandler):
 
             // Initialize
             checkStatus();
-            
-            // Check status periodically to auto-manage polling
-            setInterval(checkStatus, 30000);
+            connectStream();
         </script>
     </body>
     </html>
     """
 
-        self.send_response(200)
-        self.send_header("Content-type", "text/html; charset=utf-8")
-        self.end_headers()
-        self.wfile.write(html.encode("utf-8"))
-
 
 def main():
     """Start the API server"""
-    server = HTTPServer(("0.0.0.0", 8888), GooseAPIHandler)
-    print("🦆 Goose API server starting on port 8888...")
-    server.serve_forever()
+    # Warm sessions start in the background while the server comes up
+    session_pool.refill()
+    asyncio.run(GooseAPIServer(goose_session, session_pool).serve("0.0.0.0", 8888))
 
 
 if __name__ == "__main__":
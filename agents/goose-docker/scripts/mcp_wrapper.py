@@ -1,99 +1,279 @@
 #!/usr/bin/env python3
 """
 MCP Wrapper for Goose
-This script starts MCP servers and provides a bridge for Goose to access them
+This script starts MCP servers and provides a bridge for Goose to access them.
+
+Each server runs under an asyncio supervisor: its stdout/stderr are drained
+into a bounded log ring (so a chatty server can't fill the pipe and hang),
+exits are noticed as soon as they happen, and restarts back off exponentially
+until a crash loop is detected. Health and restart counters are written to
+MCP_WRAPPER_HEALTH_FILE.
 """
 
 import os
 import sys
 import json
-import subprocess
+import time
+import signal
 import asyncio
+from collections import deque
 from pathlib import Path
 
+# Lines of output kept per server
+LOG_RING_LINES = int(os.getenv("MCP_WRAPPER_LOG_LINES", "500"))
+# Output is read in chunks of this size; longer lines are logged cut to LOG_LINE_MAX bytes
+DRAIN_CHUNK_BYTES = 65536
+LOG_LINE_MAX = 8192
+# StreamReader buffer limit of the child's pipes
+PIPE_LIMIT = 1024 * 1024
+# Restart delay doubles after each crash, from BACKOFF_INITIAL up to BACKOFF_MAX seconds
+BACKOFF_INITIAL = float(os.getenv("MCP_WRAPPER_BACKOFF_INITIAL", "1"))
+BACKOFF_MAX = float(os.getenv("MCP_WRAPPER_BACKOFF_MAX", "60"))
+# A server that stayed up this long is considered healthy again and its backoff resets
+STABLE_AFTER = float(os.getenv("MCP_WRAPPER_STABLE_AFTER", "30"))
+# This many crashes within the window means a crash loop: stop restarting
+CRASH_LOOP_THRESHOLD = int(os.getenv("MCP_WRAPPER_CRASH_LOOP_THRESHOLD", "5"))
+CRASH_LOOP_WINDOW = float(os.getenv("MCP_WRAPPER_CRASH_LOOP_WINDOW", "120"))
+HEALTH_FILE = os.getenv("MCP_WRAPPER_HEALTH_FILE", "/tmp/mcp_wrapper_health.json")
+
+
+class SupervisedServer:
+    """Runtime state of one MCP server"""
+
+    def __init__(self, name, config):
+        self.name = name
+        self.config = config
+        self.process = None
+        self.logs = deque(maxlen=LOG_RING_LINES)
+        self.state = "stopped"
+        self.started_at = None
+        self.starts = 0
+        self.restarts = 0
+        self.crashes = deque()
+        self.last_exit_code = None
+        self.backoff = BACKOFF_INITIAL
+
+    def health(self):
+        now = time.time()
+        return {
+            "state": self.state,
+            "pid": self.process.pid if self.process and self.state == "running" else None,
+            "uptime": round(now - self.started_at, 1)
+            if self.started_at and self.state == "running"
+            else 0,
+            "starts": self.starts,
+            "restarts": self.restarts,
+            "recent_crashes": len([t for t in self.crashes if now - t <= CRASH_LOOP_WINDOW]),
+            "last_exit_code": self.last_exit_code,
+            "next_backoff": self.backoff,
+            "log_lines": len(self.logs),
+        }
+
+
 class MCPServerManager:
     def __init__(self, config_path="/home/goose/.config/mcp_servers.json"):
         self.config_path = config_path
         self.servers = {}
-        self.processes = {}
-        
+        self.supervised = {}
+        self.tasks = {}
+        self.stopping = False
+
     def load_config(self):
         """Load MCP server configuration"""
         with open(self.config_path, 'r') as f:
             config = json.load(f)
             self.servers = config.get('mcpServers', {})
-            
-    def start_server(self, name, server_config):
-        """Start an individual MCP server"""
+
+    async def start_server(self, server):
+        """Start an individual MCP server, returns False if it couldn't be started"""
+        config = server.config
+        # Set up environment
+        env = os.environ.copy()
+        env.update(config.get('env', {}))
+
+        # Build command
+        cmd = [config['command']] + config.get('args', [])
+
+        print(f"Starting MCP server '{server.name}': {' '.join(cmd)}")
         try:
-            # Set up environment
-            env = os.environ.copy()
-            env.update(server_config.get('env', {}))
-            
-            # Build command
-            cmd = [server_config['command']] + server_config.get('args', [])
-            
-            # Set working directory
-            cwd = server_config.get('cwd', None)
-            
-            print(f"Starting MCP server '{name}': {' '.join(cmd)}")
-            
-            # Start the process
-            process = subprocess.Popen(
-                cmd,
+            server.process = await asyncio.create_subprocess_exec(
+                *cmd,
                 env=env,
-                cwd=cwd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
+                cwd=config.get('cwd', None),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=PIPE_LIMIT,
             )
-            
-            self.processes[name] = process
-            print(f"✅ Started MCP server '{name}' (PID: {process.pid})")
-            
         except Exception as e:
-            print(f"❌ Failed to start MCP server '{name}': {e}")
-            
+            print(f"❌ Failed to start MCP server '{server.name}': {e}")
+            server.logs.append(f"[supervisor] failed to start: {e}")
+            return False
+
+        server.state = "running"
+        server.started_at = time.time()
+        server.starts += 1
+        server.logs.append(f"[supervisor] started, pid {server.process.pid}")
+        print(f"✅ Started MCP server '{server.name}' (PID: {server.process.pid})")
+        return True
+
+    async def _drain(self, server, stream, label):
+        """Copy a child's output into its log ring so the pipe never fills up"""
+        # Read fixed-size chunks rather than lines: readline() gives up on a line
+        # longer than the reader's limit, which would leave the pipe unread
+        pending = b""
+        # Inside a line already logged as truncated, dropping bytes until its end
+        skipping = False
+        while True:
+            chunk = await stream.read(DRAIN_CHUNK_BYTES)
+            if not chunk:
+                break
+            *lines, pending = (pending + chunk).split(b"\n")
+            if skipping:
+                if not lines:
+                    pending = b""
+                    continue
+                lines.pop(0)
+                skipping = False
+            for line in lines:
+                self._log_output(server, label, line)
+            if len(pending) > LOG_LINE_MAX:
+                self._log_output(server, label, pending, truncated=True)
+                pending = b""
+                skipping = True
+        if pending and not skipping:
+            self._log_output(server, label, pending)
+
+    @staticmethod
+    def _log_output(server, label, line, truncated=False):
+        text = line[:LOG_LINE_MAX].decode(errors="replace").rstrip()
+        if truncated:
+            text += " [line truncated]"
+        server.logs.append(f"[{label}] {text}")
+
+    async def supervise(self, server):
+        """Run one server, restarting it with backoff until a crash loop or shutdown"""
+        while not self.stopping:
+            if await self.start_server(server):
+                self.write_health()
+                drains = [
+                    asyncio.create_task(self._drain(server, server.process.stdout, "stdout")),
+                    asyncio.create_task(self._drain(server, server.process.stderr, "stderr")),
+                ]
+                # Returns the moment the child exits, no polling
+                server.last_exit_code = await server.process.wait()
+                await asyncio.gather(*drains, return_exceptions=True)
+                uptime = time.time() - server.started_at
+            else:
+                uptime = 0
+
+            if self.stopping:
+                break
+
+            now = time.time()
+            if uptime >= STABLE_AFTER:
+                server.backoff = BACKOFF_INITIAL
+            server.crashes.append(now)
+            while server.crashes and now - server.crashes[0] > CRASH_LOOP_WINDOW:
+                server.crashes.popleft()
+
+            print(
+                f"⚠️  MCP server '{server.name}' died with code {server.last_exit_code} "
+                f"after {uptime:.1f}s"
+            )
+            for line in list(server.logs)[-5:]:
+                print(f"    {line}")
+
+            if len(server.crashes) >= CRASH_LOOP_THRESHOLD:
+                server.state = "crash_loop"
+                print(
+                    f"❌ MCP server '{server.name}' crashed {len(server.crashes)} times in "
+                    f"{CRASH_LOOP_WINDOW:.0f}s, not restarting it again"
+                )
+                self.write_health()
+                return
+
+            server.state = "backoff"
+            self.write_health()
+            print(f"🔁 Restarting '{server.name}' in {server.backoff:.1f}s")
+            await asyncio.sleep(server.backoff)
+            server.backoff = min(server.backoff * 2, BACKOFF_MAX)
+            server.restarts += 1
+
+        server.state = "stopped"
+        self.write_health()
+
     def start_all(self):
-        """Start all configured MCP servers"""
+        """Start supervising all configured MCP servers (call from a running loop)"""
         self.load_config()
-        
+
         for name, config in self.servers.items():
             # Skip certain servers for now
             if name in ['web-search', 'goose-computer']:
                 print(f"⏭️  Skipping '{name}' server (not available)")
                 continue
-                
-            self.start_server(name, config)
-            
-    def stop_all(self):
+
+            server = SupervisedServer(name, config)
+            self.supervised[name] = server
+            self.tasks[name] = asyncio.create_task(self.supervise(server))
+
+    async def stop_all(self, timeout=5):
         """Stop all running MCP servers"""
-        for name, process in self.processes.items():
-            try:
-                process.terminate()
-                print(f"Stopped MCP server '{name}'")
-            except:
-                pass
+        self.stopping = True
+        for name, server in self.supervised.items():
+            if server.process and server.process.returncode is None:
+                try:
+                    server.process.terminate()
+                except ProcessLookupError:
+                    pass
+        for name, server in self.supervised.items():
+            if server.process and server.process.returncode is None:
+                try:
+                    await asyncio.wait_for(server.process.wait(), timeout)
+                except asyncio.TimeoutError:
+                    server.process.kill()
+            print(f"Stopped MCP server '{name}'")
+        for task in self.tasks.values():
+            task.cancel()
+        await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+        for server in self.supervised.values():
+            server.state = "stopped"
+        self.write_health()
+
+    def health(self):
+        """Health and restart counters of every server"""
+        return {name: server.health() for name, server in self.supervised.items()}
+
+    def logs(self, name):
+        server = self.supervised.get(name)
+        return list(server.logs) if server else []
+
+    def write_health(self):
+        try:
+            path = Path(HEALTH_FILE)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(
+                json.dumps({"updated": time.time(), "servers": self.health()}, indent=2)
+            )
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️  Could not write health file {HEALTH_FILE}: {e}")
+
+    async def run(self):
+        """Supervise all servers until SIGINT/SIGTERM"""
+        loop = asyncio.get_running_loop()
+        shutdown = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, shutdown.set)
 
-if __name__ == "__main__":
-    manager = MCPServerManager()
-    
-    try:
         print("🚀 Starting MCP servers...")
-        manager.start_all()
-        
-        # Keep running
-        print("✅ MCP servers are running. Press Ctrl+C to stop.")
-        while True:
-            # Check if any processes have died
-            for name, process in list(manager.processes.items()):
-                if process.poll() is not None:
-                    print(f"⚠️  MCP server '{name}' died with code {process.returncode}")
-                    # Try to restart it
-                    if name in manager.servers:
-                        manager.start_server(name, manager.servers[name])
-            
-            asyncio.run(asyncio.sleep(5))
-            
-    except KeyboardInterrupt:
+        self.start_all()
+        print(f"✅ MCP servers are supervised, health in {HEALTH_FILE}. Press Ctrl+C to stop.")
+
+        await shutdown.wait()
         print("\n🛑 Stopping MCP servers...")
-        manager.stop_all()
\ No newline at end of file
+        await self.stop_all()
+
+
+if __name__ == "__main__":
+    manager = MCPServerManager(*sys.argv[1:2])
+    asyncio.run(manager.run())
@@ -3,10 +3,13 @@
 Custom Goose toolkit that integrates with the Unstuck MCP server
 """
 
+import os
+import time
+import uuid
 import requests
-import json
 import logging
-from typing import Dict, Any, List
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Optional
 try:
     from goose.toolkit.base import Toolkit, tool
 except ImportError:
@@ -15,83 +18,191 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+MCP_SERVER_URL = os.getenv("UNSTUCK_MCP_SERVER_URL", "http://127.0.0.1:8000")
+# How long one status request may block on the server waiting for the job to finish
+LONG_POLL_SECONDS = 25
+# Pause before retrying after a dropped connection, doubling up to the maximum
+RECONNECT_DELAY = 1.0
+MAX_RECONNECT_DELAY = 15.0
+
+
+class UnstuckClient:
+    """
+    Submit-and-poll client for the Unstuck MCP server's /jobs API.
+
+    One pooled keep-alive session is shared by all calls, so concurrent
+    requests from an agent reuse connections. The job lives on the server,
+    so a dropped connection only costs a reconnect, not the job. Every
+    request carries this client's id, which the server uses to keep its jobs
+    private and to apply the per-client job limit.
+    """
+
+    def __init__(self, base_url: str = MCP_SERVER_URL, pool_size: int = 10):
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        self.session.headers["X-Client-Id"] = uuid.uuid4().hex
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def submit(
+        self,
+        description: str,
+        screenshot_url: str = "",
+        max_price_sats: Optional[int] = None,
+        timeout: int = 300,
+    ) -> Dict[str, Any]:
+        """Start a help job, returns {"job_id", "status", ...} without waiting for it"""
+        response = self.session.post(
+            f"{self.base_url}/jobs",
+            json={
+                "description": description,
+                "screenshot_url": screenshot_url,
+                "max_price_sats": max_price_sats,
+                "timeout": timeout,
+            },
+            timeout=30,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def status(self, job_id: str, wait: float = 0) -> Dict[str, Any]:
+        """Job status; with wait, the server holds the request until the job finishes or wait passes"""
+        response = self.session.get(
+            f"{self.base_url}/jobs/{job_id}",
+            params={"wait": wait},
+            timeout=wait + 10,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def wait(self, job_id: str, timeout: float = 330) -> Dict[str, Any]:
+        """Long-poll until the job finishes, reconnecting if the connection drops"""
+        deadline = time.monotonic() + timeout
+        delay = RECONNECT_DELAY
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Job {job_id} still running after {timeout:.0f}s")
+            try:
+                job = self.status(job_id, wait=min(LONG_POLL_SECONDS, remaining))
+                delay = RECONNECT_DELAY
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                logger.warning(f"Lost connection polling job {job_id}, retrying in {delay:.0f}s: {e}")
+                time.sleep(min(delay, max(remaining, 0)))
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+                continue
+            if job.get("finished_at"):
+                return job
+
+    def health(self) -> requests.Response:
+        return self.session.get(f"{self.base_url}/health", timeout=5)
+
+
+def format_job_result(job: Dict[str, Any]) -> str:
+    """Turn a finished job into the text shown to the agent"""
+    result = job.get("result") or {}
+    if job.get("status") == "failed":
+        return f"Error: {result.get('error', 'Unknown error')}"
+    content = (result.get("result") or {}).get("content")
+    return content or "No response received"
+
+
 class UnstuckToolkit(Toolkit):
     """Toolkit for requesting visual help from humans via Unstuck MCP server"""
-    
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.mcp_server_url = "http://127.0.0.1:8000"
+        self.mcp_server_url = MCP_SERVER_URL
+        self.client = UnstuckClient(self.mcp_server_url)
         logger.info("UnstuckToolkit initialized")
-    
+
     @tool
     def request_visual_help(
         self,
-        screenshot_description: str,
         task_description: str,
-        execute_result: bool = False
+        screenshot_path: str = "",
+        max_price_sats: Optional[int] = None,
     ) -> str:
         """
-        Request visual help from humans via Nostr marketplace.
-        
+        Request visual help from humans via Nostr marketplace and wait for the answer.
+
         Args:
-            screenshot_description: Description of what to screenshot
             task_description: Description of what help is needed
-            execute_result: Whether to execute the instructions (mouse clicks, etc)
-        
+            screenshot_path: Path or URL of a screenshot; the screen is captured if empty
+            max_price_sats: Maximum price to pay in satoshis (optional)
+
         Returns:
             Instructions from human operator or execution result
         """
         try:
-            # Create the request payload
-            payload = {
-                "jsonrpc": "2.0",
-                "method": "tools/call",
-                "params": {
-                    "name": "request_visual_help",
-                    "arguments": {
-                        "screenshot_description": screenshot_description,
-                        "task_description": task_description,
-                        "execute_result": execute_result
-                    }
-                },
-                "id": 1
-            }
-            
-            # Send request to MCP server
-            response = requests.post(
-                f"{self.mcp_server_url}/",
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=300  # 5 minute timeout for human response
-            )
-            
-            response.raise_for_status()
-            result = response.json()
-            
-            if "error" in result:
-                return f"Error: {result['error'].get('message', 'Unknown error')}"
-            
-            if "result" in result:
-                return result["result"].get("content", [{}])[0].get("text", "No response received")
-            
-            return "Unexpected response format from MCP server"
-            
-        except requests.exceptions.Timeout:
+            job = self.client.submit(task_description, screenshot_path, max_price_sats)
+            logger.info(f"Submitted unstuck job {job['job_id']}")
+            return format_job_result(self.client.wait(job["job_id"]))
+        except TimeoutError:
             return "Request timed out waiting for human response"
         except requests.exceptions.RequestException as e:
             return f"Network error communicating with MCP server: {str(e)}"
         except Exception as e:
             logger.error(f"Unexpected error in request_visual_help: {e}")
             return f"Unexpected error: {str(e)}"
-    
+
+    @tool
+    def submit_visual_help(
+        self,
+        task_description: str,
+        screenshot_path: str = "",
+        max_price_sats: Optional[int] = None,
+    ) -> str:
+        """
+        Submit a visual help request without waiting; check it later with get_visual_help_result.
+
+        Args:
+            task_description: Description of what help is needed
+            screenshot_path: Path or URL of a screenshot; the screen is captured if empty
+            max_price_sats: Maximum price to pay in satoshis (optional)
+
+        Returns:
+            The job id to check on
+        """
+        try:
+            job = self.client.submit(task_description, screenshot_path, max_price_sats)
+            return f"Submitted job {job['job_id']}"
+        except requests.exceptions.RequestException as e:
+            return f"Network error communicating with MCP server: {str(e)}"
+
+    @tool
+    def get_visual_help_result(self, job_id: str, wait_seconds: int = 0) -> str:
+        """
+        Check on a job started with submit_visual_help.
+
+        Args:
+            job_id: The job id submit_visual_help returned
+            wait_seconds: Wait up to this long (max 60) for the answer
+
+        Returns:
+            The answer, or the job's current status if it isn't finished
+        """
+        try:
+            job = self.client.status(job_id, wait=wait_seconds)
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return f"Unknown job {job_id}, it may have expired"
+            return f"Error from MCP server: {str(e)}"
+        except requests.exceptions.RequestException as e:
+            return f"Network error communicating with MCP server: {str(e)}"
+        if not job.get("finished_at"):
+            return f"Job {job_id} is {job.get('status')}"
+        return format_job_result(job)
+
     @tool
     def check_mcp_server_status(self) -> str:
         """Check if the MCP server is running and accessible"""
         try:
-            response = requests.get(f"{self.mcp_server_url}/health", timeout=5)
+            response = self.client.health()
             if response.status_code == 200:
                 return "MCP server is running and accessible"
             else:
                 return f"MCP server returned status code: {response.status_code}"
         except requests.exceptions.RequestException as e:
-            return f"Cannot connect to MCP server: {str(e)}"
\ No newline at end of file
+            return f"Cannot connect to MCP server: {str(e)}"
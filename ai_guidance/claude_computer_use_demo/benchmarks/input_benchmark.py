@@ -0,0 +1,100 @@
+"""
+Milliseconds per ComputerTool input action: the in-process XTest injector
+against a shell and an xdotool process per action. Screenshots are left out
+so only the input itself is timed. Typing is also reported in characters per
+second.
+
+Run it under a virtual display from the project root:
+
+    xvfb-run -s "-screen 0 1920x1080x24" python benchmarks/input_benchmark.py
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from computer_use_demo.tools.base import ToolResult  # noqa: E402
+from computer_use_demo.tools.computer import ComputerTool20250124  # noqa: E402
+
+TYPED_TEXT = "the quick brown fox jumps over the lazy dog " * 3
+ACTIONS = {
+    "mouse_move": {"action": "mouse_move", "coordinate": [200, 200]},
+    "left_click": {"action": "left_click", "coordinate": [300, 200]},
+    "double_click": {"action": "double_click", "coordinate": [300, 200]},
+    "left_click_drag": {"action": "left_click_drag", "coordinate": [400, 300]},
+    "key": {"action": "key", "text": "shift"},
+    "scroll": {
+        "action": "scroll",
+        "coordinate": [300, 300],
+        "scroll_direction": "down",
+        "scroll_amount": 1,
+    },
+    "cursor_position": {"action": "cursor_position"},
+    "type": {"action": "type", "text": TYPED_TEXT},
+}
+
+
+class InputOnlyTool(ComputerTool20250124):
+    async def shell(self, command: str, take_screenshot=True):
+        return await super().shell(command, take_screenshot=False)
+
+    async def screenshot(self):
+        return ToolResult()
+
+
+async def measure(tool: InputOnlyTool, params: dict, runs: int) -> list[float]:
+    await tool(**params)
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = await tool(**params)
+        timings.append((time.perf_counter() - started) * 1000)
+        if result.error:
+            sys.exit(f"{params['action']} failed: {result.error}")
+    return timings
+
+
+def summary(name: str, timings: list[float], characters: int = 0) -> str:
+    ordered = sorted(timings)
+    p95 = ordered[max(int(len(ordered) * 0.95) - 1, 0)]
+    line = (
+        f"{name:<12} mean {statistics.mean(ordered):7.2f}ms  "
+        f"p50 {statistics.median(ordered):7.2f}ms  p95 {p95:7.2f}ms"
+    )
+    if characters:
+        line += f"  {characters / statistics.mean(ordered) * 1000:.0f} characters/s"
+    return line
+
+
+async def main(runs: int) -> None:
+    subprocess_tool = InputOnlyTool()
+    subprocess_tool._in_process_input = False
+    in_process_tool = InputOnlyTool()
+    if in_process_tool._open_injector() is None:
+        sys.exit(f"Can't inject input into X display {os.getenv('DISPLAY')!r}")
+
+    print(f"{runs} runs of each action")
+    for name, params in ACTIONS.items():
+        subprocess_timings = await measure(subprocess_tool, params, runs)
+        in_process_timings = await measure(in_process_tool, params, runs)
+        characters = len(params.get("text", "")) if name == "type" else 0
+        print(f"{name}:")
+        print(f"  {summary('subprocess', subprocess_timings, characters)}")
+        print(f"  {summary('in-process', in_process_timings, characters)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--width", default="1920")
+    parser.add_argument("--height", default="1080")
+    args = parser.parse_args()
+    os.environ.setdefault("WIDTH", args.width)
+    os.environ.setdefault("HEIGHT", args.height)
+    os.environ["X11_IN_PROCESS"] = "true"
+    asyncio.run(main(args.runs))
@@ -0,0 +1,71 @@
+"""
+Milliseconds per ComputerTool screenshot: in-process X11 capture against the
+gnome-screenshot/scrot + ImageMagick path.
+
+Run it under a virtual display from the project root:
+
+    xvfb-run -s "-screen 0 1920x1080x24" python benchmarks/screenshot_benchmark.py
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from computer_use_demo.tools.computer import ComputerTool20250124  # noqa: E402
+
+
+async def measure(tool: ComputerTool20250124, runs: int) -> tuple[list[float], int]:
+    await tool.screenshot()
+    timings = []
+    size = 0
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = await tool.screenshot()
+        timings.append((time.perf_counter() - started) * 1000)
+        size = len(base64.b64decode(result.base64_image or ""))
+    return timings, size
+
+
+def summary(name: str, timings: list[float], size: int) -> str:
+    ordered = sorted(timings)
+    p95 = ordered[max(int(len(ordered) * 0.95) - 1, 0)]
+    return (
+        f"{name:<12} mean {statistics.mean(ordered):7.1f}ms  "
+        f"p50 {statistics.median(ordered):7.1f}ms  p95 {p95:7.1f}ms  "
+        f"png {size / 1024:.0f} KiB"
+    )
+
+
+async def main(runs: int) -> None:
+    subprocess_tool = ComputerTool20250124()
+    subprocess_tool._in_process_capture = False
+    in_process_tool = ComputerTool20250124()
+    if in_process_tool._open_capture() is None:
+        sys.exit(f"Can't open X display {os.getenv('DISPLAY')!r} in-process")
+
+    print(
+        f"{subprocess_tool.width}x{subprocess_tool.height} screen, "
+        f"scaled to {subprocess_tool.options['display_width_px']}x"
+        f"{subprocess_tool.options['display_height_px']}, {runs} screenshots each, "
+        f"MIT-SHM {'on' if in_process_tool._capture.uses_shm else 'off'}"
+    )
+    print(summary("subprocess", *await measure(subprocess_tool, runs)))
+    print(summary("in-process", *await measure(in_process_tool, runs)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--width", default="1920")
+    parser.add_argument("--height", default="1080")
+    args = parser.parse_args()
+    os.environ.setdefault("WIDTH", args.width)
+    os.environ.setdefault("HEIGHT", args.height)
+    os.environ["X11_IN_PROCESS"] = "true"
+    asyncio.run(main(args.runs))
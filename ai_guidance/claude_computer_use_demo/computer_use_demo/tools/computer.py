@@ -13,10 +13,26 @@ from anthropic.types.beta import BetaToolComputerUse20241022Param, BetaToolUnion
 from .base import BaseAnthropicTool, ToolError, ToolResult
 from .run import run
 
+try:
+    from .x11 import (
+        X11Capture,
+        XTestInjector,
+        changed_pixels,
+        open_capture,
+        open_injector,
+    )
+except ImportError:
+    X11Capture = None
+    XTestInjector = None
+    changed_pixels = None
+    open_capture = None
+    open_injector = None
+
 OUTPUT_DIR = "/tmp/outputs"
 
 TYPING_DELAY_MS = 12
 TYPING_GROUP_SIZE = 50
+FAST_TYPING_DELAY_MS = 1
 
 Action_20241022 = Literal[
     "key",
@@ -95,7 +111,17 @@ class BaseComputerTool:
     display_num: int | None
 
     _screenshot_delay = 2.0
+    _settle_window = 0.1
+    _settle_quiet_wait = 0.5
+    _settle_poll_interval = 0.025
+    _settle_ignored_pixels = 8
     _scaling_enabled = True
+    _in_process_capture = True
+    _capture: "X11Capture | None" = None
+    _capture_failed = False
+    _in_process_input = True
+    _injector: "XTestInjector | None" = None
+    _injector_failed = False
 
     @property
     def options(self) -> ComputerToolOptions:
@@ -122,6 +148,19 @@ class BaseComputerTool:
             self._display_prefix = ""
 
         self.xdotool = f"{self._display_prefix}xdotool"
+        # Off by default until measured against a real X server, see the README
+        in_process = os.getenv("X11_IN_PROCESS", "false").lower() == "true"
+        self._in_process_capture = in_process
+        self._in_process_input = in_process
+        self.fast_typing = os.getenv("FAST_TYPING", "true").lower() != "false"
+        self.fast_typing_delay_ms = float(
+            os.getenv("FAST_TYPING_DELAY_MS") or FAST_TYPING_DELAY_MS
+        )
+        self.slow_typing_window_classes = {
+            name.strip().lower()
+            for name in os.getenv("SLOW_TYPING_WINDOW_CLASSES", "").split(",")
+            if name.strip()
+        }
 
     async def __call__(
         self,
@@ -161,21 +200,7 @@ class BaseComputerTool:
                 command_parts = [self.xdotool, f"key -- {text}"]
                 return await self.shell(" ".join(command_parts))
             elif action == "type":
-                results: list[ToolResult] = []
-                for chunk in chunks(text, TYPING_GROUP_SIZE):
-                    command_parts = [
-                        self.xdotool,
-                        f"type --delay {TYPING_DELAY_MS} -- {shlex.quote(chunk)}",
-                    ]
-                    results.append(
-                        await self.shell(" ".join(command_parts), take_screenshot=False)
-                    )
-                screenshot_base64 = (await self.screenshot()).base64_image
-                return ToolResult(
-                    output="".join(result.output or "" for result in results),
-                    error="".join(result.error or "" for result in results),
-                    base64_image=screenshot_base64,
-                )
+                return await self.type_text(text)
 
         if action in (
             "left_click",
@@ -219,8 +244,118 @@ class BaseComputerTool:
 
         return self.scale_coordinates(ScalingSource.API, coordinate[0], coordinate[1])
 
+    def _open_capture(self) -> "X11Capture | None":
+        """The in-process capture of this display, opened on first use."""
+        if not self._in_process_capture or open_capture is None or self._capture_failed:
+            return None
+        if self._capture is None:
+            display = f":{self.display_num}" if self.display_num is not None else None
+            self._capture = open_capture(display)
+            if self._capture is None:
+                self._capture_failed = True
+        return self._capture
+
+    def _open_injector(self) -> "XTestInjector | None":
+        """The in-process input injector of this display, opened on first use."""
+        if not self._in_process_input or open_injector is None or self._injector_failed:
+            return None
+        if self._injector is None:
+            display = f":{self.display_num}" if self.display_num is not None else None
+            self._injector = open_injector(display)
+            if self._injector is None:
+                self._injector_failed = True
+        return self._injector
+
+    async def inject(self, command: str) -> tuple[str, str] | None:
+        """
+        Run an xdotool command through the in-process injector and return its
+        stdout and stderr, or None if it has to run as a process instead.
+        """
+        prefix = f"{self.xdotool} "
+        if not command.startswith(prefix) or not (injector := self._open_injector()):
+            return None
+        try:
+            output = await asyncio.to_thread(
+                injector.execute, command.removeprefix(prefix)
+            )
+        except OSError as e:
+            self._injector_failed = True
+            return "", f"Input injection failed: {e}"
+        return None if output is None else (output, "")
+
+    async def _fast_typing_injector(self) -> "XTestInjector | None":
+        """The injector to type with, unless fast typing is off for the focus."""
+        if not self.fast_typing or not (injector := self._open_injector()):
+            return None
+        if self.slow_typing_window_classes:
+            window_class = await asyncio.to_thread(injector.focused_window_class)
+            if (window_class or "").lower() in self.slow_typing_window_classes:
+                return None
+        return injector
+
+    async def type_text(self, text: str) -> ToolResult:
+        """
+        Type `text` in chunks of `TYPING_GROUP_SIZE`. Each chunk is typed
+        in-process with `fast_typing_delay_ms` per keystroke when it can be,
+        and with `xdotool type` otherwise: with fast typing off, into windows
+        of `slow_typing_window_classes` (apps that drop fast input), for
+        characters missing from the keyboard map, and after an injection
+        error. The characters per second typed are reported in `system`.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        injector = await self._fast_typing_injector()
+        results: list[ToolResult] = []
+        typed_fast = 0
+        for chunk in chunks(text, TYPING_GROUP_SIZE):
+            if injector is not None:
+                try:
+                    if await asyncio.to_thread(
+                        injector.type_text, chunk, self.fast_typing_delay_ms / 1000
+                    ):
+                        typed_fast += len(chunk)
+                        continue
+                except OSError as e:
+                    # Part of the chunk may be typed already, so don't type it again
+                    self._injector_failed = True
+                    injector = None
+                    results.append(ToolResult(error=f"Input injection failed: {e}"))
+                    continue
+            command_parts = [
+                self.xdotool,
+                f"type --delay {TYPING_DELAY_MS} -- {shlex.quote(chunk)}",
+            ]
+            results.append(
+                await self.shell(" ".join(command_parts), take_screenshot=False)
+            )
+        elapsed = loop.time() - started
+
+        screenshot_base64 = (await self.screenshot()).base64_image
+        return ToolResult(
+            output="".join(result.output or "" for result in results),
+            error="".join(result.error or "" for result in results),
+            base64_image=screenshot_base64,
+            system=(
+                f"Typed {len(text)} characters in {elapsed:.2f}s "
+                f"({len(text) / max(elapsed, 0.001):.0f} characters/s, "
+                f"{typed_fast} with fast typing)"
+            ),
+        )
+
     async def screenshot(self):
         """Take a screenshot of the current screen and return the base64 encoded image."""
+        if capture := self._open_capture():
+            size = None
+            if self._scaling_enabled:
+                size = self.scale_coordinates(
+                    ScalingSource.COMPUTER, self.width, self.height
+                )
+            try:
+                png = await asyncio.to_thread(capture.grab_png, size)
+                return ToolResult(base64_image=base64.b64encode(png).decode())
+            except OSError:
+                self._capture_failed = True
+
         output_dir = Path(OUTPUT_DIR)
         output_dir.mkdir(parents=True, exist_ok=True)
         path = output_dir / f"screenshot_{uuid4().hex}.png"
@@ -249,16 +384,58 @@ class BaseComputerTool:
 
     async def shell(self, command: str, take_screenshot=True) -> ToolResult:
         """Run a shell command and return the output, error, and optionally a screenshot."""
-        _, stdout, stderr = await run(command)
+        if (injected := await self.inject(command)) is not None:
+            stdout, stderr = injected
+        else:
+            _, stdout, stderr = await run(command)
         base64_image = None
 
         if take_screenshot:
             # delay to let things settle before taking a screenshot
-            await asyncio.sleep(self._screenshot_delay)
+            await self.wait_for_screen_to_settle()
             base64_image = (await self.screenshot()).base64_image
 
         return ToolResult(output=stdout, error=stderr, base64_image=base64_image)
 
+    async def wait_for_screen_to_settle(self) -> float:
+        """
+        Wait until the screen has changed and then not changed for
+        `_settle_window` seconds, or at most `_screenshot_delay` seconds. An
+        action that changes nothing is given `_settle_quiet_wait` seconds, so a
+        repaint that starts late is still waited for. Changes to no more than
+        `_settle_ignored_pixels` thumbnail pixels, like a blinking caret, don't
+        count. Without an in-process capture this waits the full delay.
+        Returns the seconds waited.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + self._screenshot_delay
+        capture = self._open_capture()
+        if capture is None:
+            await asyncio.sleep(self._screenshot_delay)
+            return loop.time() - started
+
+        try:
+            previous = await asyncio.to_thread(capture.grab_thumbnail)
+            stable_since = loop.time()
+            changed = False
+            while loop.time() < deadline:
+                await asyncio.sleep(
+                    min(self._settle_poll_interval, max(deadline - loop.time(), 0))
+                )
+                frame = await asyncio.to_thread(capture.grab_thumbnail)
+                if changed_pixels(previous, frame) > self._settle_ignored_pixels:
+                    stable_since = loop.time()
+                    changed = True
+                elif loop.time() - stable_since >= (
+                    self._settle_window if changed else self._settle_quiet_wait
+                ):
+                    break
+                previous = frame
+        except OSError:
+            await asyncio.sleep(max(deadline - loop.time(), 0))
+        return loop.time() - started
+
     def scale_coordinates(self, source: ScalingSource, x: int, y: int):
         """Scale coordinates to a target maximum resolution."""
         if not self._scaling_enabled:
@@ -0,0 +1,855 @@
+"""
+In-process screen capture and input injection for X11 displays.
+
+Grabs the root window through libX11 with ctypes, using a MIT-SHM shared
+memory segment when the X server offers one (the pixels are written straight
+into our memory) and XGetImage otherwise. The frame is resized and encoded
+as PNG in memory with Pillow, so a screenshot costs no processes and no
+files.
+
+Input goes through the XTest extension on a connection kept open for the
+life of the tool. It takes the same xdotool commands the tool would run in a
+shell, so an action and its fallback are one and the same command; commands
+using anything beyond the subset below are left to xdotool. Text is typed as
+one keystroke per character, leaving characters that aren't on the keyboard
+map to `xdotool type`, which remaps a keycode for them.
+"""
+
+import ctypes
+import ctypes.util
+import io
+import shlex
+import threading
+import time
+from collections.abc import Callable
+from typing import TypeVar
+
+from PIL import Image, ImageChops
+
+ZPIXMAP = 2
+ALL_PLANES = 0xFFFFFFFFFFFFFFFF
+LSB_FIRST = 0
+IPC_PRIVATE = 0
+IPC_CREAT = 0o1000
+IPC_RMID = 0
+NO_SYMBOL = 0
+# Screen argument of XTestFakeMotionEvent for the screen the pointer is on
+CURRENT_SCREEN = -1
+
+# xdotool's names for modifier keys
+KEY_ALIASES = {
+    "alt": "Alt_L",
+    "ctrl": "Control_L",
+    "control": "Control_L",
+    "meta": "Meta_L",
+    "super": "Super_L",
+    "shift": "Shift_L",
+}
+# Key names of the characters typed with keys that aren't named after them
+TYPED_KEYS = {"\n": "Return", "\t": "Tab"}
+# Focus values of XGetInputFocus that aren't windows
+POINTER_ROOT = 1
+# xdotool's defaults for the delay between clicks and between keystrokes
+CLICK_DELAY_MS = 100
+KEY_DELAY_MS = 12
+# Every xdotool command; one ends the list of keys of the command before it
+XDOTOOL_COMMANDS = {
+    "behave",
+    "behave_screen_edge",
+    "click",
+    "exec",
+    "get_desktop",
+    "get_desktop_for_window",
+    "get_desktop_viewport",
+    "get_num_desktops",
+    "getactivewindow",
+    "getdisplaygeometry",
+    "getmouselocation",
+    "getwindowfocus",
+    "getwindowgeometry",
+    "getwindowname",
+    "getwindowpid",
+    "key",
+    "keydown",
+    "keyup",
+    "mousedown",
+    "mousemove",
+    "mousemove_relative",
+    "mouseup",
+    "search",
+    "selectwindow",
+    "set_desktop",
+    "set_desktop_for_window",
+    "set_desktop_viewport",
+    "set_num_desktops",
+    "set_window",
+    "sleep",
+    "type",
+    "windowactivate",
+    "windowclose",
+    "windowfocus",
+    "windowkill",
+    "windowmap",
+    "windowminimize",
+    "windowmove",
+    "windowraise",
+    "windowsize",
+    "windowunmap",
+}
+# Anything the shell would expand or treat as syntax rather than pass to xdotool
+SHELL_SYNTAX = set(";&|$`<>(){}*?[]~!#\\\n")
+
+T = TypeVar("T")
+# (keycode, whether Shift must be held for the keysym)
+KeyStroke = tuple[int, bool]
+# ("motion", x, y), ("button", button, pressed), ("key", keycode, pressed),
+# ("sleep", seconds) or ("location",)
+Step = tuple
+
+
+class XImage(ctypes.Structure):
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+        ("red_mask", ctypes.c_ulong),
+        ("green_mask", ctypes.c_ulong),
+        ("blue_mask", ctypes.c_ulong),
+    ]
+
+
+class XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong),
+        ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p),
+        ("readOnly", ctypes.c_int),
+    ]
+
+
+class XClassHint(ctypes.Structure):
+    _fields_ = [
+        ("res_name", ctypes.c_void_p),
+        ("res_class", ctypes.c_void_p),
+    ]
+
+
+class XErrorEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("display", ctypes.c_void_p),
+        ("resourceid", ctypes.c_ulong),
+        ("serial", ctypes.c_ulong),
+        ("error_code", ctypes.c_ubyte),
+        ("request_code", ctypes.c_ubyte),
+        ("minor_code", ctypes.c_ubyte),
+    ]
+
+
+XErrorHandler = ctypes.CFUNCTYPE(
+    ctypes.c_int, ctypes.c_void_p, ctypes.POINTER(XErrorEvent)
+)
+
+_libs = None
+_xtest = None
+_x_errors: list[int] = []
+
+
+@XErrorHandler
+def _record_x_error(display: int, event) -> int:
+    # Xlib's default handler exits the process; remember the error instead
+    _x_errors.append(event.contents.error_code)
+    return 0
+
+
+def _load_libs():
+    """libX11, libXext (None if missing) and libc, or None without libX11."""
+    global _libs
+    if _libs is not None:
+        return _libs or None
+    x11_path = ctypes.util.find_library("X11")
+    if not x11_path:
+        _libs = ()
+        return None
+    x11 = ctypes.CDLL(x11_path)
+    x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    x11.XOpenDisplay.restype = ctypes.c_void_p
+    x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+    x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+    x11.XRootWindow.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XRootWindow.restype = ctypes.c_ulong
+    x11.XDisplayWidth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XDisplayHeight.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XDefaultVisual.restype = ctypes.c_void_p
+    x11.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XGetImage.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_ulong,
+        ctypes.c_int,
+        ctypes.c_int,
+        ctypes.c_uint,
+        ctypes.c_uint,
+        ctypes.c_ulong,
+        ctypes.c_int,
+    ]
+    x11.XGetImage.restype = ctypes.POINTER(XImage)
+    x11.XDestroyImage.argtypes = [ctypes.POINTER(XImage)]
+    x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XFlush.argtypes = [ctypes.c_void_p]
+    x11.XStringToKeysym.argtypes = [ctypes.c_char_p]
+    x11.XStringToKeysym.restype = ctypes.c_ulong
+    x11.XKeysymToKeycode.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+    x11.XKeysymToKeycode.restype = ctypes.c_ubyte
+    x11.XKeycodeToKeysym.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_int]
+    x11.XKeycodeToKeysym.restype = ctypes.c_ulong
+    x11.XFree.argtypes = [ctypes.c_void_p]
+    x11.XGetInputFocus.argtypes = [
+        ctypes.c_void_p,
+        ctypes.POINTER(ctypes.c_ulong),
+        ctypes.POINTER(ctypes.c_int),
+    ]
+    x11.XGetClassHint.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_ulong,
+        ctypes.POINTER(XClassHint),
+    ]
+    x11.XQueryTree.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_ulong,
+        ctypes.POINTER(ctypes.c_ulong),
+        ctypes.POINTER(ctypes.c_ulong),
+        ctypes.POINTER(ctypes.c_void_p),
+        ctypes.POINTER(ctypes.c_uint),
+    ]
+    x11.XQueryPointer.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_ulong,
+        ctypes.POINTER(ctypes.c_ulong),
+        ctypes.POINTER(ctypes.c_ulong),
+        ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(ctypes.c_uint),
+    ]
+    x11.XSetErrorHandler.argtypes = [XErrorHandler]
+    x11.XSetErrorHandler.restype = ctypes.c_void_p
+    x11.XSetErrorHandler(_record_x_error)
+
+    xext = None
+    if xext_path := ctypes.util.find_library("Xext"):
+        xext = ctypes.CDLL(xext_path)
+        xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+        xext.XShmCreateImage.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+            ctypes.c_uint,
+            ctypes.c_int,
+            ctypes.c_void_p,
+            ctypes.POINTER(XShmSegmentInfo),
+            ctypes.c_uint,
+            ctypes.c_uint,
+        ]
+        xext.XShmCreateImage.restype = ctypes.POINTER(XImage)
+        xext.XShmAttach.argtypes = [
+            ctypes.c_void_p,
+            ctypes.POINTER(XShmSegmentInfo),
+        ]
+        xext.XShmDetach.argtypes = [
+            ctypes.c_void_p,
+            ctypes.POINTER(XShmSegmentInfo),
+        ]
+        xext.XShmGetImage.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_ulong,
+            ctypes.POINTER(XImage),
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_ulong,
+        ]
+
+    libc = ctypes.CDLL(None, use_errno=True)
+    libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+    libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+    libc.shmat.restype = ctypes.c_void_p
+    libc.shmdt.argtypes = [ctypes.c_void_p]
+    libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+
+    _libs = (x11, xext, libc)
+    return _libs
+
+
+def _load_xtest():
+    """libXtst, or None if it is missing."""
+    global _xtest
+    if _xtest is not None:
+        return _xtest or None
+    xtest_path = ctypes.util.find_library("Xtst")
+    if not xtest_path:
+        _xtest = False
+        return None
+    xtest = ctypes.CDLL(xtest_path)
+    xtest.XTestQueryExtension.argtypes = [
+        ctypes.c_void_p,
+        ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(ctypes.c_int),
+    ]
+    xtest.XTestFakeMotionEvent.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_int,
+        ctypes.c_int,
+        ctypes.c_int,
+        ctypes.c_ulong,
+    ]
+    xtest.XTestFakeButtonEvent.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_uint,
+        ctypes.c_int,
+        ctypes.c_ulong,
+    ]
+    xtest.XTestFakeKeyEvent.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_uint,
+        ctypes.c_int,
+        ctypes.c_ulong,
+    ]
+    _xtest = xtest
+    return _xtest
+
+
+def to_png(
+    pixels,
+    width: int,
+    height: int,
+    bytes_per_line: int,
+    size: tuple[int, int] | None = None,
+    lsb_first: bool = True,
+) -> bytes:
+    """
+    Encode a 32 bits per pixel ZPixmap frame as PNG, resized to `size` with a
+    box (area-averaging) filter: the cheapest of Pillow's filters that uses
+    every source pixel when scaling down, so text stays readable.
+    """
+    image = Image.frombuffer(
+        "RGB",
+        (width, height),
+        pixels,
+        "raw",
+        "BGRX" if lsb_first else "XRGB",
+        bytes_per_line,
+        1,
+    )
+    if size is not None and size != (width, height):
+        image = image.resize(size, Image.Resampling.BOX)
+    buffer = io.BytesIO()
+    # Screens compress well even at the fastest level
+    image.save(buffer, "PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+def changed_pixels(before: Image.Image, after: Image.Image, level: int = 8) -> int:
+    """How many pixels of two grayscale frames differ by more than `level`."""
+    if before.size != after.size:
+        return after.width * after.height
+    difference = ImageChops.difference(before, after)
+    return difference.point(lambda value: 255 if value > level else 0).histogram()[255]
+
+
+class X11Capture:
+    """Captures the root window of one X display."""
+
+    def __init__(self, libs: tuple, display: int):
+        self._x11, self._xext, self._libc = libs
+        self._display = display
+        self._screen = self._x11.XDefaultScreen(display)
+        self._root = self._x11.XRootWindow(display, self._screen)
+        self._lock = threading.Lock()
+        self._shm_image = None
+        self._shm_info = None
+        self.width = 0
+        self.height = 0
+        self.uses_shm = False
+        self._setup()
+
+    def _setup(self) -> None:
+        self.width = self._x11.XDisplayWidth(self._display, self._screen)
+        self.height = self._x11.XDisplayHeight(self._display, self._screen)
+        self.uses_shm = self._xext is not None and bool(
+            self._xext.XShmQueryExtension(self._display)
+        )
+        if self.uses_shm:
+            self.uses_shm = self._attach_shm()
+
+    def _attach_shm(self) -> bool:
+        info = XShmSegmentInfo()
+        image = self._xext.XShmCreateImage(
+            self._display,
+            self._x11.XDefaultVisual(self._display, self._screen),
+            self._x11.XDefaultDepth(self._display, self._screen),
+            ZPIXMAP,
+            None,
+            ctypes.byref(info),
+            self.width,
+            self.height,
+        )
+        if not image:
+            return False
+        size = image.contents.bytes_per_line * image.contents.height
+        info.shmid = self._libc.shmget(IPC_PRIVATE, size, IPC_CREAT | 0o600)
+        if info.shmid < 0:
+            self._x11.XDestroyImage(image)
+            return False
+        address = self._libc.shmat(info.shmid, None, 0)
+        if address in (None, ctypes.c_void_p(-1).value):
+            self._libc.shmctl(info.shmid, IPC_RMID, None)
+            self._x11.XDestroyImage(image)
+            return False
+        info.shmaddr = address
+        info.readOnly = 0
+        image.contents.data = address
+
+        # A remote X server can't attach our segment; that error arrives asynchronously
+        del _x_errors[:]
+        attached = self._xext.XShmAttach(self._display, ctypes.byref(info))
+        self._x11.XSync(self._display, 0)
+        # The segment goes away once both sides have detached
+        self._libc.shmctl(info.shmid, IPC_RMID, None)
+        if not attached or _x_errors:
+            image.contents.data = None
+            self._x11.XDestroyImage(image)
+            self._libc.shmdt(address)
+            return False
+        self._shm_image, self._shm_info = image, info
+        return True
+
+    def _release_shm(self) -> None:
+        if self._shm_image is None:
+            return
+        self._xext.XShmDetach(self._display, ctypes.byref(self._shm_info))
+        self._x11.XSync(self._display, 0)
+        address = self._shm_info.shmaddr
+        self._shm_image.contents.data = None
+        self._x11.XDestroyImage(self._shm_image)
+        self._libc.shmdt(address)
+        self._shm_image = self._shm_info = None
+
+    def grab_png(self, size: tuple[int, int] | None = None) -> bytes:
+        """The whole screen as PNG, resized to `size` if given."""
+        return self._with_frame(
+            lambda image: to_png(
+                self._pixels(image),
+                image.width,
+                image.height,
+                image.bytes_per_line,
+                size,
+                image.byte_order == LSB_FIRST,
+            )
+        )
+
+    def grab_thumbnail(self, factor: int = 8) -> Image.Image:
+        """
+        A grayscale copy of the screen shrunk `factor` times, cheap enough to
+        take every few tens of milliseconds to see whether the screen changes.
+        """
+
+        def shrink(image: XImage) -> Image.Image:
+            # Channel order doesn't matter for comparing frames, so map the buffer as is
+            frame = Image.frombuffer(
+                "RGBX",
+                (image.width, image.height),
+                self._pixels(image),
+                "raw",
+                "RGBX",
+                image.bytes_per_line,
+                1,
+            )
+            return frame.reduce(factor).convert("L")
+
+        return self._with_frame(shrink)
+
+    def _with_frame(self, use: Callable[[XImage], T]) -> T:
+        """Grab the screen and pass the image to `use` while it is valid."""
+        with self._lock:
+            width = self._x11.XDisplayWidth(self._display, self._screen)
+            height = self._x11.XDisplayHeight(self._display, self._screen)
+            if (width, height) != (self.width, self.height):
+                # The screen was resized, e.g. by xrandr
+                self._release_shm()
+                self._setup()
+
+            if self.uses_shm:
+                if not self._xext.XShmGetImage(
+                    self._display, self._root, self._shm_image, 0, 0, ALL_PLANES
+                ):
+                    raise OSError("XShmGetImage failed")
+                return use(self._shm_image.contents)
+
+            image_pointer = self._x11.XGetImage(
+                self._display,
+                self._root,
+                0,
+                0,
+                self.width,
+                self.height,
+                ALL_PLANES,
+                ZPIXMAP,
+            )
+            if not image_pointer:
+                raise OSError("XGetImage failed")
+            try:
+                return use(image_pointer.contents)
+            finally:
+                self._x11.XDestroyImage(image_pointer)
+
+    def _pixels(self, image: XImage) -> ctypes.Array:
+        if image.bits_per_pixel != 32:
+            raise OSError(
+                f"Unsupported screen format: {image.bits_per_pixel} bits per pixel"
+            )
+        return (ctypes.c_char * (image.bytes_per_line * image.height)).from_address(
+            image.data
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._release_shm()
+            self._x11.XCloseDisplay(self._display)
+
+
+def open_capture(display_name: str | None = None) -> X11Capture | None:
+    """A capture of `display_name` (default $DISPLAY), or None if it can't be opened."""
+    libs = _load_libs()
+    if libs is None:
+        return None
+    display = libs[0].XOpenDisplay(display_name.encode() if display_name else None)
+    if not display:
+        return None
+    return X11Capture(libs, display)
+
+
+def parse_xdotool(
+    command: str, keystroke: Callable[[str], KeyStroke | None]
+) -> list[Step] | None:
+    """
+    The input steps of an xdotool command line (without the leading `xdotool`),
+    or None if it uses anything but mousemove --sync, click --repeat/--delay,
+    mousedown, mouseup, key --delay, keydown, keyup, sleep and
+    getmouselocation --shell, or names a key `keystroke` can't resolve.
+    """
+    if SHELL_SYNTAX.intersection(command):
+        return None
+    try:
+        args = shlex.split(command)
+    except ValueError:
+        return None
+
+    steps: list[Step] = []
+    index = 0
+
+    def options(allowed: set[str]) -> dict[str, str] | None:
+        nonlocal index
+        found = {}
+        while index < len(args) and args[index].startswith("--"):
+            option = args[index]
+            index += 1
+            if option == "--":
+                break
+            if option not in allowed:
+                return None
+            if option in ("--sync", "--shell"):
+                found[option] = ""
+            elif index < len(args):
+                found[option] = args[index]
+                index += 1
+            else:
+                return None
+        return found
+
+    def keys() -> list[list[int]] | None:
+        nonlocal index
+        sequences = []
+        while index < len(args) and args[index] not in XDOTOOL_COMMANDS:
+            keycodes: list[int] = []
+            for name in args[index].split("+"):
+                stroke = keystroke(name)
+                if stroke is None:
+                    return None
+                keycode, shifted = stroke
+                if shifted:
+                    shift = keystroke("Shift_L")
+                    if shift is None:
+                        return None
+                    keycodes.append(shift[0])
+                keycodes.append(keycode)
+            sequences.append(list(dict.fromkeys(keycodes)))
+            index += 1
+        return sequences or None
+
+    try:
+        while index < len(args):
+            name = args[index]
+            index += 1
+            if name == "mousemove":
+                if options({"--sync"}) is None:
+                    return None
+                x, y = int(args[index]), int(args[index + 1])
+                index += 2
+                steps.append(("motion", x, y))
+            elif name == "click":
+                found = options({"--repeat", "--delay"})
+                if found is None:
+                    return None
+                repeat = int(found.get("--repeat", 1))
+                delay = int(found.get("--delay", CLICK_DELAY_MS)) / 1000
+                button = int(args[index])
+                index += 1
+                for count in range(repeat):
+                    if count:
+                        steps.append(("sleep", delay))
+                    steps += [("button", button, True), ("button", button, False)]
+            elif name in ("mousedown", "mouseup"):
+                steps.append(("button", int(args[index]), name == "mousedown"))
+                index += 1
+            elif name == "key":
+                found = options({"--delay"})
+                sequences = keys() if found is not None else None
+                if sequences is None:
+                    return None
+                delay = int(found.get("--delay", KEY_DELAY_MS)) / 1000
+                for count, keycodes in enumerate(sequences):
+                    if count:
+                        steps.append(("sleep", delay))
+                    steps += [("key", keycode, True) for keycode in keycodes]
+                    steps += [("key", keycode, False) for keycode in keycodes[::-1]]
+            elif name in ("keydown", "keyup"):
+                sequences = keys() if options(set()) is not None else None
+                if sequences is None:
+                    return None
+                for keycodes in sequences:
+                    if name == "keydown":
+                        steps += [("key", keycode, True) for keycode in keycodes]
+                    else:
+                        steps += [("key", keycode, False) for keycode in keycodes[::-1]]
+            elif name == "sleep":
+                steps.append(("sleep", float(args[index])))
+                index += 1
+            elif name == "getmouselocation":
+                found = options({"--shell"})
+                if found is None or "--shell" not in found:
+                    return None
+                steps.append(("location",))
+            else:
+                return None
+    except (IndexError, ValueError):
+        return None
+    return steps or None
+
+
+class XTestInjector:
+    """Sends pointer and keyboard input to one X display through XTest."""
+
+    def __init__(self, libs: tuple, xtest, display: int):
+        self._x11 = libs[0]
+        self._xtest = xtest
+        self._display = display
+        self._screen = self._x11.XDefaultScreen(display)
+        self._root = self._x11.XRootWindow(display, self._screen)
+        self._lock = threading.Lock()
+        self._keystrokes: dict[str, KeyStroke | None] = {}
+
+    def keystroke(self, name: str) -> KeyStroke | None:
+        """The keycode for an xdotool key name, or None if the keyboard lacks it."""
+        if name in self._keystrokes:
+            return self._keystrokes[name]
+        keysym = self._x11.XStringToKeysym(
+            KEY_ALIASES.get(name.lower(), name).encode()
+        )
+        if keysym == NO_SYMBOL and len(name) == 1:
+            # Unicode keysyms; Latin-1 keysyms are the code points themselves
+            keysym = ord(name) if ord(name) < 0x100 else 0x01000000 | ord(name)
+        stroke = None
+        with self._lock:
+            keycode = self._x11.XKeysymToKeycode(self._display, keysym)
+            if keysym != NO_SYMBOL and keycode:
+                # Anything but the first two levels needs a remapped keycode,
+                # which is left to xdotool
+                for level in (0, 1):
+                    if (
+                        self._x11.XKeycodeToKeysym(self._display, keycode, level)
+                        == keysym
+                    ):
+                        stroke = (keycode, level == 1)
+                        break
+        self._keystrokes[name] = stroke
+        return stroke
+
+    def parse(self, command: str) -> list[Step] | None:
+        return parse_xdotool(command, self.keystroke)
+
+    def execute(self, command: str) -> str | None:
+        """
+        Run an xdotool command line and return what xdotool would print, or
+        None, with nothing sent, if it is beyond what this can run.
+        """
+        steps = self.parse(command)
+        if steps is None:
+            return None
+        return self.run(steps)
+
+    def type_text(self, text: str, delay: float) -> bool:
+        """
+        Type `text` with `delay` seconds per keystroke, half of it after the
+        key goes down and half after it comes up, as `xdotool type` does.
+        Returns False, with nothing typed, if a character isn't on the
+        keyboard map.
+        """
+        strokes = []
+        for char in text:
+            stroke = self.keystroke(TYPED_KEYS.get(char, char))
+            if stroke is None:
+                return False
+            strokes.append(stroke)
+        shift = self.keystroke("Shift_L")
+        if shift is None and any(shifted for _, shifted in strokes):
+            return False
+
+        pause: list[Step] = [("sleep", delay / 2)] if delay > 0 else []
+        steps: list[Step] = []
+        for keycode, shifted in strokes:
+            if shifted:
+                steps.append(("key", shift[0], True))
+            steps += [("key", keycode, True), *pause, ("key", keycode, False)]
+            if shifted:
+                steps.append(("key", shift[0], False))
+            steps += pause
+        self.run(steps)
+        return True
+
+    def focused_window_class(self) -> str | None:
+        """The WM_CLASS class of the window with the keyboard focus, if any."""
+        focus, revert = ctypes.c_ulong(), ctypes.c_int()
+        with self._lock:
+            self._x11.XGetInputFocus(
+                self._display, ctypes.byref(focus), ctypes.byref(revert)
+            )
+            window = focus.value
+            # The focus is often a child of the window carrying WM_CLASS
+            while window > POINTER_ROOT and window != self._root:
+                hint = XClassHint()
+                if self._x11.XGetClassHint(self._display, window, ctypes.byref(hint)):
+                    window_class = b""
+                    if hint.res_class:
+                        window_class = ctypes.string_at(hint.res_class)
+                    for name in (hint.res_name, hint.res_class):
+                        if name:
+                            self._x11.XFree(name)
+                    return window_class.decode(errors="replace") or None
+                root, parent = ctypes.c_ulong(), ctypes.c_ulong()
+                children, count = ctypes.c_void_p(), ctypes.c_uint()
+                if not self._x11.XQueryTree(
+                    self._display,
+                    window,
+                    ctypes.byref(root),
+                    ctypes.byref(parent),
+                    ctypes.byref(children),
+                    ctypes.byref(count),
+                ):
+                    return None
+                if children:
+                    self._x11.XFree(children)
+                window = parent.value
+        return None
+
+    def run(self, steps: list[Step]) -> str:
+        output = []
+        del _x_errors[:]
+        for step in steps:
+            if step[0] == "sleep":
+                # Let other input through while holding keys, as xdotool would
+                time.sleep(step[1])
+                continue
+            with self._lock:
+                if step[0] == "motion":
+                    sent = self._xtest.XTestFakeMotionEvent(
+                        self._display, CURRENT_SCREEN, step[1], step[2], 0
+                    )
+                    # Like --sync: return once the server has moved the pointer
+                    self._x11.XSync(self._display, 0)
+                elif step[0] == "button":
+                    sent = self._xtest.XTestFakeButtonEvent(
+                        self._display, step[1], step[2], 0
+                    )
+                elif step[0] == "key":
+                    sent = self._xtest.XTestFakeKeyEvent(
+                        self._display, step[1], step[2], 0
+                    )
+                else:
+                    sent = True
+                    output.append(self._pointer_location())
+                self._x11.XFlush(self._display)
+            if not sent:
+                raise OSError(f"XTest could not send {step}")
+        with self._lock:
+            self._x11.XSync(self._display, 0)
+        if _x_errors:
+            raise OSError(f"X error {_x_errors[0]} while sending input")
+        return "".join(output)
+
+    def _pointer_location(self) -> str:
+        root, child = ctypes.c_ulong(), ctypes.c_ulong()
+        root_x, root_y = ctypes.c_int(), ctypes.c_int()
+        window_x, window_y = ctypes.c_int(), ctypes.c_int()
+        mask = ctypes.c_uint()
+        self._x11.XQueryPointer(
+            self._display,
+            self._root,
+            ctypes.byref(root),
+            ctypes.byref(child),
+            ctypes.byref(root_x),
+            ctypes.byref(root_y),
+            ctypes.byref(window_x),
+            ctypes.byref(window_y),
+            ctypes.byref(mask),
+        )
+        return (
+            f"X={root_x.value}\nY={root_y.value}\n"
+            f"SCREEN={self._screen}\nWINDOW={child.value}\n"
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._x11.XCloseDisplay(self._display)
+
+
+def open_injector(display_name: str | None = None) -> XTestInjector | None:
+    """An injector for `display_name` (default $DISPLAY), or None without XTest."""
+    libs = _load_libs()
+    xtest = _load_xtest()
+    if libs is None or xtest is None:
+        return None
+    display = libs[0].XOpenDisplay(display_name.encode() if display_name else None)
+    if not display:
+        return None
+    unused = ctypes.c_int()
+    if not xtest.XTestQueryExtension(
+        display,
+        ctypes.byref(unused),
+        ctypes.byref(unused),
+        ctypes.byref(unused),
+        ctypes.byref(unused),
+    ):
+        libs[0].XCloseDisplay(display)
+        return None
+    return XTestInjector(libs, xtest, display)
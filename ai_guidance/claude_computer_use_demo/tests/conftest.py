@@ -7,6 +7,25 @@ import pytest
 @pytest.fixture(autouse=True)
 def mock_screen_dimensions():
     with mock.patch.dict(
-        os.environ, {"HEIGHT": "768", "WIDTH": "1024", "DISPLAY_NUM": "1"}
+        os.environ,
+        {
+            "HEIGHT": "768",
+            "WIDTH": "1024",
+            "DISPLAY_NUM": "1",
+            "X11_IN_PROCESS": "true",
+        },
+    ):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def no_in_process_display():
+    """
+    Keep tests off any live X display; tests of the in-process paths opt in by
+    setting a fake `_capture` or `_injector` on the tool.
+    """
+    with (
+        mock.patch("computer_use_demo.tools.computer.open_capture", return_value=None),
+        mock.patch("computer_use_demo.tools.computer.open_injector", return_value=None),
     ):
         yield
@@ -1,6 +1,9 @@
-from unittest.mock import AsyncMock, patch
+import base64
+import io
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from PIL import Image
 
 from computer_use_demo.tools.computer import (
     ComputerTool20241022,
@@ -9,6 +12,7 @@ from computer_use_demo.tools.computer import (
     ToolError,
     ToolResult,
 )
+from computer_use_demo.tools.x11 import XTestInjector, parse_xdotool, to_png
 
 
 @pytest.fixture(params=[ComputerTool20241022, ComputerTool20250124])
@@ -55,6 +59,395 @@ async def test_computer_tool_screenshot(computer_tool):
         assert result.base64_image == "base64_screenshot"
 
 
+def test_computer_tool_in_process_x11_is_opt_in(monkeypatch):
+    monkeypatch.delenv("X11_IN_PROCESS")
+    tool = ComputerTool20250124()
+    with (
+        patch("computer_use_demo.tools.computer.open_capture") as mock_capture,
+        patch("computer_use_demo.tools.computer.open_injector") as mock_injector,
+    ):
+        assert tool._open_capture() is None
+        assert tool._open_injector() is None
+    mock_capture.assert_not_called()
+    mock_injector.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_screenshot_in_process(computer_tool):
+    computer_tool.width = 1920
+    computer_tool.height = 1080
+    capture = MagicMock()
+    capture.grab_png.return_value = b"png bytes"
+    computer_tool._capture = capture
+    with patch.object(computer_tool, "shell", new_callable=AsyncMock) as mock_shell:
+        result = await computer_tool.screenshot()
+        mock_shell.assert_not_called()
+    capture.grab_png.assert_called_once_with((1366, 768))
+    assert result.base64_image == base64.b64encode(b"png bytes").decode()
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_screenshot_falls_back_without_display(computer_tool):
+    with (
+        patch("computer_use_demo.tools.computer.open_capture", return_value=None),
+        patch.object(computer_tool, "shell", new_callable=AsyncMock) as mock_shell,
+    ):
+        mock_shell.return_value = ToolResult(error="no display")
+        with pytest.raises(ToolError, match="Failed to take screenshot"):
+            await computer_tool.screenshot()
+        assert "DISPLAY=:1 " in mock_shell.call_args_list[0][0][0]
+    assert computer_tool._capture_failed
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_screenshot_falls_back_on_capture_error(computer_tool):
+    capture = MagicMock()
+    capture.grab_png.side_effect = OSError("Unsupported screen format")
+    computer_tool._capture = capture
+    with patch.object(computer_tool, "shell", new_callable=AsyncMock) as mock_shell:
+        mock_shell.return_value = ToolResult()
+        with pytest.raises(ToolError, match="Failed to take screenshot"):
+            await computer_tool.screenshot()
+        mock_shell.assert_called()
+    assert computer_tool._open_capture() is None
+
+
+class FakeCapture:
+    """Returns the given thumbnails in turn, repeating the last one."""
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.grabs = 0
+
+    def grab_thumbnail(self):
+        self.grabs += 1
+        return self.frames.pop(0) if len(self.frames) > 1 else self.frames[0]
+
+
+def thumbnail(color=0, caret=False):
+    image = Image.new("L", (64, 48), color)
+    if caret:
+        image.putpixel((10, 10), 255 - color)
+        image.putpixel((10, 11), 255 - color)
+    return image
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_settles_once_screen_is_stable(computer_tool):
+    computer_tool._capture = FakeCapture(
+        [thumbnail(0), thumbnail(255), thumbnail(0), thumbnail(128)]
+    )
+    waited = await computer_tool.wait_for_screen_to_settle()
+    assert computer_tool._settle_window <= waited < 1.0
+    assert computer_tool._capture.grabs >= 4
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_settle_waits_for_late_repaint(computer_tool):
+    # The repaint starts well after a settle window without any change
+    computer_tool._capture = FakeCapture(
+        [thumbnail(0)] * 10 + [thumbnail(255), thumbnail(128)]
+    )
+    waited = await computer_tool.wait_for_screen_to_settle()
+    assert computer_tool._capture.grabs >= 12
+    assert waited < 1.0
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_settle_waits_quietly_without_change(computer_tool):
+    computer_tool._capture = FakeCapture([thumbnail()])
+    waited = await computer_tool.wait_for_screen_to_settle()
+    assert computer_tool._settle_quiet_wait <= waited < 1.0
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_settle_ignores_blinking_caret(computer_tool):
+    computer_tool._capture = FakeCapture([thumbnail(), thumbnail(caret=True)] * 20)
+    waited = await computer_tool.wait_for_screen_to_settle()
+    assert waited < 1.0
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_settle_gives_up_at_screenshot_delay(computer_tool):
+    computer_tool._screenshot_delay = 0.3
+    computer_tool._capture = FakeCapture([thumbnail(0), thumbnail(255)] * 100)
+    waited = await computer_tool.wait_for_screen_to_settle()
+    assert 0.3 <= waited < 0.6
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_settle_waits_full_delay_without_capture(computer_tool):
+    computer_tool._screenshot_delay = 0.2
+    with patch("computer_use_demo.tools.computer.open_capture", return_value=None):
+        waited = await computer_tool.wait_for_screen_to_settle()
+    assert waited >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_shell_settles_before_screenshot(computer_tool):
+    with (
+        patch(
+            "computer_use_demo.tools.computer.run",
+            new_callable=AsyncMock,
+            return_value=(0, "done", ""),
+        ),
+        patch.object(
+            computer_tool, "wait_for_screen_to_settle", new_callable=AsyncMock
+        ) as mock_settle,
+        patch.object(
+            computer_tool, "screenshot", new_callable=AsyncMock
+        ) as mock_screenshot,
+    ):
+        mock_screenshot.return_value = ToolResult(base64_image="base64_screenshot")
+        result = await computer_tool.shell("xdotool click 1")
+        mock_settle.assert_awaited_once()
+        assert result.output == "done"
+        assert result.base64_image == "base64_screenshot"
+
+
+def test_to_png_converts_and_resizes():
+    # 4x2 BGRX frame, left half blue and right half red, 4 bytes of row padding
+    row = bytes([255, 0, 0, 0] * 2 + [0, 0, 255, 0] * 2) + bytes(4)
+
+    image = Image.open(io.BytesIO(to_png(row * 2, 4, 2, len(row))))
+    assert image.format == "PNG"
+    assert image.size == (4, 2)
+    assert image.convert("RGB").getpixel((0, 0)) == (0, 0, 255)
+    assert image.convert("RGB").getpixel((3, 1)) == (255, 0, 0)
+
+    image = Image.open(io.BytesIO(to_png(row * 2, 4, 2, len(row), size=(2, 1))))
+    assert image.size == (2, 1)
+
+
+KEYSTROKES = {
+    "a": (38, False),
+    "A": (38, True),
+    "Shift_L": (50, False),
+    "shift": (50, False),
+    "ctrl": (37, False),
+    "Return": (36, False),
+}
+
+
+def test_parse_xdotool_mouse_commands():
+    assert parse_xdotool(
+        "mousedown 1 mousemove --sync 5 6 mouseup 1", KEYSTROKES.get
+    ) == [
+        ("button", 1, True),
+        ("motion", 5, 6),
+        ("button", 1, False),
+    ]
+    assert parse_xdotool("click --repeat 2 --delay 10 1", KEYSTROKES.get) == [
+        ("button", 1, True),
+        ("button", 1, False),
+        ("sleep", 0.01),
+        ("button", 1, True),
+        ("button", 1, False),
+    ]
+    assert parse_xdotool("getmouselocation --shell", KEYSTROKES.get) == [("location",)]
+
+
+def test_parse_xdotool_key_commands():
+    assert parse_xdotool("key -- ctrl+A Return", KEYSTROKES.get) == [
+        ("key", 37, True),
+        ("key", 50, True),
+        ("key", 38, True),
+        ("key", 38, False),
+        ("key", 50, False),
+        ("key", 37, False),
+        ("sleep", 0.012),
+        ("key", 36, True),
+        ("key", 36, False),
+    ]
+    assert parse_xdotool(
+        " mousemove --sync 1 2 keydown shift click --repeat 2 5 keyup shift",
+        KEYSTROKES.get,
+    ) == [
+        ("motion", 1, 2),
+        ("key", 50, True),
+        ("button", 5, True),
+        ("button", 5, False),
+        ("sleep", 0.1),
+        ("button", 5, True),
+        ("button", 5, False),
+        ("key", 50, False),
+    ]
+    assert parse_xdotool("keydown 'a' sleep 0.5 keyup 'a'", KEYSTROKES.get) == [
+        ("key", 38, True),
+        ("sleep", 0.5),
+        ("key", 38, False),
+    ]
+
+
+@pytest.mark.parametrize(
+    "command",
+    [
+        "type --delay 12 -- 'Hello'",
+        "key -- unknown_key",
+        "key --clearmodifiers a",
+        "key -- a; reboot",
+        "getmouselocation",
+        "mousemove --sync 1",
+        "key --",
+    ],
+)
+def test_parse_xdotool_leaves_other_commands_to_xdotool(command):
+    assert parse_xdotool(command, KEYSTROKES.get) is None
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_shell_injects_xdotool_commands(computer_tool):
+    injector = MagicMock()
+    injector.execute.return_value = "X=10\nY=20\nSCREEN=0\nWINDOW=0\n"
+    computer_tool._injector = injector
+    with patch(
+        "computer_use_demo.tools.computer.run", new_callable=AsyncMock
+    ) as mock_run:
+        result = await computer_tool(action="cursor_position")
+        mock_run.assert_not_called()
+    injector.execute.assert_called_once_with("getmouselocation --shell")
+    assert result.output == "X=10,Y=20"
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_shell_runs_what_the_injector_cannot(computer_tool):
+    injector = MagicMock()
+    injector.execute.return_value = None
+    computer_tool._injector = injector
+    with patch(
+        "computer_use_demo.tools.computer.run",
+        new_callable=AsyncMock,
+        return_value=(0, "", ""),
+    ) as mock_run:
+        await computer_tool.shell(
+            f"{computer_tool.xdotool} key --clearmodifiers a", take_screenshot=False
+        )
+        await computer_tool.shell("echo hi", take_screenshot=False)
+    assert [call.args[0] for call in mock_run.call_args_list] == [
+        f"{computer_tool.xdotool} key --clearmodifiers a",
+        "echo hi",
+    ]
+    injector.execute.assert_called_once_with("key --clearmodifiers a")
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_shell_reports_injection_errors(computer_tool):
+    injector = MagicMock()
+    injector.execute.side_effect = OSError("X error 2 while sending input")
+    computer_tool._injector = injector
+    result = await computer_tool.shell(
+        f"{computer_tool.xdotool} click 1", take_screenshot=False
+    )
+    assert "X error 2" in (result.error or "")
+    assert computer_tool._open_injector() is None
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_type_fast(computer_tool):
+    injector = MagicMock()
+    injector.type_text.return_value = True
+    computer_tool._injector = injector
+    with (
+        patch.object(computer_tool, "shell", new_callable=AsyncMock) as mock_shell,
+        patch.object(
+            computer_tool, "screenshot", new_callable=AsyncMock
+        ) as mock_screenshot,
+    ):
+        mock_screenshot.return_value = ToolResult(base64_image="base64_screenshot")
+        result = await computer_tool(action="type", text="x" * 120)
+        mock_shell.assert_not_called()
+    assert [call.args for call in injector.type_text.call_args_list] == [
+        ("x" * 50, 0.001),
+        ("x" * 50, 0.001),
+        ("x" * 20, 0.001),
+    ]
+    assert result.base64_image == "base64_screenshot"
+    assert "Typed 120 characters" in (result.system or "")
+    assert "characters/s, 120 with fast typing" in (result.system or "")
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_type_falls_back_per_chunk(computer_tool):
+    injector = MagicMock()
+    injector.type_text.side_effect = [True, False]
+    computer_tool._injector = injector
+    with (
+        patch.object(computer_tool, "shell", new_callable=AsyncMock) as mock_shell,
+        patch.object(computer_tool, "screenshot", new_callable=AsyncMock),
+    ):
+        mock_shell.return_value = ToolResult()
+        result = await computer_tool(action="type", text="a" * 50 + "é" * 10)
+        mock_shell.assert_called_once_with(
+            f"{computer_tool.xdotool} type --delay 12 -- '{'é' * 10}'",
+            take_screenshot=False,
+        )
+    assert "50 with fast typing" in (result.system or "")
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_type_slowly_into_listed_windows(computer_tool):
+    injector = MagicMock()
+    injector.focused_window_class.return_value = "Xfreerdp"
+    computer_tool._injector = injector
+    computer_tool.slow_typing_window_classes = {"xfreerdp"}
+    with (
+        patch.object(computer_tool, "shell", new_callable=AsyncMock) as mock_shell,
+        patch.object(computer_tool, "screenshot", new_callable=AsyncMock),
+    ):
+        mock_shell.return_value = ToolResult()
+        await computer_tool(action="type", text="Hello")
+        mock_shell.assert_called_once()
+    injector.type_text.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_type_stops_injecting_after_error(computer_tool):
+    injector = MagicMock()
+    injector.type_text.side_effect = OSError("X error 2 while sending input")
+    computer_tool._injector = injector
+    with (
+        patch.object(computer_tool, "shell", new_callable=AsyncMock) as mock_shell,
+        patch.object(computer_tool, "screenshot", new_callable=AsyncMock),
+    ):
+        mock_shell.return_value = ToolResult()
+        result = await computer_tool(action="type", text="y" * 60)
+        mock_shell.assert_called_once()
+    assert injector.type_text.call_count == 1
+    assert "X error 2" in (result.error or "")
+
+
+def test_xtest_injector_types_keystrokes():
+    keycodes = {b"Shift_L": (50, 0xFFE1), b"Return": (36, 0xFF0D)}
+    keycodes.update({char.encode(): (38, ord(char)) for char in "aA"})
+    x11, xtest = MagicMock(), MagicMock()
+    x11.XStringToKeysym.side_effect = lambda name: keycodes.get(name, (0, 0))[1]
+    x11.XKeysymToKeycode.side_effect = lambda display, keysym: {
+        keysym: keycode for keycode, keysym in keycodes.values()
+    }.get(keysym, 0)
+    x11.XKeycodeToKeysym.side_effect = lambda display, keycode, level: {
+        (50, 0): 0xFFE1,
+        (36, 0): 0xFF0D,
+        (38, 0): ord("a"),
+        (38, 1): ord("A"),
+    }.get((keycode, level), 0)
+    injector = XTestInjector((x11, None, None), xtest, 1)
+
+    assert injector.type_text("aA\n", 0)
+    assert [call.args[1:3] for call in xtest.XTestFakeKeyEvent.call_args_list] == [
+        (38, True),
+        (38, False),
+        (50, True),
+        (38, True),
+        (38, False),
+        (50, False),
+        (36, True),
+        (36, False),
+    ]
+    xtest.XTestFakeKeyEvent.reset_mock()
+    assert not injector.type_text("a€", 0)
+    xtest.XTestFakeKeyEvent.assert_not_called()
+
+
 @pytest.mark.asyncio
 async def test_computer_tool_scaling(computer_tool):
     computer_tool._scaling_enabled = True
@@ -0,0 +1,113 @@
+"""
+Advertising stalled jobs with a kind 1 note.
+
+A job that gets no kind 7000 offer within a window after its 5109 is
+broadcast is announced as a regular note on a broader set of relays, where
+humans who don't watch DVM requests may see it. Notes are rate-limited and
+near-identical descriptions are only announced once per window, so a burst
+of stuck agents doesn't spam anyone. Stalled jobs that were not announced
+(because of the limits) are the comparison group for whether announcing
+shortens the time to the first offer.
+"""
+
+import statistics
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+try:
+    from .answer_cache import normalize_description
+except ImportError:
+    from answer_cache import normalize_description
+
+# Note text is cut to this many characters of the job description
+MAX_DESCRIPTION_CHARS = 200
+
+
+def compose_note(
+    description: str,
+    job_uri: str,
+    price_sats: Optional[int],
+    hashtags: List[str],
+    image_url: Optional[str] = None,
+) -> str:
+    """The text of a job announcement."""
+    summary = description.strip()
+    if len(summary) > MAX_DESCRIPTION_CHARS:
+        summary = summary[: MAX_DESCRIPTION_CHARS - 1].rstrip() + "…"
+    lines = [f"An AI agent is stuck and needs a human to look at its screen: \"{summary}\""]
+    if price_sats:
+        lines.append(f"Pays up to {price_sats} sats. Send an offer on the job:")
+    else:
+        lines.append("Send an offer on the job:")
+    lines.append(job_uri)
+    if image_url:
+        lines.append(image_url)
+    if hashtags:
+        lines.append(" ".join(f"#{tag}" for tag in hashtags))
+    return "\n".join(lines)
+
+
+class Amplifier:
+    """Decides which stalled jobs get announced and tracks what happened to them."""
+
+    def __init__(self, min_interval_seconds: float, dedup_window_seconds: float):
+        self.min_interval_seconds = min_interval_seconds
+        self.dedup_window_seconds = dedup_window_seconds
+        self._lock = threading.Lock()
+        self.last_posted_at = 0.0
+        # normalized description -> when it was last announced
+        self.recent: Dict[str, float] = {}
+        self.counts = {"not_stalled": 0, "posted": 0, "rate_limited": 0, "duplicate": 0, "failed": 0}
+        # decision -> ms from stall to first offer, None where no offer ever came
+        self.outcomes: Dict[str, List[Optional[float]]] = {}
+
+    def admit(self, description: str) -> str:
+        """
+        Decide on a stalled job: "posted", or why not ("rate_limited", "duplicate").
+        A "posted" counts against the limits right away.
+        """
+        key = normalize_description(description)
+        now = time.time()
+        with self._lock:
+            self.recent = {
+                k: at for k, at in self.recent.items() if now - at < self.dedup_window_seconds
+            }
+            if key in self.recent:
+                decision = "duplicate"
+            elif now - self.last_posted_at < self.min_interval_seconds:
+                decision = "rate_limited"
+            else:
+                decision = "posted"
+                self.last_posted_at = now
+                self.recent[key] = now
+            self.counts[decision] += 1
+            return decision
+
+    def post_failed(self):
+        with self._lock:
+            self.counts["posted"] -= 1
+            self.counts["failed"] += 1
+
+    def record_not_stalled(self):
+        with self._lock:
+            self.counts["not_stalled"] += 1
+
+    def record_outcome(self, decision: str, offer_after_ms: Optional[float]):
+        """What happened to a stalled job: ms from the stall to its first offer, None if none came."""
+        with self._lock:
+            self.outcomes.setdefault(decision, []).append(offer_after_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        """Decision counts, and per decision how often and how soon stalled jobs got an offer."""
+        with self._lock:
+            groups = {}
+            for decision, outcomes in self.outcomes.items():
+                offered = [ms for ms in outcomes if ms is not None]
+                groups[decision] = {
+                    "stalled_jobs": len(outcomes),
+                    "got_offer": len(offered),
+                    "offer_rate": round(len(offered) / len(outcomes), 3),
+                    "median_ms_to_offer": round(statistics.median(offered), 1) if offered else None,
+                }
+            return {**self.counts, "after_stall": groups}
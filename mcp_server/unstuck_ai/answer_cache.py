@@ -0,0 +1,206 @@
+"""
+Local cache of past 6109 answers, keyed by a perceptual hash of the screenshot
+plus a normalized description.
+
+Agents keep hitting the same cookie banners, captchas and login dialogs; a
+near-duplicate screenshot with the same description can reuse the actions a
+human already sent instead of paying for a new job.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("unstuck-ai")
+
+try:
+    from PIL import Image
+
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+def perceptual_hash(image_path: str) -> Optional[int]:
+    """
+    Compute a 64-bit difference hash (dHash) of an image.
+
+    Visually similar screenshots (re-encoded, slightly shifted, a blinking
+    cursor) end up a few bits apart, unlike a cryptographic hash.
+
+    Returns:
+        The hash as an int, or None if Pillow is missing or the image can't be read
+    """
+    if not PIL_AVAILABLE:
+        return None
+    try:
+        with Image.open(image_path) as image:
+            small = image.convert("L").resize((9, 8), Image.LANCZOS)
+            pixels = list(small.getdata())
+    except Exception as e:
+        logger.warning(f"Could not hash screenshot {image_path}: {str(e)}")
+        return None
+
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return bin(a ^ b).count("1")
+
+
+def normalize_description(description: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    words = re.sub(r"[^a-z0-9]+", " ", description.lower()).split()
+    return " ".join(words)
+
+
+class AnswerCache:
+    """Near-duplicate lookup of past job results with LRU/TTL eviction and hit metrics."""
+
+    def __init__(
+        self,
+        path: str,
+        max_distance: int = 5,
+        max_entries: int = 500,
+        ttl_seconds: float = 30 * 86400,
+    ):
+        self.path = path
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # normalized description -> entries with that description
+        self.entries: Dict[str, List[Dict[str, Any]]] = {}
+        self.metrics = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0, "sats_saved": 0}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                saved = json.load(f)
+            self.entries = saved.get("entries", {})
+            self.metrics.update(saved.get("metrics", {}))
+            logger.info(f"Loaded {self._size()} cached answers from {self.path}")
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable answer cache {self.path}: {str(e)}")
+
+    def _save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"entries": self.entries, "metrics": self.metrics}, f)
+        os.replace(tmp_path, self.path)
+
+    def _size(self) -> int:
+        return sum(len(group) for group in self.entries.values())
+
+    def lookup(self, image_hash: int, description: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the closest cached answer within `max_distance` bits.
+
+        Returns:
+            The cached entry with a "distance" key added, or None on a miss
+        """
+        key = normalize_description(description)
+        now = time.time()
+        with self._lock:
+            best = None
+            best_distance = self.max_distance + 1
+            for entry in self.entries.get(key, []):
+                if now - entry["created_at"] > self.ttl_seconds:
+                    continue
+                distance = hamming_distance(image_hash, int(entry["hash"], 16))
+                if distance < best_distance:
+                    best, best_distance = entry, distance
+
+            if best is None:
+                # Kept in memory only; written with the next hit or store
+                self.metrics["misses"] += 1
+                return None
+
+            best["last_hit_at"] = now
+            best["hits"] = best.get("hits", 0) + 1
+            self.metrics["hits"] += 1
+            self.metrics["sats_saved"] += best.get("price_sats") or 0
+            self._save()
+            return {**best, "distance": best_distance}
+
+    def store(
+        self,
+        image_hash: int,
+        description: str,
+        content: str,
+        job_id: str,
+        price_sats: Optional[int] = None,
+    ):
+        """Remember the result of a completed job."""
+        key = normalize_description(description)
+        now = time.time()
+        with self._lock:
+            group = self.entries.setdefault(key, [])
+            # Replace an exact duplicate instead of keeping both
+            group[:] = [e for e in group if int(e["hash"], 16) != image_hash]
+            group.append(
+                {
+                    "hash": f"{image_hash:016x}",
+                    "content": content,
+                    "job_id": job_id,
+                    "price_sats": price_sats,
+                    "created_at": now,
+                    "last_hit_at": now,
+                    "hits": 0,
+                }
+            )
+            self.metrics["stored"] += 1
+            self._evict(now)
+            self._save()
+
+    def _evict(self, now: float):
+        """Drop expired entries, then the least recently used ones above max_entries."""
+        for key in list(self.entries):
+            fresh = [e for e in self.entries[key] if now - e["created_at"] <= self.ttl_seconds]
+            self.metrics["evicted"] += len(self.entries[key]) - len(fresh)
+            if fresh:
+                self.entries[key] = fresh
+            else:
+                del self.entries[key]
+
+        overflow = self._size() - self.max_entries
+        if overflow <= 0:
+            return
+        oldest = sorted(
+            (entry["last_hit_at"], key, id(entry))
+            for key, group in self.entries.items()
+            for entry in group
+        )[:overflow]
+        drop = {(key, entry_id) for _, key, entry_id in oldest}
+        for key in list(self.entries):
+            self.entries[key] = [e for e in self.entries[key] if (key, id(e)) not in drop]
+            if not self.entries[key]:
+                del self.entries[key]
+        self.metrics["evicted"] += overflow
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate, sats saved and size of the cache."""
+        with self._lock:
+            lookups = self.metrics["hits"] + self.metrics["misses"]
+            return {
+                **self.metrics,
+                "hit_rate": round(self.metrics["hits"] / lookups, 3) if lookups else 0.0,
+                "entries": self._size(),
+                "max_entries": self.max_entries,
+                "max_distance": self.max_distance,
+            }
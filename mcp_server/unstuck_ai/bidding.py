@@ -0,0 +1,158 @@
+"""
+Escalating bids for help requests that get no offers.
+
+A job starts at the bottom of a price ladder (e.g. 10 -> 25 -> 50 sats) and
+moves up one step each time a step passes without an affordable offer, never
+above the per-job cap. A ledger keeps what was paid per day, so automatic
+payments stop at the daily cap, and what each job's final price bought in
+time-to-result, which is the curve used to tune the ladder.
+"""
+
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("unstuck-ai")
+
+# Finished jobs kept for the price/latency report
+JOB_HISTORY = 500
+# Changes within this many seconds are written to disk together
+SAVE_DELAY = 1.0
+
+
+def parse_ladder(value: str) -> List[int]:
+    """Parse "10,25,50" into ascending unique prices, ignoring junk entries."""
+    prices = set()
+    for part in value.split(","):
+        try:
+            price = int(part.strip())
+        except ValueError:
+            continue
+        if price > 0:
+            prices.add(price)
+    return sorted(prices)
+
+
+def plan_ladder(ladder: List[int], job_cap: int) -> List[int]:
+    """The ladder steps a job may use; just the cap when there is no ladder."""
+    steps = [price for price in ladder if price <= job_cap]
+    return steps or [job_cap]
+
+
+def utc_day(timestamp: Optional[float] = None) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(timestamp))
+
+
+class BidLedger:
+    """Daily spend against a cap plus the outcome of recent jobs, persisted as JSON."""
+
+    def __init__(self, path: str, daily_cap_sats: int = 0):
+        self.path = path
+        # 0 means no daily cap
+        self.daily_cap_sats = daily_cap_sats
+        self._lock = threading.Lock()
+        # Only one writer of the file at a time
+        self._write_lock = threading.Lock()
+        self._save_timer: Optional[threading.Timer] = None
+        # UTC day -> sats paid that day
+        self.spent: Dict[str, int] = {}
+        self.jobs: List[Dict[str, Any]] = []
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                saved = json.load(f)
+            self.spent = saved.get("spent", {})
+            self.jobs = saved.get("jobs", [])[-JOB_HISTORY:]
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable bid ledger {self.path}: {str(e)}")
+
+    def _save(self):
+        # Called with self._lock held, from the event loop; the write happens on
+        # a timer thread so payments and finished jobs don't wait for the disk
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(SAVE_DELAY, self.flush)
+            self._save_timer.start()
+
+    def flush(self):
+        """Write pending changes to disk now."""
+        with self._write_lock:
+            with self._lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                # dumps uses the C encoder, dump to a file doesn't
+                data = json.dumps({"spent": self.spent, "jobs": self.jobs})
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+
+    def spent_today(self) -> int:
+        with self._lock:
+            return self.spent.get(utc_day(), 0)
+
+    def reserve(self, price_sats: int) -> bool:
+        """
+        Count a payment against today's cap before making it, so concurrent
+        jobs can't both squeeze under the cap. False if it doesn't fit.
+        """
+        day = utc_day()
+        with self._lock:
+            spent = self.spent.get(day, 0)
+            if self.daily_cap_sats and spent + price_sats > self.daily_cap_sats:
+                return False
+            # Only today matters for the cap
+            self.spent = {day: spent + price_sats}
+            self._save()
+            return True
+
+    def release(self, price_sats: int):
+        """Give back a reservation whose payment failed."""
+        day = utc_day()
+        with self._lock:
+            self.spent[day] = max(self.spent.get(day, 0) - price_sats, 0)
+            self._save()
+
+    def record_job(self, job: Dict[str, Any]):
+        """Remember how a job's bidding went: its bids, what was paid and how long it took."""
+        with self._lock:
+            self.jobs.append(job)
+            del self.jobs[:-JOB_HISTORY]
+            self._save()
+
+    def curve(self) -> List[Dict[str, Any]]:
+        """Completion rate and time-to-result per final bid, cheapest first."""
+        with self._lock:
+            jobs = list(self.jobs)
+        by_price: Dict[int, List[Dict[str, Any]]] = {}
+        for job in jobs:
+            by_price.setdefault(job["final_bid_sats"], []).append(job)
+
+        rows = []
+        for price in sorted(by_price):
+            group = by_price[price]
+            completed = [job["result_ms"] for job in group if job["status"] == "completed"]
+            first_offers = [job["first_offer_ms"] for job in group if job.get("first_offer_ms") is not None]
+            rows.append(
+                {
+                    "final_bid_sats": price,
+                    "jobs": len(group),
+                    "completed": len(completed),
+                    "completion_rate": round(len(completed) / len(group), 3),
+                    "median_result_ms": round(statistics.median(completed), 1) if completed else None,
+                    "median_first_offer_ms": round(statistics.median(first_offers), 1)
+                    if first_offers
+                    else None,
+                    "sats_paid": sum(job.get("paid_sats") or 0 for job in group),
+                }
+            )
+        return rows
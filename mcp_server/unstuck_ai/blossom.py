@@ -0,0 +1,196 @@
+"""
+Blossom blob storage for screenshots.
+
+Blobs are addressed by their sha256 and uploaded with a signed kind 24242
+authorization event (BUD-01/BUD-02), so any Blossom server can host them.
+"""
+
+import base64
+import hashlib
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+import requests
+
+logger = logging.getLogger("unstuck-ai")
+
+# Authorization event kind defined by BUD-01
+BLOSSOM_AUTH_KIND = 24242
+# How long a signed upload authorization stays valid (seconds)
+BLOSSOM_AUTH_EXPIRATION = 300
+# How long the other mirrors get to confirm after the first one (seconds)
+BLOSSOM_MIRROR_WAIT = 1.0
+
+# Shared pool so mirroring keeps running after upload_to_blossom returns
+_upload_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="blossom")
+
+
+def sha256_hex(data: bytes) -> str:
+    """Return the hex encoded sha256 of a blob."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def blob_url(server: str, sha256: str, extension: str = "png") -> str:
+    """URL a Blossom server serves a blob at."""
+    return f"{server.rstrip('/')}/{sha256}.{extension}"
+
+
+def create_auth_header(keys, sha256: str, action: str = "upload") -> str:
+    """
+    Build the `Authorization` header for a Blossom request.
+
+    Args:
+        keys: Nostr keys used to sign the authorization event
+        sha256: Hash of the blob the authorization is scoped to
+        action: Blossom verb the event authorizes (upload, delete, ...)
+
+    Returns:
+        The header value, "Nostr <base64 encoded signed event>"
+    """
+    from nostr_sdk import EventBuilder, Kind, Tag, Timestamp
+
+    expiration = Timestamp.now().as_secs() + BLOSSOM_AUTH_EXPIRATION
+    event = (
+        EventBuilder(Kind(BLOSSOM_AUTH_KIND), f"Upload {sha256[:8]}")
+        .tags(
+            [
+                Tag.parse(["t", action]),
+                Tag.parse(["x", sha256]),
+                Tag.parse(["expiration", str(expiration)]),
+            ]
+        )
+        .sign_with_keys(keys)
+    )
+    encoded = base64.b64encode(event.as_json().encode()).decode()
+    return f"Nostr {encoded}"
+
+
+def upload_blob(
+    server: str,
+    data: bytes,
+    sha256: str,
+    auth_header: str,
+    content_type: str = "image/png",
+    timeout: float = 30,
+) -> Dict[str, Any]:
+    """
+    PUT a blob to a single Blossom server.
+
+    Returns:
+        The blob descriptor returned by the server, with the measured latency added
+    """
+    started = time.perf_counter()
+    response = requests.put(
+        f"{server.rstrip('/')}/upload",
+        data=data,
+        headers={
+            "Authorization": auth_header,
+            "Content-Type": content_type,
+            "Content-Length": str(len(data)),
+            "X-SHA-256": sha256,
+        },
+        timeout=timeout,
+    )
+    response.raise_for_status()
+    descriptor = response.json()
+
+    if descriptor.get("sha256", sha256) != sha256:
+        raise ValueError(
+            f"{server} stored hash {descriptor.get('sha256')}, expected {sha256}"
+        )
+
+    descriptor.setdefault("url", blob_url(server, sha256))
+    descriptor["server"] = server
+    descriptor["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return descriptor
+
+
+def upload_to_blossom(
+    data: bytes,
+    servers: List[str],
+    keys,
+    content_type: str = "image/png",
+    timeout: float = 30,
+    mirror_wait: float = BLOSSOM_MIRROR_WAIT,
+) -> Optional[List[str]]:
+    """
+    Upload a blob to several Blossom servers in parallel.
+
+    Once the first server confirms the upload the others get mirror_wait
+    seconds to confirm too; any still running after that keep uploading in
+    the background but are left out of the returned URLs.
+
+    Args:
+        data: The blob to upload
+        servers: Base URLs of the Blossom servers to mirror to
+        keys: Nostr keys used to sign the authorization event
+        content_type: MIME type of the blob
+        timeout: Per-server request timeout in seconds
+        mirror_wait: Seconds to wait for more confirmations after the first
+
+    Returns:
+        The URL of every server that confirmed the blob, first confirmation
+        first, or None if all servers failed
+    """
+    if not servers:
+        logger.error("No Blossom servers configured. Check BLOSSOM_SERVERS")
+        return None
+
+    sha256 = sha256_hex(data)
+    auth_header = create_auth_header(keys, sha256)
+    logger.info(
+        f"Uploading {len(data)} byte blob {sha256} to {len(servers)} Blossom servers"
+    )
+
+    pending = {
+        _upload_executor.submit(
+            upload_blob, server, data, sha256, auth_header, content_type, timeout
+        ): server
+        for server in servers
+    }
+    for future, server in pending.items():
+        future.add_done_callback(
+            lambda f, server=server: _log_mirror_result(server, sha256, f)
+        )
+
+    confirmed = None
+    remaining = set(pending)
+    while remaining and confirmed is None:
+        done, remaining = wait(remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                confirmed = future
+                break
+
+    if confirmed is None:
+        logger.error(f"Blob {sha256} could not be uploaded to any Blossom server")
+        return None
+
+    logger.info(
+        f"First Blossom confirmation from {confirmed.result()['server']} "
+        f"in {confirmed.result()['latency_ms']}ms"
+    )
+
+    # Only servers that returned a blob descriptor are handed out, a worker
+    # fetching from one that is still uploading would get a 404
+    if remaining and mirror_wait > 0:
+        wait(remaining, timeout=mirror_wait)
+    mirror_urls = [confirmed.result()["url"]]
+    for future in pending:
+        if future is confirmed or not future.done() or future.exception() is not None:
+            continue
+        mirror_urls.append(future.result()["url"])
+    return mirror_urls
+
+
+def _log_mirror_result(server: str, sha256: str, future):
+    if future.exception() is not None:
+        logger.warning(
+            f"Blossom mirror {server} failed for {sha256[:8]}: {future.exception()}"
+        )
+    else:
+        logger.info(
+            f"Blossom mirror {server} stored {sha256[:8]} in {future.result()['latency_ms']}ms"
+        )
@@ -0,0 +1,313 @@
+"""
+Local disk screenshot storage with a built-in HTTP server, for deployments
+where the workers are on the same network as the agent.
+
+Screenshots are stored content-addressed (`<sha256>.png`) in a directory with
+a size cap, and served by a small asyncio HTTP server that uses sendfile,
+honours Range requests and sends immutable caching headers.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import socket
+import threading
+import time
+from email.utils import formatdate
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger("unstuck-ai")
+
+BLOB_PATH = re.compile(r"^/([0-9a-f]{64})\.png$")
+RANGE_HEADER = re.compile(r"^bytes=(\d*)-(\d*)$")
+# Close keep-alive connections that stay idle this long (seconds)
+IDLE_TIMEOUT = 15
+
+
+def lan_address() -> str:
+    """Best guess at this host's LAN IP; connecting a UDP socket sends nothing."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.connect(("10.255.255.255", 1))
+        return sock.getsockname()[0]
+    except OSError:
+        return "127.0.0.1"
+    finally:
+        sock.close()
+
+
+class LocalBlobStore:
+    """Content-addressed PNG directory with least-recently-used cleanup."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # sha256 -> (size, last access time)
+        self._index: Dict[str, Tuple[int, float]] = {}
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        for name in os.listdir(self.directory):
+            match = BLOB_PATH.match(f"/{name}")
+            if match:
+                stat = os.stat(os.path.join(self.directory, name))
+                self._index[match.group(1)] = (stat.st_size, stat.st_mtime)
+
+    def path_for(self, sha256: str) -> str:
+        return os.path.join(self.directory, f"{sha256}.png")
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(size for size, _ in self._index.values())
+
+    def put(self, data: bytes) -> str:
+        """Store a blob (a no-op if it is already there) and return its sha256."""
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self.path_for(sha256)
+        with self._lock:
+            if sha256 not in self._index:
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            self._index[sha256] = (len(data), time.time())
+            self._evict(keep=sha256)
+        return sha256
+
+    def touch(self, sha256: str):
+        """Record an access so recently served blobs are evicted last."""
+        with self._lock:
+            if sha256 in self._index:
+                self._index[sha256] = (self._index[sha256][0], time.time())
+        try:
+            os.utime(self.path_for(sha256))
+        except OSError:
+            pass
+
+    def _evict(self, keep: str):
+        total = sum(size for size, _ in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for sha256, (size, _) in sorted(self._index.items(), key=lambda i: i[1][1]):
+            if total <= self.max_bytes:
+                break
+            if sha256 == keep:
+                continue
+            try:
+                os.remove(self.path_for(sha256))
+            except FileNotFoundError:
+                pass
+            del self._index[sha256]
+            total -= size
+            logger.info(f"Evicted local screenshot {sha256[:8]} ({size} bytes)")
+
+
+class BlobHTTPServer:
+    """Asyncio HTTP/1.1 server for a LocalBlobStore, running on its own thread."""
+
+    def __init__(self, store: LocalBlobStore, host: str, port: int):
+        self.store = store
+        self.host = host
+        self.port = port
+        self._started = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+        # publish() runs on worker threads, so two first uploads may race here
+        self._start_lock = threading.Lock()
+
+    def start(self, timeout: float = 5.0):
+        """Start serving in a background thread (idempotent)."""
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            # A failed earlier attempt leaves its error behind, retry cleanly
+            self._started.clear()
+            self._error = None
+            self._thread = threading.Thread(
+                target=self._run, name="local-blob-http", daemon=True
+            )
+            self._thread.start()
+            self._started.wait(timeout)
+            if self._error:
+                raise self._error
+
+    def _run(self):
+        try:
+            asyncio.run(self._serve())
+        except BaseException as e:
+            self._error = e
+            self._started.set()
+
+    async def _serve(self):
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        logger.info(f"Serving local screenshots on http://{self.host}:{self.port}")
+        self._started.set()
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(
+                        reader.readuntil(b"\r\n\r\n"), IDLE_TIMEOUT
+                    )
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+                    break
+                keep_alive = await self._respond(head.decode("latin-1"), writer)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, head: str, writer: asyncio.StreamWriter) -> bool:
+        lines = head.split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            await self._send_status(writer, 400, "Bad Request")
+            return False
+
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        keep_alive = (
+            headers.get("connection", "").lower() != "close"
+            and version == "HTTP/1.1"
+        )
+
+        if method not in ("GET", "HEAD"):
+            await self._send_status(writer, 405, "Method Not Allowed", keep_alive)
+            return keep_alive
+
+        match = BLOB_PATH.match(target.split("?", 1)[0])
+        path = self.store.path_for(match.group(1)) if match else None
+        try:
+            # Open before any headers go out: eviction may delete the blob at any time,
+            # and an open file keeps its bytes readable until it is closed
+            f = open(path, "rb") if path else None
+        except FileNotFoundError:
+            f = None
+        if f is None:
+            await self._send_status(writer, 404, "Not Found", keep_alive)
+            return keep_alive
+        try:
+            return await self._send_blob(
+                f, match.group(1), method, headers, keep_alive, writer
+            )
+        finally:
+            f.close()
+
+    async def _send_blob(self, f, sha256, method, headers, keep_alive, writer) -> bool:
+        etag = f'"{sha256}"'
+        common = [
+            ("Content-Type", "image/png"),
+            ("ETag", etag),
+            # The URL is the content hash, so the bytes can never change
+            ("Cache-Control", "public, max-age=31536000, immutable"),
+            ("Accept-Ranges", "bytes"),
+            ("Date", formatdate(usegmt=True)),
+            ("Connection", "keep-alive" if keep_alive else "close"),
+        ]
+
+        if etag in headers.get("if-none-match", ""):
+            self._write_head(writer, 304, "Not Modified", common)
+            await writer.drain()
+            return keep_alive
+
+        size = os.fstat(f.fileno()).st_size
+        offset, count = 0, size
+        status, reason = 200, "OK"
+        byte_range = headers.get("range")
+        if byte_range:
+            parsed = self._parse_range(byte_range, size)
+            if parsed is None:
+                self._write_head(
+                    writer,
+                    416,
+                    "Range Not Satisfiable",
+                    common + [("Content-Range", f"bytes */{size}"), ("Content-Length", "0")],
+                )
+                await writer.drain()
+                return keep_alive
+            offset, count = parsed
+            status, reason = 206, "Partial Content"
+            common.append(
+                ("Content-Range", f"bytes {offset}-{offset + count - 1}/{size}")
+            )
+
+        self._write_head(writer, status, reason, common + [("Content-Length", str(count))])
+        if method == "GET" and count:
+            # Zero-copy from the page cache to the socket where the OS allows it
+            await asyncio.get_running_loop().sendfile(writer.transport, f, offset, count)
+        await writer.drain()
+        self.store.touch(sha256)
+        return keep_alive
+
+    @staticmethod
+    def _parse_range(value: str, size: int) -> Optional[Tuple[int, int]]:
+        """Parse a single `bytes=` range into (offset, count), None if unsatisfiable."""
+        match = RANGE_HEADER.match(value.strip())
+        if not match or not size:
+            return None
+        start, end = match.groups()
+        if start == "" and end == "":
+            return None
+        if start == "":
+            # Suffix range: the last N bytes
+            count = min(int(end), size)
+            return (size - count, count) if count else None
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+        if start >= size or end < start:
+            return None
+        return start, end - start + 1
+
+    @staticmethod
+    def _write_head(writer, status: int, reason: str, headers):
+        lines = [f"HTTP/1.1 {status} {reason}"]
+        lines += [f"{name}: {value}" for name, value in headers]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+    async def _send_status(self, writer, status: int, reason: str, keep_alive=False):
+        self._write_head(
+            writer,
+            status,
+            reason,
+            [
+                ("Content-Length", "0"),
+                ("Connection", "keep-alive" if keep_alive else "close"),
+            ],
+        )
+        await writer.drain()
+
+
+class LocalScreenshotStorage:
+    """Stores screenshots locally and returns LAN URLs served by BlobHTTPServer."""
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int,
+        host: str = "0.0.0.0",
+        port: int = 8090,
+        public_url: Optional[str] = None,
+    ):
+        self.store = LocalBlobStore(directory, max_bytes)
+        self.server = BlobHTTPServer(self.store, host, port)
+        self.public_url = (public_url or f"http://{lan_address()}:{port}").rstrip("/")
+
+    def publish(self, data: bytes) -> str:
+        """Store a PNG and return the URL workers on the LAN can fetch it from."""
+        self.server.start()
+        sha256 = self.store.put(data)
+        return f"{self.public_url}/{sha256}.png"
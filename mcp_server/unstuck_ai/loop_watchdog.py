@@ -0,0 +1,168 @@
+"""
+Event-loop lag watchdog.
+
+A heartbeat callback on the event loop measures how late it runs, which is
+the loop's lag. A watcher thread checks the heartbeat; once it is more than
+the threshold overdue, the loop is blocked, and the thread captures the loop
+thread's stack at that moment, i.e. whatever synchronous call is holding the
+loop and the coroutine that made it. When the heartbeat runs again, the
+block's full duration is known and is charged to that stack.
+
+Blocks are grouped by the innermost frame in this package plus the frame
+that was actually running (e.g. server.py in pay_lightning_invoice via
+requests' socket read), so the report lists each blocking call site once
+with its count, total and worst duration.
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+# Frames from files in this directory count as our code when naming an offender
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Lag samples kept for the percentiles
+LAG_HISTORY = 1000
+# Frames kept of a captured stack, innermost last
+STACK_DEPTH = 20
+
+
+def describe_frame(frame: traceback.FrameSummary) -> str:
+    return f"{os.path.basename(frame.filename)}:{frame.lineno} in {frame.name}"
+
+
+class LoopWatchdog:
+    """Measures event-loop lag and names the calls that block the loop."""
+
+    def __init__(self, threshold_ms: float = 100, interval_ms: float = 50):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._expected = 0.0
+        # Stack captured by the watcher thread for the block in progress
+        self._pending: Optional[Dict[str, Any]] = None
+        self.lags: deque = deque(maxlen=LAG_HISTORY)
+        self.max_lag = 0.0
+        self.blocks = 0
+        self.blocked_seconds = 0.0
+        # offender key -> count, total and worst seconds, one example stack
+        self.offenders: Dict[str, Dict[str, Any]] = {}
+
+    def start(self):
+        """Watch the running loop; calling it again on the same loop does nothing."""
+        loop = asyncio.get_running_loop()
+        if self.loop is loop and self._thread is not None and self._thread.is_alive():
+            return
+        self.stop()
+        self.loop = loop
+        self._loop_thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._expected = time.monotonic() + self.interval
+        self._handle = loop.call_later(self.interval, self._beat)
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _beat(self):
+        now = time.monotonic()
+        lag = max(now - self._expected, 0.0)
+        with self._lock:
+            self.lags.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            pending, self._pending = self._pending, None
+            if lag >= self.threshold:
+                self._record_block(lag, pending)
+        self._expected = now + self.interval
+        if not self._stop.is_set():
+            self._handle = self.loop.call_later(self.interval, self._beat)
+
+    def _watch(self):
+        # Check often enough to catch a block soon after it crosses the threshold
+        poll = min(self.interval, self.threshold) / 4
+        while not self._stop.wait(poll):
+            overdue = time.monotonic() - self._expected
+            if overdue < self.threshold:
+                continue
+            with self._lock:
+                if self._pending is None:
+                    self._pending = self._capture()
+
+    def _capture(self) -> Dict[str, Any]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.extract_stack(frame)[-STACK_DEPTH:] if frame is not None else []
+        task = None
+        try:
+            current = asyncio.current_task(self.loop)
+            task = current.get_name() if current is not None else None
+        except RuntimeError:
+            pass
+        return {"stack": stack, "task": task}
+
+    def _record_block(self, lag: float, pending: Optional[Dict[str, Any]]):
+        self.blocks += 1
+        self.blocked_seconds += lag
+        stack: List[traceback.FrameSummary] = pending["stack"] if pending else []
+        if stack:
+            ours = [
+                frame for frame in stack if os.path.abspath(frame.filename).startswith(PACKAGE_DIR)
+            ]
+            leaf = describe_frame(stack[-1])
+            key = leaf
+            if ours and ours[-1] is not stack[-1]:
+                key = f"{describe_frame(ours[-1])} via {leaf}"
+        else:
+            # The heartbeat ran before the watcher thread got to look
+            key = "unknown (block ended before its stack was captured)"
+        offender = self.offenders.setdefault(
+            key, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0, "stack": None, "task": None}
+        )
+        offender["count"] += 1
+        offender["total_seconds"] += lag
+        if lag >= offender["max_seconds"]:
+            offender["max_seconds"] = lag
+            offender["stack"] = [describe_frame(frame) for frame in stack]
+            offender["task"] = pending["task"] if pending else None
+
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        """Lag percentiles and the worst blocking call sites by total time blocked."""
+        with self._lock:
+            lags = sorted(self.lags)
+            offenders = sorted(
+                self.offenders.items(), key=lambda item: item[1]["total_seconds"], reverse=True
+            )[:top]
+            return {
+                "threshold_ms": round(self.threshold * 1000, 1),
+                "lag_ms": {
+                    "p50": round(statistics.median(lags) * 1000, 1) if lags else None,
+                    "p99": round(lags[int(len(lags) * 0.99) - 1] * 1000, 1) if lags else None,
+                    "max": round(self.max_lag * 1000, 1),
+                },
+                "blocks": self.blocks,
+                "blocked_ms": round(self.blocked_seconds * 1000, 1),
+                "offenders": [
+                    {
+                        "site": key,
+                        "count": offender["count"],
+                        "total_ms": round(offender["total_seconds"] * 1000, 1),
+                        "max_ms": round(offender["max_seconds"] * 1000, 1),
+                        "task": offender["task"],
+                        "stack": offender["stack"],
+                    }
+                    for key, offender in offenders
+                ],
+            }
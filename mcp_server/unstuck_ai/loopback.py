@@ -0,0 +1,254 @@
+"""
+Loopback marketplace: an in-process relay, a scripted worker and a fake
+wallet, for running the full help request path without network or funds.
+
+With MARKETPLACE_BACKEND=loopback the server's Nostr client is a
+LoopbackClient. Requests it publishes reach a ScriptedWorker through the
+in-process relay; the worker answers with a kind 7000 offer carrying a fake
+invoice, pay_lightning_invoice settles that invoice here, and the worker then
+sends the kind 6109 result that goes through the normal result handling and
+execute_actions. Events are real signed nostr_sdk events and filters are
+matched by nostr_sdk, so everything except the transport and the wallet is
+the production code path. Timing is fixed by the configured delays.
+
+A request whose description contains "[loopback:ignore]" gets no offer, for
+exercising timeouts, the bid ladder and amplification.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from nostr_sdk import (
+    Event,
+    EventBuilder,
+    Filter,
+    Keys,
+    Kind,
+    NostrSigner,
+    SendEventOutput,
+    SubscribeOutput,
+    Tag,
+)
+
+logger = logging.getLogger("unstuck-ai")
+
+RELAY_URL = "loopback://relay"
+IGNORE_MARKER = "[loopback:ignore]"
+
+
+class LoopbackRelay:
+    """Delivers published events to every subscription whose filter matches."""
+
+    def __init__(self):
+        # subscription id -> (filter, owning client)
+        self.subscriptions: Dict[str, Tuple[Filter, "LoopbackClient"]] = {}
+        self.next_sub = 0
+        self.stats = {"published": 0, "delivered": 0}
+
+    def subscribe(self, filter: Filter, owner: "LoopbackClient") -> str:
+        self.next_sub += 1
+        sub_id = f"loopback-{self.next_sub}"
+        self.subscriptions[sub_id] = (filter, owner)
+        return sub_id
+
+    def unsubscribe(self, sub_id: str):
+        self.subscriptions.pop(sub_id, None)
+
+    def publish(self, event: Event, sender: "LoopbackClient"):
+        self.stats["published"] += 1
+        for sub_id, (filter, owner) in list(self.subscriptions.items()):
+            # Like a real client, nobody is notified of their own events
+            if owner is not sender and filter.match_event(event):
+                owner.deliver(sub_id, event)
+                self.stats["delivered"] += 1
+
+
+class LoopbackClient:
+    """Stand-in for nostr_sdk's Client on a LoopbackRelay."""
+
+    def __init__(self, signer: NostrSigner, relay: LoopbackRelay, on_connect=None):
+        self._signer = signer
+        self.relay = relay
+        self._on_connect = on_connect
+        self._events: Optional[asyncio.Queue] = None
+
+    def deliver(self, sub_id: str, event: Event):
+        if self._events is not None:
+            self._events.put_nowait((sub_id, event))
+
+    async def add_relay(self, url: str):
+        pass
+
+    async def connect(self):
+        if self._events is None:
+            self._events = asyncio.Queue()
+        if self._on_connect is not None:
+            await self._on_connect()
+
+    async def wait_for_connection(self, timeout):
+        pass
+
+    async def sign_event_builder(self, builder: EventBuilder) -> Event:
+        return await builder.sign(self._signer)
+
+    async def send_event(self, event: Event) -> SendEventOutput:
+        self.relay.publish(event, self)
+        return SendEventOutput(id=event.id(), success=[RELAY_URL], failed={})
+
+    async def send_event_builder(self, builder: EventBuilder) -> SendEventOutput:
+        return await self.send_event(await self.sign_event_builder(builder))
+
+    async def subscribe(self, filter: Filter, opts=None) -> SubscribeOutput:
+        await self.connect()
+        sub_id = self.relay.subscribe(filter, self)
+        return SubscribeOutput(id=sub_id, success=[RELAY_URL], failed={})
+
+    async def unsubscribe(self, subscription_id: str):
+        self.relay.unsubscribe(subscription_id)
+
+    async def handle_notifications(self, handler):
+        await self.connect()
+        while True:
+            sub_id, event = await self._events.get()
+            await handler.handle(RELAY_URL, sub_id, event)
+
+
+class ScriptedWorker:
+    """
+    A worker that offers on every job request, waits for its invoice to be
+    paid and sends back a fixed set of actions.
+    """
+
+    def __init__(
+        self,
+        relay: LoopbackRelay,
+        price_sats: int = 10,
+        offer_delay: float = 0.0,
+        result_delay: float = 0.0,
+        actions: Optional[List[Dict[str, Any]]] = None,
+        payment_timeout: float = 60.0,
+    ):
+        self.keys = Keys.generate()
+        self.client = LoopbackClient(NostrSigner.keys(self.keys), relay)
+        self.price_sats = price_sats
+        self.offer_delay = offer_delay
+        self.result_delay = result_delay
+        self.actions = actions if actions is not None else []
+        self.payment_timeout = payment_timeout
+        # invoice -> (job id, amount, paid event)
+        self.invoices: Dict[str, Tuple[str, int, asyncio.Event]] = {}
+        self.cancelled = set()
+        self.tasks = set()
+        self.stats = {"requests": 0, "offers": 0, "paid": 0, "results": 0, "cancelled": 0}
+
+    async def start(self):
+        await self.client.subscribe(Filter().kinds([Kind(5109), Kind(5)]))
+        task = asyncio.create_task(self.client.handle_notifications(self))
+        self.tasks.add(task)
+
+    async def handle(self, relay_url, subscription_id, event: Event):
+        if event.kind().as_u16() == 5:
+            for tag in event.tags().to_vec():
+                tag_vec = tag.as_vec()
+                if len(tag_vec) >= 2 and tag_vec[0] == "e":
+                    self.cancelled.add(tag_vec[1])
+            return
+        self.stats["requests"] += 1
+        if IGNORE_MARKER in event.content():
+            return
+        # Answer requests concurrently, like a pool of workers would
+        task = asyncio.create_task(self.work(event))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def work(self, request: Event):
+        job_id = request.id().to_hex()
+        requester = request.author().to_hex()
+        max_price = None
+        for tag in request.tags().to_vec():
+            tag_vec = tag.as_vec()
+            if len(tag_vec) >= 2 and tag_vec[0] == "max_price":
+                try:
+                    max_price = int(tag_vec[1])
+                except ValueError:
+                    pass
+        price = min(self.price_sats, max_price) if max_price else self.price_sats
+        invoice = f"lnbcloopback{price}n1{job_id[:16]}{len(self.invoices)}"
+        paid = asyncio.Event()
+        self.invoices[invoice] = (job_id, price, paid)
+        references = [Tag.parse(["e", job_id]), Tag.parse(["p", requester])]
+
+        await asyncio.sleep(self.offer_delay)
+        await self.client.send_event_builder(
+            EventBuilder(Kind(7000), "").tags(
+                references
+                + [
+                    Tag.parse(["status", "payment-required"]),
+                    Tag.parse(["amount", str(price)]),
+                    Tag.parse(["bolt11", invoice]),
+                ]
+            )
+        )
+        self.stats["offers"] += 1
+
+        try:
+            await asyncio.wait_for(paid.wait(), self.payment_timeout)
+        except asyncio.TimeoutError:
+            return
+        finally:
+            self.invoices.pop(invoice, None)
+        await asyncio.sleep(self.result_delay)
+        if job_id in self.cancelled:
+            self.stats["cancelled"] += 1
+            return
+        await self.client.send_event_builder(
+            EventBuilder(Kind(6109), json.dumps({"actions": self.actions})).tags(
+                references + [Tag.parse(["status", "success"])]
+            )
+        )
+        self.stats["results"] += 1
+
+    async def handle_msg(self, relay_url, msg):
+        pass
+
+    def pay(self, invoice: str) -> Optional[int]:
+        """Settle one of our invoices, returns its amount or None if it isn't ours."""
+        entry = self.invoices.get(invoice)
+        if entry is None:
+            return None
+        entry[2].set()
+        self.stats["paid"] += 1
+        return entry[1]
+
+
+class LoopbackMarketplace:
+    """The relay, worker and wallet of a loopback deployment."""
+
+    def __init__(self, **worker_options):
+        self.relay = LoopbackRelay()
+        self.worker = ScriptedWorker(self.relay, **worker_options)
+        self._started = False
+        self.payments = 0
+
+    def client(self, signer: NostrSigner) -> LoopbackClient:
+        """A client for the server; the worker starts when it first connects."""
+        return LoopbackClient(signer, self.relay, on_connect=self.start)
+
+    async def start(self):
+        if not self._started:
+            self._started = True
+            await self.worker.start()
+            logger.info("Loopback marketplace started with a scripted worker")
+
+    def pay_invoice(self, invoice: str) -> Dict[str, Any]:
+        """Pay a worker's invoice the way the Lexe API would answer."""
+        if self.worker.pay(invoice) is None:
+            raise ValueError(f"Unknown loopback invoice: {invoice}")
+        self.payments += 1
+        return {"index": str(self.payments), "created_at": int(time.time() * 1000)}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"relay": self.relay.stats, "worker": self.worker.stats}
@@ -0,0 +1,234 @@
+"""
+On-demand profiling of MCP tool calls.
+
+A profiled call runs its coroutine one step at a time with cProfile enabled
+only while the step runs, so the profile holds exactly the synchronous work
+of that call on the event loop, even with other calls running concurrently.
+Alongside it the call's asyncio timing is kept: wall time, time on the loop,
+time spent awaiting (relays, humans, worker threads), and the number and
+longest of its steps. Work in threads and in tasks the call spawns is only
+visible as waiting time.
+
+Each call is written to PROFILE_DIR as a .prof file (for pstats, snakeviz)
+and a .folded file of semicolon-separated stacks with microsecond counts,
+ready for flamegraph.pl or speedscope. The stacks are rebuilt from cProfile's
+caller/callee edges, so time is split between callers in proportion, not
+sampled.
+
+Tools are only wrapped when PROFILE_TOOLS names them or they take a
+`profile` argument, so every other tool runs exactly as before.
+"""
+
+import cProfile
+import functools
+import inspect
+import logging
+import os
+import pstats
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("unstuck-ai")
+
+# Deepest stack written to a .folded file
+MAX_STACK_DEPTH = 64
+
+
+def function_label(func) -> str:
+    """'file.py:12(name)' for a pstats function key."""
+    filename, line, name = func
+    if filename == "~":
+        # Built-ins, e.g. "<method 'sort' of 'list' objects>"
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+def folded_stacks(stats: Dict) -> Dict[str, float]:
+    """
+    Stacks of a pstats stats dict as "a;b;c" -> seconds of self time.
+
+    Starting from the functions nothing in the profile called, each callee's
+    edge times are scaled by the share of its caller's time on the current
+    path, and recursion is cut where a function is already on the stack.
+    """
+    callees: Dict[Any, List] = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge))
+
+    stacks: Dict[str, float] = {}
+
+    def walk(func, path, self_time, cum_time, labels):
+        label = function_label(func)
+        labels = labels + [label]
+        key = ";".join(labels)
+        stacks[key] = stacks.get(key, 0.0) + self_time
+        total_cum = stats[func][3]
+        if not total_cum or len(labels) >= MAX_STACK_DEPTH:
+            return
+        share = cum_time / total_cum
+        for callee, (_, _, edge_tt, edge_ct) in callees.get(func, []):
+            if callee in path:
+                continue
+            walk(callee, path | {callee}, edge_tt * share, edge_ct * share, labels)
+
+    for func, (_, _, tt, ct, callers) in stats.items():
+        if not callers:
+            walk(func, {func}, tt, ct, [])
+    return stacks
+
+
+class _SteppedCall:
+    """Awaitable that drives a coroutine with cProfile on only while it runs."""
+
+    def __init__(self, coro, profiler: cProfile.Profile, timing: Dict[str, Any], active: threading.local):
+        self.coro = coro
+        self.profiler = profiler
+        self.timing = timing
+        self.active = active
+
+    def __await__(self):
+        value, error = None, None
+        while True:
+            self.active.on = True
+            started = time.perf_counter()
+            self.profiler.enable()
+            try:
+                if error is not None:
+                    yielded = self.coro.throw(error)
+                else:
+                    yielded = self.coro.send(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.profiler.disable()
+                step = time.perf_counter() - started
+                self.active.on = False
+                self.timing["on_loop"] += step
+                self.timing["steps"] += 1
+                self.timing["longest_step"] = max(self.timing["longest_step"], step)
+            try:
+                value, error = (yield yielded), None
+            except BaseException as e:
+                value, error = None, e
+
+
+class ToolProfiler:
+    """Profiles selected tool calls and keeps the most recent ones for reports."""
+
+    def __init__(self, tools: List[str], directory: str, keep: int = 50, write_files: bool = True):
+        # Tool names profiled on every call, "all" for every wrapped tool
+        self.tools = set(tools)
+        self.directory = directory
+        self.write_files = write_files
+        self.calls: deque = deque(maxlen=keep)
+        self._lock = threading.Lock()
+        # Set while a profiled step runs, so nested profiled calls join the outer profile
+        self._active = threading.local()
+
+    def always(self, name: str) -> bool:
+        return "all" in self.tools or name in self.tools
+
+    def wrap(self, fn):
+        """
+        Decorator for async tools. Sync tools, and tools that are neither
+        listed in the profiled tools nor take a `profile` argument, are
+        returned unchanged.
+        """
+        name = fn.__name__
+        always = self.always(name)
+        has_flag = "profile" in inspect.signature(fn).parameters
+        if not inspect.iscoroutinefunction(fn) or (not always and not has_flag):
+            return fn
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            if (always or kwargs.get("profile")) and not getattr(self._active, "on", False):
+                return await self.run(name, fn(*args, **kwargs))
+            return await fn(*args, **kwargs)
+
+        return wrapper
+
+    async def run(self, name: str, coro):
+        """Await a tool's coroutine under the profiler and record the call."""
+        profiler = cProfile.Profile()
+        timing = {"on_loop": 0.0, "steps": 0, "longest_step": 0.0}
+        call_id = uuid.uuid4().hex[:8]
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            return await _SteppedCall(coro, profiler, timing, self._active)
+        finally:
+            wall = time.perf_counter() - started
+            try:
+                self._record(name, call_id, started_at, wall, timing, profiler)
+            except Exception as e:
+                logger.warning(f"Could not record profile of {name}: {str(e)}")
+
+    def _record(self, name, call_id, started_at, wall, timing, profiler):
+        stats = pstats.Stats(profiler)
+        call = {
+            "id": call_id,
+            "tool": name,
+            "started_at": started_at,
+            "wall_ms": round(wall * 1000, 1),
+            "on_loop_ms": round(timing["on_loop"] * 1000, 1),
+            "awaiting_ms": round((wall - timing["on_loop"]) * 1000, 1),
+            "steps": timing["steps"],
+            "longest_step_ms": round(timing["longest_step"] * 1000, 1),
+            "files": None,
+        }
+        if self.write_files:
+            os.makedirs(self.directory, exist_ok=True)
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(started_at))
+            base = os.path.join(self.directory, f"{stamp}-{name}-{call_id}")
+            stats.dump_stats(f"{base}.prof")
+            with open(f"{base}.folded", "w") as f:
+                for stack, seconds in folded_stacks(stats.stats).items():
+                    micros = int(seconds * 1_000_000)
+                    if micros:
+                        f.write(f"{stack} {micros}\n")
+            call["files"] = [f"{base}.prof", f"{base}.folded"]
+        with self._lock:
+            self.calls.append((call, stats.stats))
+        logger.info(
+            f"Profiled {name} ({call_id}): {call['wall_ms']}ms wall, "
+            f"{call['on_loop_ms']}ms on the event loop in {call['steps']} steps"
+        )
+
+    def report(self, calls: int = 10, top: int = 20, tool: Optional[str] = None) -> Dict[str, Any]:
+        """The last `calls` profiled calls and their `top` hottest functions combined."""
+        with self._lock:
+            recent = [entry for entry in self.calls if tool is None or entry[0]["tool"] == tool]
+        recent = recent[-calls:] if calls > 0 else []
+
+        totals: Dict[Any, List[float]] = {}
+        for _, stats in recent:
+            for func, (_, nc, tt, ct, _) in stats.items():
+                row = totals.setdefault(func, [0, 0.0, 0.0])
+                row[0] += nc
+                row[1] += tt
+                row[2] += ct
+
+        def rows(index):
+            ranked = sorted(totals.items(), key=lambda item: item[1][index], reverse=True)[:top]
+            return [
+                {
+                    "function": function_label(func),
+                    "calls": nc,
+                    "self_ms": round(tt * 1000, 2),
+                    "cumulative_ms": round(ct * 1000, 2),
+                }
+                for func, (nc, tt, ct) in ranked
+            ]
+
+        return {
+            "profiled_tools": sorted(self.tools),
+            "directory": self.directory if self.write_files else None,
+            "calls": [call for call, _ in recent],
+            "by_self_time": rows(1),
+            "by_cumulative_time": rows(2),
+        }
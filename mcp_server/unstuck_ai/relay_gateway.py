@@ -0,0 +1,408 @@
+"""
+Local relay gateway: one set of relay connections shared by every MCP server
+instance on a host.
+
+Each stdio MCP server normally opens its own websocket to every relay in
+RELAY_URLS and parses the same event stream. The gateway daemon holds a single
+connection per relay instead, drops copies of an event that another relay
+already delivered for the same relay subscription, and forwards each event to
+the local subscribers of that subscription over a Unix socket. Servers use GatewayClient, which has
+the subset of the nostr_sdk Client interface server.py needs; events are
+signed locally, so the gateway never sees a private key.
+
+Framing is a 4-byte big-endian length followed by a compact JSON object:
+
+  client -> gateway
+    {"op": "publish", "id": n, "event": {...}}
+    {"op": "subscribe", "id": n, "filter": {...}}
+    {"op": "unsubscribe", "id": n, "sub": "..."}
+    {"op": "stats", "id": n}
+  gateway -> client
+    {"op": "ok", "id": n, ...}            reply to a request
+    {"op": "error", "id": n, "error": "..."}
+    {"op": "event", "sub": "...", "relay": "...", "event": {...}}
+
+Run the daemon with:
+
+  python unstuck_ai/relay_gateway.py --socket ~/.unstuck_ai/relay_gateway.sock
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import struct
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from nostr_sdk import (
+    Client,
+    Event,
+    Filter,
+    SendEventOutput,
+    SubscribeOutput,
+)
+
+logger = logging.getLogger("unstuck-ai")
+
+HEADER = struct.Struct(">I")
+# Refuse frames larger than this, a sane event is far smaller
+MAX_FRAME_BYTES = 4 * 1024 * 1024
+# Event ids remembered per relay subscription for dropping copies from several relays
+SEEN_EVENT_IDS = 10000
+# A subscriber with more than this many bytes not yet written to it is disconnected
+MAX_SUBSCRIBER_BUFFER_BYTES = 8 * 1024 * 1024
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """Read one frame, None when the other side has closed the socket."""
+    try:
+        header = await reader.readexactly(HEADER.size)
+        (length,) = HEADER.unpack(header)
+        if length > MAX_FRAME_BYTES:
+            raise ValueError(f"Frame of {length} bytes is too large")
+        return json.loads(await reader.readexactly(length))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+
+
+def encode_frame(message: Dict[str, Any], raw_event: Optional[str] = None) -> bytes:
+    """
+    Encode a message; raw_event is an event's JSON spliced in as the "event"
+    field so an event is serialized once however many subscribers get it.
+    """
+    body = json.dumps(message, separators=(",", ":"))
+    if raw_event is not None:
+        body = body[:-1] + ',"event":' + raw_event + "}"
+    data = body.encode()
+    return HEADER.pack(len(data)) + data
+
+
+class GatewaySubscription:
+    """A local subscriber's filter, and the relay subscription serving it."""
+
+    def __init__(self, sub_id: str, filter_json: str, writer: asyncio.StreamWriter):
+        self.sub_id = sub_id
+        self.filter_json = filter_json
+        self.filter = Filter.from_json(filter_json)
+        self.writer = writer
+
+
+class RelayGateway:
+    """The daemon: relay connections on one side, local Unix socket clients on the other."""
+
+    def __init__(self, relay_urls: List[str], socket_path: str):
+        self.relay_urls = [url.strip() for url in relay_urls if url.strip()]
+        self.socket_path = socket_path
+        self.client = Client()
+        self.subscriptions: Dict[str, GatewaySubscription] = {}
+        # One relay subscription per distinct filter: its id, the local
+        # subscribers sharing it and the event ids it has already delivered
+        self.upstream: Dict[str, Dict[str, Any]] = {}
+        self.upstream_by_id: Dict[str, Dict[str, Any]] = {}
+        self.next_sub = 0
+        self.started_at = time.time()
+        self.stats = {
+            "connections": 0,
+            "open_connections": 0,
+            "published": 0,
+            "events_received": 0,
+            "duplicates_dropped": 0,
+            "events_forwarded": 0,
+            "slow_subscribers_dropped": 0,
+        }
+
+    async def handle(self, relay_url, subscription_id, event: Event):
+        # nostr_sdk calls this only for an event's first copy across all
+        # subscriptions, so events are taken from handle_msg instead
+        pass
+
+    async def handle_msg(self, relay_url, msg):
+        message = msg.as_enum()
+        if message.is_event_msg():
+            await self.forward(relay_url, message.subscription_id, message.event)
+
+    async def forward(self, relay_url: str, subscription_id: str, event: Event):
+        self.stats["events_received"] += 1
+        upstream = self.upstream_by_id.get(str(subscription_id))
+        if upstream is None:
+            # Arrived after the last local subscriber of it went away
+            return
+        # Deduplicated per relay subscription: a later subscription with another
+        # filter must still get the stored events the relays replay for it
+        event_id = event.id().to_hex()
+        seen = upstream["seen"]
+        if event_id in seen:
+            self.stats["duplicates_dropped"] += 1
+            return
+        seen[event_id] = None
+        if len(seen) > SEEN_EVENT_IDS:
+            seen.popitem(last=False)
+
+        # Serialized once however many local subscribers share the subscription
+        raw_event = None
+        for sub_id in list(upstream["subscribers"]):
+            sub = self.subscriptions.get(sub_id)
+            if sub is None or sub.writer.is_closing():
+                continue
+            if sub.writer.transport.get_write_buffer_size() > MAX_SUBSCRIBER_BUFFER_BYTES:
+                # Not reading: drop it rather than buffer for it without bound. Its
+                # connection handler sees the socket close and unsubscribes it
+                logger.warning(f"Relay gateway subscriber {sub_id} is not reading, dropping it")
+                self.stats["slow_subscribers_dropped"] += 1
+                sub.writer.transport.abort()
+                continue
+            if raw_event is None:
+                raw_event = event.as_json()
+            sub.writer.write(
+                encode_frame(
+                    {"op": "event", "sub": sub.sub_id, "relay": relay_url}, raw_event
+                )
+            )
+            self.stats["events_forwarded"] += 1
+
+    async def subscribe(self, filter_json: str, writer) -> GatewaySubscription:
+        self.next_sub += 1
+        sub = GatewaySubscription(f"gw-{self.next_sub}", filter_json, writer)
+        # Identical filters from several servers share one relay subscription
+        upstream = self.upstream.get(filter_json)
+        if upstream is None:
+            output = await self.client.subscribe(sub.filter)
+            upstream = {
+                "id": str(output.id),
+                "subscribers": set(),
+                "seen": OrderedDict(),
+            }
+            self.upstream[filter_json] = upstream
+            self.upstream_by_id[upstream["id"]] = upstream
+        upstream["subscribers"].add(sub.sub_id)
+        self.subscriptions[sub.sub_id] = sub
+        return sub
+
+    async def unsubscribe(self, sub_id: str):
+        sub = self.subscriptions.pop(sub_id, None)
+        if sub is None:
+            return
+        upstream = self.upstream[sub.filter_json]
+        upstream["subscribers"].discard(sub_id)
+        if not upstream["subscribers"]:
+            del self.upstream[sub.filter_json]
+            del self.upstream_by_id[upstream["id"]]
+            await self.client.unsubscribe(upstream["id"])
+
+    async def handle_request(self, message: Dict[str, Any], writer) -> Dict[str, Any]:
+        op = message.get("op")
+        if op == "publish":
+            event = Event.from_json(json.dumps(message["event"]))
+            output = await self.client.send_event(event)
+            self.stats["published"] += 1
+            return {"success": output.success, "failed": output.failed}
+        if op == "subscribe":
+            sub = await self.subscribe(json.dumps(message["filter"]), writer)
+            return {"sub": sub.sub_id, "success": self.relay_urls}
+        if op == "unsubscribe":
+            await self.unsubscribe(message["sub"])
+            return {}
+        if op == "stats":
+            return self.status()
+        raise ValueError(f"Unknown op: {op}")
+
+    async def handle_connection(self, reader, writer):
+        self.stats["connections"] += 1
+        self.stats["open_connections"] += 1
+        owned: Set[str] = set()
+        try:
+            while True:
+                message = await read_frame(reader)
+                if message is None:
+                    break
+                reply = {"op": "ok", "id": message.get("id")}
+                try:
+                    reply.update(await self.handle_request(message, writer))
+                    if message.get("op") == "subscribe":
+                        owned.add(reply["sub"])
+                    elif message.get("op") == "unsubscribe":
+                        owned.discard(message["sub"])
+                except Exception as e:
+                    logger.error(f"Relay gateway request failed: {e}")
+                    reply = {"op": "error", "id": message.get("id"), "error": str(e)}
+                writer.write(encode_frame(reply))
+                await writer.drain()
+        except (ConnectionError, ValueError) as e:
+            logger.warning(f"Relay gateway client dropped: {e}")
+        finally:
+            self.stats["open_connections"] -= 1
+            for sub_id in owned:
+                await self.unsubscribe(sub_id)
+            writer.close()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "relays": self.relay_urls,
+            "subscriptions": len(self.subscriptions),
+            "relay_subscriptions": len(self.upstream),
+            "uptime": round(time.time() - self.started_at, 1),
+        }
+
+    async def serve(self, connect_timeout: float = 5.0):
+        for relay_url in self.relay_urls:
+            await self.client.add_relay(relay_url)
+        await self.client.connect()
+        try:
+            await self.client.wait_for_connection(timedelta(seconds=connect_timeout))
+        except Exception as e:
+            logger.warning(f"Not all relays connected within {connect_timeout}s: {e}")
+        notifications = asyncio.create_task(self.client.handle_notifications(self))
+
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+        server = await asyncio.start_unix_server(self.handle_connection, self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        logger.info(
+            f"Relay gateway for {len(self.relay_urls)} relays listening on {self.socket_path}"
+        )
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            notifications.cancel()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+
+class GatewayClient:
+    """
+    Stand-in for nostr_sdk's Client that talks to a RelayGateway over its Unix
+    socket. Signing stays local; relay management is the gateway's job, so
+    add_relay and wait_for_connection do nothing.
+    """
+
+    def __init__(self, signer, socket_path: str):
+        self._signer = signer
+        self.socket_path = socket_path
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 0
+        self._events: Optional[asyncio.Queue] = None
+        self._connect_lock = asyncio.Lock()
+
+    async def add_relay(self, url: str):
+        pass
+
+    async def connect(self):
+        async with self._connect_lock:
+            if self._writer is not None and not self._writer.is_closing():
+                return
+            self._reader, self._writer = await asyncio.open_unix_connection(
+                self.socket_path
+            )
+            self._events = asyncio.Queue()
+            self._reader_task = asyncio.create_task(self._read_loop())
+            logger.info(f"Connected to relay gateway at {self.socket_path}")
+
+    async def wait_for_connection(self, timeout):
+        pass
+
+    async def _read_loop(self):
+        events = self._events
+        try:
+            while True:
+                message = await read_frame(self._reader)
+                if message is None:
+                    break
+                if message["op"] == "event":
+                    events.put_nowait(message)
+                    continue
+                future = self._pending.pop(message.get("id"), None)
+                if future is None or future.done():
+                    continue
+                if message["op"] == "error":
+                    future.set_exception(RuntimeError(f"Relay gateway: {message['error']}"))
+                else:
+                    future.set_result(message)
+        finally:
+            logger.warning("Relay gateway connection closed")
+            self._writer.close()
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Relay gateway connection closed"))
+            self._pending.clear()
+            # Ends handle_notifications so the caller can subscribe again
+            events.put_nowait(None)
+
+    async def _request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        await self.connect()
+        self._next_id += 1
+        message["id"] = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[self._next_id] = future
+        self._writer.write(encode_frame(message))
+        await self._writer.drain()
+        return await future
+
+    async def sign_event_builder(self, builder) -> Event:
+        return await builder.sign(self._signer)
+
+    async def send_event(self, event: Event) -> SendEventOutput:
+        reply = await self._request({"op": "publish", "event": json.loads(event.as_json())})
+        return SendEventOutput(id=event.id(), success=reply["success"], failed=reply["failed"])
+
+    async def subscribe(self, filter: Filter, opts=None) -> SubscribeOutput:
+        reply = await self._request({"op": "subscribe", "filter": json.loads(filter.as_json())})
+        return SubscribeOutput(id=reply["sub"], success=reply["success"], failed={})
+
+    async def unsubscribe(self, subscription_id: str):
+        await self._request({"op": "unsubscribe", "sub": subscription_id})
+
+    async def stats(self) -> Dict[str, Any]:
+        reply = await self._request({"op": "stats"})
+        reply.pop("op", None)
+        reply.pop("id", None)
+        return reply
+
+    async def handle_notifications(self, handler):
+        """Deliver forwarded events to handler.handle until the gateway connection drops."""
+        await self.connect()
+        events = self._events
+        while True:
+            message = await events.get()
+            if message is None:
+                return
+            event = Event.from_json(json.dumps(message["event"]))
+            await handler.handle(message["relay"], message["sub"], event)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared Nostr relay gateway")
+    parser.add_argument(
+        "--socket",
+        default=os.path.expanduser(
+            os.getenv("RELAY_GATEWAY_SOCKET") or "~/.unstuck_ai/relay_gateway.sock"
+        ),
+        help="Unix socket the MCP servers connect to",
+    )
+    parser.add_argument(
+        "--relays",
+        default=os.getenv(
+            "RELAY_URLS",
+            "wss://relay.damus.io,wss://relay.supertech.ai,wss://relay.primal.net,wss://relay.dvmdash.live",
+        ),
+        help="Comma-separated relay URLs",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    try:
+        asyncio.run(RelayGateway(args.relays.split(","), args.socket).serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
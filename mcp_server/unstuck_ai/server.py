@@ -1,15 +1,44 @@
 import os
+import io
 import asyncio
+import hashlib
+import threading
 import json
 import time
 import logging
 import requests
 import random
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import timedelta
 from typing import Optional, Dict, Any, List
 from dotenv import load_dotenv
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 from mcp.shared.exceptions import McpError
-from mcp.types import ErrorData, INTERNAL_ERROR, INVALID_PARAMS
+from mcp.types import ErrorData, INTERNAL_ERROR, INVALID_PARAMS, INVALID_REQUEST
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+try:
+    from .amplification import Amplifier, compose_note
+    from .answer_cache import AnswerCache, perceptual_hash
+    from .bidding import BidLedger, parse_ladder, plan_ladder
+    from .blossom import upload_to_blossom
+    from .local_storage import LocalScreenshotStorage
+    from .loop_watchdog import LoopWatchdog
+    from .profiling import ToolProfiler
+    from .wallet import NwcWallet
+except ImportError:
+    # Loaded as a plain file by `fastmcp run unstuck_ai/server.py:mcp`
+    from amplification import Amplifier, compose_note
+    from answer_cache import AnswerCache, perceptual_hash
+    from bidding import BidLedger, parse_ladder, plan_ladder
+    from blossom import upload_to_blossom
+    from local_storage import LocalScreenshotStorage
+    from loop_watchdog import LoopWatchdog
+    from profiling import ToolProfiler
+    from wallet import NwcWallet
 
 # Import PyAutoGUI for mouse control
 try:
@@ -151,12 +180,31 @@ def execute_drag(start_x_percent, start_y_percent, end_x_percent, end_y_percent)
         return False
 
 
-def execute_actions(actions_data):
+def region_to_screen_percent(x_percent, y_percent, region):
+    """
+    Map percentage coordinates within a cropped screenshot region onto
+    percentage coordinates of the full screen.
+
+    Args:
+        x_percent: X coordinate as a percentage of the region width (0-100)
+        y_percent: Y coordinate as a percentage of the region height (0-100)
+        region: [left, top, width, height] of the region in screen pixels
+    """
+    screen_width, screen_height = pyautogui.size()
+    left, top, width, height = region
+    x = left + (x_percent / 100) * width
+    y = top + (y_percent / 100) * height
+    return (x / screen_width) * 100, (y / screen_height) * 100
+
+
+def execute_actions(actions_data, region=None):
     """
     Execute a series of mouse actions based on the provided JSON data.
 
     Args:
         actions_data: A dictionary containing actions to execute
+        region: Optional [left, top, width, height] the screenshot was cropped
+            to; coordinates are then relative to that region
 
     Returns:
         A dictionary with results of the execution
@@ -182,6 +230,9 @@ def execute_actions(actions_data):
                 "error": "Invalid actions data: 'actions' list not found",
             }
 
+        def point(x, y):
+            return region_to_screen_percent(x, y, region) if region else (x, y)
+
         # Track results for each action
         results = []
 
@@ -191,12 +242,12 @@ def execute_actions(actions_data):
                 action_type = action.get("type")
 
                 if action_type == "click":
-                    success = execute_click(action.get("x", 0), action.get("y", 0))
+                    success = execute_click(*point(action.get("x", 0), action.get("y", 0)))
                     results.append({"index": i, "type": "click", "success": success})
 
                 elif action_type == "doubleClick":
                     success = execute_double_click(
-                        action.get("x", 0), action.get("y", 0)
+                        *point(action.get("x", 0), action.get("y", 0))
                     )
                     results.append(
                         {"index": i, "type": "doubleClick", "success": success}
@@ -206,10 +257,8 @@ def execute_actions(actions_data):
                     start = action.get("start", {})
                     end = action.get("end", {})
                     success = execute_drag(
-                        start.get("x", 0),
-                        start.get("y", 0),
-                        end.get("x", 0),
-                        end.get("y", 0),
+                        *point(start.get("x", 0), start.get("y", 0)),
+                        *point(end.get("x", 0), end.get("y", 0)),
                     )
                     results.append({"index": i, "type": "drag", "success": success})
 
@@ -246,84 +295,121 @@ def execute_actions(actions_data):
 
 
 # Digital Ocean Spaces upload functionality
-def upload_to_space(local_file, remote_file):
-    """
-    Upload a file to DigitalOcean Spaces
+# S3 client for the Space, created on first upload and reused after that
+_spaces_client = None
+_spaces_client_lock = threading.Lock()
 
-    Args:
-        local_file (str): Path to the local file
-        remote_file (str): Path in the Space where the file will be stored
+
+def get_spaces_client():
+    """
+    The shared S3 client for DigitalOcean Spaces
 
     Returns:
-        bool: True if upload was successful, False otherwise
+        The boto3 client, or None if the credentials are missing
     """
-    try:
-        # Initialize the S3 client for DigitalOcean Spaces
+    global _spaces_client
+    with _spaces_client_lock:
+        if _spaces_client is not None:
+            return _spaces_client
+
         import boto3
-        from botocore.exceptions import NoCredentialsError
-        
+
         # Get credentials from environment variables
         aws_access_key = os.getenv("DIGITAL_OCEAN_SPACES_ACCESS_KEY")
         aws_secret_key = os.getenv("DIGITAL_OCEAN_SPACES_SECRET_KEY")
         region = os.getenv("DIGITAL_OCEAN_SPACES_REGION", "nyc3")
-        space_name = os.getenv("DIGITAL_OCEAN_SPACE_NAME", "unstuck-goose")
         endpoint_url = f"https://{region}.digitaloceanspaces.com"
-        
+
         # Log credential information (masked for security)
         logger.info(f"DO Spaces Access Key: {'*' * 4}{aws_access_key[-4:] if aws_access_key else 'None'}")
         logger.info(f"DO Spaces Secret Key: {'*' * 4}{aws_secret_key[-4:] if aws_secret_key else 'None'}")
         logger.info(f"DO Spaces Region: {region}")
-        logger.info(f"DO Space Name: {space_name}")
         logger.info(f"DO Endpoint URL: {endpoint_url}")
-        
-        # Validate file exists
-        if not os.path.exists(local_file):
-            logger.error(f"File not found: {local_file}")
-            return False
-            
+
         # Validate credentials
         if not aws_access_key or not aws_secret_key:
             logger.error("Missing Digital Ocean Spaces credentials. Check your .env file for DIGITAL_OCEAN_SPACES_ACCESS_KEY and DIGITAL_OCEAN_SPACES_SECRET_KEY")
-            return False
-        
+            return None
+
         logger.info(f"Creating S3 client for Digital Ocean Spaces...")
-        s3 = boto3.client(
+        _spaces_client = boto3.client(
             "s3",
             region_name=region,
             endpoint_url=endpoint_url,
             aws_access_key_id=aws_access_key,
             aws_secret_access_key=aws_secret_key,
         )
+        return _spaces_client
 
-        # Upload the file with public-read ACL to make it publicly accessible
-        extra_args = {
-            "ACL": "public-read",  # This makes the file publicly accessible
-            "ContentType": "image/png",  # Set the appropriate content type
-        }
 
-        logger.info(f"Uploading file {local_file} to {space_name}/{remote_file}...")
-        s3.upload_file(local_file, space_name, remote_file, ExtraArgs=extra_args)
-        logger.info(f"Upload Successful: {local_file} -> {space_name}/{remote_file}")
+def upload_to_space(local_file, remote_file):
+    """
+    Upload a file to DigitalOcean Spaces
 
-        # Generate and print the public URL
-        public_url = f"https://{space_name}.{region}.digitaloceanspaces.com/{remote_file}"
-        logger.info(f"Public URL: {public_url}")
+    Args:
+        local_file (str): Path to the local file
+        remote_file (str): Path in the Space where the file will be stored
 
-        return True
+    Returns:
+        bool: True if upload was successful, False otherwise
+    """
+    try:
+        with open(local_file, "rb") as f:
+            data = f.read()
     except FileNotFoundError as e:
         logger.error(f"The file was not found: {local_file}")
         logger.error(f"FileNotFoundError details: {str(e)}")
         return False
+
+    if not upload_bytes_to_space(data, remote_file):
+        return False
+
+    # Generate and print the public URL
+    region = os.getenv("DIGITAL_OCEAN_SPACES_REGION", "nyc3")
+    space_name = os.getenv("DIGITAL_OCEAN_SPACE_NAME", "unstuck-goose")
+    public_url = f"https://{space_name}.{region}.digitaloceanspaces.com/{remote_file}"
+    logger.info(f"Public URL: {public_url}")
+    return True
+
+
+def upload_bytes_to_space(data, remote_file, content_type="image/png"):
+    """
+    Upload an in-memory buffer to DigitalOcean Spaces without touching disk
+
+    Args:
+        data (bytes): The file contents
+        remote_file (str): Path in the Space where the file will be stored
+        content_type (str): MIME type of the data
+
+    Returns:
+        bool: True if upload was successful, False otherwise
+    """
+    try:
+        from botocore.exceptions import BotoCoreError, ClientError, NoCredentialsError
+
+        s3 = get_spaces_client()
+        if s3 is None:
+            return False
+
+        space_name = os.getenv("DIGITAL_OCEAN_SPACE_NAME", "unstuck-goose")
+        logger.info(f"Uploading {len(data)} bytes to {space_name}/{remote_file}...")
+        # public-read makes the file publicly accessible
+        s3.put_object(
+            Bucket=space_name,
+            Key=remote_file,
+            Body=data,
+            ACL="public-read",
+            ContentType=content_type,
+        )
+        logger.info(f"Upload Successful: {space_name}/{remote_file}")
+        return True
     except NoCredentialsError as e:
         logger.error("Credentials not available or invalid")
         logger.error(f"NoCredentialsError details: {str(e)}")
         return False
-    except boto3.exceptions.S3UploadFailedError as e:
+    except (ClientError, BotoCoreError) as e:
         logger.error(f"S3 upload failed: {str(e)}")
         return False
-    except boto3.exceptions.Boto3Error as e:
-        logger.error(f"Boto3 error during upload: {str(e)}")
-        return False
     except Exception as e:
         logger.error(f"An error occurred during upload: {str(e)}")
         logger.error(f"Error type: {type(e).__name__}")
@@ -331,6 +417,7 @@ def upload_to_space(local_file, remote_file):
         logger.error(f"Traceback: {traceback.format_exc()}")
         return False
 
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -352,6 +439,8 @@ try:
         Event,
         EventId,
         HandleNotification,
+        EventDeletionRequest,
+        Nip19Event,
         RelayMessage,
         Timestamp,
         NostrWalletConnectUri,
@@ -365,8 +454,38 @@ except ImportError:
     NOSTR_SDK_AVAILABLE = False
     logger.warning("Nostr SDK is not available")
 
+# Fire-and-forget tasks, referenced here so they aren't garbage collected mid-run
+background_tasks = set()
+
+
+def run_in_background(coro) -> asyncio.Task:
+    """Run a coroutine without waiting for it."""
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+
+def start_services():
+    """
+    Start the event-loop watchdog, and warm up the NWC wallet and keep it
+    connected if there is one and warm-up is on.
+    """
+    if loop_watchdog:
+        loop_watchdog.start()
+    if nwc_wallet and NWC_WARMUP and not loopback_market:
+        nwc_wallet.start()
+
+
+@asynccontextmanager
+async def server_lifespan(app):
+    # Entered once per session on the SSE transport, start_services() only acts the first time
+    start_services()
+    yield {}
+
+
 # Initialize MCP server
-mcp = FastMCP("unstuck-ai")
+mcp = FastMCP("unstuck-ai", lifespan=server_lifespan)
 
 # Load environment variables
 load_dotenv()
@@ -381,17 +500,189 @@ RELAY_URLS = os.getenv(
 LEXE_PROXY_NODE_API_URL = os.getenv("LEXE_PROXY_NODE_API_URL", "http://localhost:5393")
 # NWC key for Lightning payments
 NWC_KEY = os.getenv("NWC_KEY")
-# Maximum price limit for automatic payments (in sats)
-MAX_AUTO_PAYMENT_SATS = 100
+# Connect to the NWC wallet and load its info at startup instead of on the first payment
+NWC_WARMUP = os.getenv("NWC_WARMUP", "true").lower() == "true"
+# Seconds between keepalive requests to the wallet, 0 to let the connection idle
+NWC_KEEPALIVE_SECONDS = float(os.getenv("NWC_KEEPALIVE_SECONDS", "60"))
+# How long cached wallet capabilities and balance are trusted for payment pre-checks
+NWC_INFO_TTL_SECONDS = float(os.getenv("NWC_INFO_TTL_SECONDS", "300"))
+# "nostr" for real relays and payments, "loopback" for an in-process relay, worker and wallet
+MARKETPLACE_BACKEND = os.getenv("MARKETPLACE_BACKEND", "nostr").lower()
+# The loopback worker's asking price, fixed delays before its offer and result, and the actions it sends
+LOOPBACK_PRICE_SATS = int(os.getenv("LOOPBACK_PRICE_SATS", "10"))
+LOOPBACK_OFFER_DELAY_MS = float(os.getenv("LOOPBACK_OFFER_DELAY_MS", "0"))
+LOOPBACK_RESULT_DELAY_MS = float(os.getenv("LOOPBACK_RESULT_DELAY_MS", "0"))
+LOOPBACK_ACTIONS = json.loads(os.getenv("LOOPBACK_ACTIONS", "[]"))
+# Unix socket of a local relay gateway (relay_gateway.py) to share relay connections through
+RELAY_GATEWAY_SOCKET = os.path.expanduser(os.getenv("RELAY_GATEWAY_SOCKET", ""))
+# Seconds to wait for relays to connect before publishing anyway
+RELAY_CONNECT_TIMEOUT = float(os.getenv("RELAY_CONNECT_TIMEOUT", "5"))
+# Maximum price limit for automatic payments (in sats), also the per-job bid cap
+MAX_AUTO_PAYMENT_SATS = int(os.getenv("MAX_AUTO_PAYMENT_SATS", "100"))
+# Prices a job without offers escalates through, e.g. "10,25,50"; empty for a fixed price
+BID_LADDER = parse_ladder(os.getenv("BID_LADDER", ""))
+# Seconds to wait for an affordable offer before moving up the ladder
+BID_STEP_SECONDS = float(os.getenv("BID_STEP_SECONDS", "30"))
+# Most sats paid automatically per UTC day across all jobs, 0 for no limit
+DAILY_SPEND_CAP_SATS = int(os.getenv("DAILY_SPEND_CAP_SATS", "0"))
+BID_LEDGER_PATH = os.path.expanduser(
+    os.getenv("BID_LEDGER_PATH", "~/.unstuck_ai/bid_ledger.json")
+)
+bid_ledger = BidLedger(BID_LEDGER_PATH, DAILY_SPEND_CAP_SATS)
+# Announce jobs that get no offer within AMPLIFY_AFTER_SECONDS with a kind 1 note
+AMPLIFY_ENABLED = os.getenv("AMPLIFY_ENABLED", "false").lower() == "true"
+AMPLIFY_AFTER_SECONDS = float(os.getenv("AMPLIFY_AFTER_SECONDS", "45"))
+# Relays the notes go to, usually more (and more social) than RELAY_URLS
+AMPLIFY_RELAY_URLS = [
+    url.strip()
+    for url in os.getenv(
+        "AMPLIFY_RELAY_URLS",
+        "wss://relay.damus.io,wss://relay.primal.net,wss://nos.lol,wss://relay.nostr.band",
+    ).split(",")
+    if url.strip()
+]
+AMPLIFY_HASHTAGS = [
+    tag.strip().lstrip("#")
+    for tag in os.getenv("AMPLIFY_HASHTAGS", "unstuck,asknostr").split(",")
+    if tag.strip()
+]
+# Put the screenshot URL in the note so clients show a preview
+AMPLIFY_INCLUDE_IMAGE = os.getenv("AMPLIFY_INCLUDE_IMAGE", "true").lower() == "true"
+# At most one note per interval, and one per description per dedup window
+AMPLIFY_MIN_INTERVAL_SECONDS = float(os.getenv("AMPLIFY_MIN_INTERVAL_SECONDS", "300"))
+AMPLIFY_DEDUP_SECONDS = float(os.getenv("AMPLIFY_DEDUP_SECONDS", "3600"))
+amplifier = Amplifier(AMPLIFY_MIN_INTERVAL_SECONDS, AMPLIFY_DEDUP_SECONDS)
 # Digital Ocean Spaces configuration
 DIGITAL_OCEAN_SPACE_NAME = os.getenv("DIGITAL_OCEAN_SPACE_NAME", "unstuck-goose")
 DIGITAL_OCEAN_REGION = os.getenv("DIGITAL_OCEAN_REGION", "nyc3")
+# Where uploaded screenshots are hosted: "spaces", "blossom" or "local"
+SCREENSHOT_STORAGE = os.getenv("SCREENSHOT_STORAGE", "spaces").lower()
+# Comma-separated list of Blossom servers to mirror screenshots to
+BLOSSOM_SERVERS = [
+    server.strip()
+    for server in os.getenv("BLOSSOM_SERVERS", "https://blossom.primal.net").split(",")
+    if server.strip()
+]
+# Every URL an uploaded screenshot is reachable at, keyed by its primary URL
+screenshot_mirrors: Dict[str, List[str]] = {}
+# Public URLs of recently uploaded screenshots by content hash, shared by all sessions
+UPLOAD_CACHE_SIZE = int(os.getenv("UPLOAD_CACHE_SIZE", "256"))
+upload_cache: "OrderedDict[str, str]" = OrderedDict()
+upload_cache_lock = threading.Lock()
+# Per-hash locks so concurrent uploads of one screenshot happen once
+uploads_in_flight: Dict[str, threading.Lock] = {}
+# Jobs one MCP session may have running at once (SSE / streamable HTTP transports)
+MAX_JOBS_PER_SESSION = int(os.getenv("MAX_JOBS_PER_SESSION", "3"))
+running_jobs_by_session: Dict[str, int] = {}
+# Close the shared response subscription after this many seconds without waiting jobs, 0 to keep it open
+RESPONSE_SUBSCRIPTION_IDLE_SECONDS = float(os.getenv("RESPONSE_SUBSCRIPTION_IDLE_SECONDS", "60"))
+# Longest wait between attempts to resubscribe after the notification loop ended
+RESPONSE_RESUBSCRIBE_MAX_DELAY = 30.0
+# Publish a kind 5 deletion of a job's requests when it times out, so workers stop on it
+CANCEL_ON_TIMEOUT = os.getenv("CANCEL_ON_TIMEOUT", "true").lower() == "true"
+# Tools profiled on every call ("all" for every async tool); the help tools also take profile=true per call
+PROFILE_TOOLS = [
+    name.strip() for name in os.getenv("PROFILE_TOOLS", "").split(",") if name.strip()
+]
+# Where each profiled call's .prof and .folded (flamegraph) files are written
+PROFILE_DIR = os.path.expanduser(os.getenv("PROFILE_DIR", "~/.unstuck_ai/profiles"))
+# Profiled calls kept in memory for get_profile_report
+PROFILE_KEEP_CALLS = int(os.getenv("PROFILE_KEEP_CALLS", "50"))
+profiler = ToolProfiler(PROFILE_TOOLS, PROFILE_DIR, PROFILE_KEEP_CALLS)
+# Measure event-loop lag and capture the stack of anything blocking the loop longer than the threshold
+LOOP_WATCHDOG_ENABLED = os.getenv("LOOP_WATCHDOG_ENABLED", "true").lower() == "true"
+LOOP_LAG_THRESHOLD_MS = float(os.getenv("LOOP_LAG_THRESHOLD_MS", "100"))
+LOOP_WATCHDOG_INTERVAL_MS = float(os.getenv("LOOP_WATCHDOG_INTERVAL_MS", "50"))
+loop_watchdog = (
+    LoopWatchdog(LOOP_LAG_THRESHOLD_MS, LOOP_WATCHDOG_INTERVAL_MS)
+    if LOOP_WATCHDOG_ENABLED
+    else None
+)
+# Only one job at a time may drive the mouse; actions run in a worker thread
+# so other sessions keep being served meanwhile
+actions_lock = asyncio.Lock()
+# Seconds finished submit-and-poll jobs stay available to pollers
+HELP_JOB_RETENTION = int(os.getenv("HELP_JOB_RETENTION", "3600"))
+# Longest a single long-poll for a job's status may block
+MAX_JOB_WAIT_SECONDS = 60
+# Help requests submitted in the background, by job id
+help_jobs: Dict[str, Dict[str, Any]] = {}
+# "local" storage: screenshots stay on disk and are served over the LAN
+LOCAL_STORAGE_DIR = os.path.expanduser(
+    os.getenv("LOCAL_STORAGE_DIR", "~/.unstuck_ai/screenshots")
+)
+LOCAL_STORAGE_MAX_MB = float(os.getenv("LOCAL_STORAGE_MAX_MB", "512"))
+LOCAL_STORAGE_HOST = os.getenv("LOCAL_STORAGE_HOST", "0.0.0.0")
+LOCAL_STORAGE_PORT = int(os.getenv("LOCAL_STORAGE_PORT", "8090"))
+# Base URL workers use to reach this machine, detected from the LAN IP if unset
+LOCAL_STORAGE_PUBLIC_URL = os.getenv("LOCAL_STORAGE_PUBLIC_URL")
+
+local_storage = (
+    LocalScreenshotStorage(
+        LOCAL_STORAGE_DIR,
+        max_bytes=int(LOCAL_STORAGE_MAX_MB * 1024 * 1024),
+        host=LOCAL_STORAGE_HOST,
+        port=LOCAL_STORAGE_PORT,
+        public_url=LOCAL_STORAGE_PUBLIC_URL,
+    )
+    if SCREENSHOT_STORAGE == "local"
+    else None
+)
+# Reuse answers for near-duplicate screenshots instead of paying for a new job.
+# Off by default: screens with the same layout but different content (another
+# captcha, another dialog) can hash alike, and the replayed answer would be wrong
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "false").lower() == "true"
+ANSWER_CACHE_PATH = os.path.expanduser(
+    os.getenv("ANSWER_CACHE_PATH", "~/.unstuck_ai/answer_cache.json")
+)
+# Maximum Hamming distance (out of 64 bits) between screenshot hashes for a hit
+ANSWER_CACHE_MAX_DISTANCE = int(os.getenv("ANSWER_CACHE_MAX_DISTANCE", "2"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "500"))
+ANSWER_CACHE_TTL_DAYS = float(os.getenv("ANSWER_CACHE_TTL_DAYS", "30"))
+
+answer_cache = (
+    AnswerCache(
+        ANSWER_CACHE_PATH,
+        max_distance=ANSWER_CACHE_MAX_DISTANCE,
+        max_entries=ANSWER_CACHE_MAX_ENTRIES,
+        ttl_seconds=ANSWER_CACHE_TTL_DAYS * 86400,
+    )
+    if ANSWER_CACHE_ENABLED
+    else None
+)
 
 # Initialize Nostr client and NWC if SDK is available
+loopback_market = None
+nwc_wallet = None
 if NOSTR_SDK_AVAILABLE:
     keys = Keys.parse(NOSTR_PRIVATE_KEY) if NOSTR_PRIVATE_KEY else Keys.generate()
     signer = NostrSigner.keys(keys)
-    client = Client(signer)
+    if MARKETPLACE_BACKEND == "loopback":
+        try:
+            from .loopback import LoopbackMarketplace
+        except ImportError:
+            from loopback import LoopbackMarketplace
+
+        # Jobs are answered in-process by a scripted worker, payments are simulated
+        loopback_market = LoopbackMarketplace(
+            price_sats=LOOPBACK_PRICE_SATS,
+            offer_delay=LOOPBACK_OFFER_DELAY_MS / 1000,
+            result_delay=LOOPBACK_RESULT_DELAY_MS / 1000,
+            actions=LOOPBACK_ACTIONS,
+        )
+        client = loopback_market.client(signer)
+        logger.info("Using the loopback marketplace, no relays or payments are used")
+    elif RELAY_GATEWAY_SOCKET:
+        try:
+            from .relay_gateway import GatewayClient
+        except ImportError:
+            from relay_gateway import GatewayClient
+
+        # Relays are connected by the gateway daemon, shared with other local servers
+        client = GatewayClient(signer, RELAY_GATEWAY_SOCKET)
+        logger.info(f"Using relay gateway at {RELAY_GATEWAY_SOCKET}")
+    else:
+        client = Client(signer)
     logger.info(
         f"Nostr client initialized with public key: {keys.public_key().to_hex()}"
     )
@@ -402,6 +693,7 @@ if NOSTR_SDK_AVAILABLE:
         try:
             uri = NostrWalletConnectUri.parse(NWC_KEY)
             nwc = Nwc(uri)
+            nwc_wallet = NwcWallet(nwc, NWC_INFO_TTL_SECONDS, NWC_KEEPALIVE_SECONDS)
             logger.info("NWC client initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize NWC client: {str(e)}")
@@ -418,11 +710,25 @@ if NOSTR_SDK_AVAILABLE:
 class NotificationHandler:
     """Handler for Nostr notifications."""
 
-    def __init__(self, event_id):
+    def __init__(self, event_id, region=None, bid_sats=None):
         self.event_id = event_id
+        # The original request plus any re-published at a higher bid
+        self.request_ids = [event_id]
+        # Screen region the request's screenshot was cropped to, if any
+        self.region = region
+        # Highest offer price paid automatically right now, None for up to MAX_AUTO_PAYMENT_SATS
+        self.bid_sats = bid_sats
         self.job_completed = asyncio.Event()
+        self.offer_received = asyncio.Event()
+        self.offer_paid = asyncio.Event()
         self.offers = []
+        # Offers priced above the current bid, paid if the bid rises to meet them
+        self.held_offers = []
+        self.paid_offer = None
+        self.first_offer_at = None
         self.result = None
+        # Which of request_ids the result answered
+        self.answered_request_id = None
 
     async def handle(self, relay_url, subscription_id, ev):
         event_id_hex = ev.id().to_hex()
@@ -433,7 +739,7 @@ class NotificationHandler:
         for tag in ev.tags().to_vec():
             tag_vec = tag.as_vec()
             if len(tag_vec) >= 2 and tag_vec[0] == "e":
-                if tag_vec[1] == self.event_id:
+                if tag_vec[1] in self.request_ids:
                     is_related = True
                     logger.info(
                         f"Found related event: {event_id_hex} (Kind: {event_kind})"
@@ -447,6 +753,7 @@ class NotificationHandler:
                         event_kind == 6109
                     ):  # Specific job result event we're waiting for
                         logger.info(f"Received kind 6109 result event: {event_id_hex}")
+                        self.answered_request_id = tag_vec[1]
                         await self._process_result_event(ev)
                         logger.info(f"Job completed with result event: {event_id_hex}")
                         self.job_completed.set()
@@ -507,29 +814,72 @@ class NotificationHandler:
         }
 
         self.offers.append(offer_data)
+        if self.first_offer_at is None:
+            self.first_offer_at = offer_data["received_at"]
+            self.offer_received.set()
         logger.info(f"Added offer to list. Total offers: {len(self.offers)}")
 
         # Pay the invoice if it exists and price is within limits
         if invoice and price is not None:
-            try:
+            if self.paid_offer is not None:
+                offer_data["payment_skipped"] = "Already paid an offer for this job"
+            elif self.bid_sats is not None and price > self.bid_sats:
                 logger.info(
-                    f"Attempting to pay invoice for offer {event.id().to_hex()}"
-                )
-                payment_result = await pay_lightning_invoice(
-                    invoice=invoice,
-                    price_sats=price,
-                    note=f"Payment for Nostr event {self.event_id}",
+                    f"Holding offer of {price} sats, above the current bid of {self.bid_sats} sats"
                 )
+                offer_data["payment_skipped"] = f"Above the current bid of {self.bid_sats} sats"
+                self.held_offers.append(offer_data)
+            else:
+                await self._pay_offer(offer_data)
+
+    async def _pay_offer(self, offer_data):
+        """Pay an offer's invoice, within the daily spending cap. True if it was paid."""
+        price = offer_data["price_sats"]
+        if not bid_ledger.reserve(price):
+            logger.warning(
+                f"Not paying {price} sats: daily spend cap of {DAILY_SPEND_CAP_SATS} sats reached"
+            )
+            offer_data["payment_skipped"] = "Daily spend cap reached"
+            return False
+
+        # Claimed before the first await so a second offer can't be paid meanwhile
+        self.paid_offer = offer_data
+        offer_data.pop("payment_skipped", None)
+        try:
+            logger.info(f"Attempting to pay invoice for offer {offer_data['event_id']}")
+            payment_result = await pay_lightning_invoice(
+                invoice=offer_data["invoice"],
+                price_sats=price,
+                note=f"Payment for Nostr event {self.event_id}",
+            )
 
-                # Update the offer with payment information
-                offer_data["payment_result"] = payment_result
-                logger.info(f"Payment successful for offer {event.id().to_hex()}")
+            # Update the offer with payment information
+            offer_data["payment_result"] = payment_result
+            logger.info(f"Payment successful for offer {offer_data['event_id']}")
+            self.offer_paid.set()
+            return True
 
-            except Exception as e:
-                logger.error(
-                    f"Failed to pay invoice for offer {event.id().to_hex()}: {str(e)}"
-                )
-                offer_data["payment_error"] = str(e)
+        except Exception as e:
+            logger.error(
+                f"Failed to pay invoice for offer {offer_data['event_id']}: {str(e)}"
+            )
+            offer_data["payment_error"] = str(e)
+            self.paid_offer = None
+            bid_ledger.release(price)
+            return False
+
+    async def raise_bid(self, bid_sats):
+        """Raise the bid and pay the cheapest held offer it now covers. True if one was paid."""
+        self.bid_sats = bid_sats
+        affordable = sorted(
+            (offer for offer in self.held_offers if offer["price_sats"] <= bid_sats),
+            key=lambda offer: offer["price_sats"],
+        )
+        for offer in affordable:
+            self.held_offers.remove(offer)
+            if self.paid_offer is None and await self._pay_offer(offer):
+                return True
+        return False
 
     async def _process_result_event(self, event):
         """Process a job result event (kind 6xxx)"""
@@ -577,7 +927,10 @@ class NotificationHandler:
                     )
 
                     # Execute the actions
-                    execution_result = execute_actions(content_json)
+                    async with actions_lock:
+                        execution_result = await asyncio.to_thread(
+                            execute_actions, content_json, self.region
+                        )
 
                     logger.info(
                         f"Actions execution result: {json.dumps(execution_result)}"
@@ -660,7 +1013,7 @@ async def pay_lightning_invoice_nwc(
         # Pay the invoice using NWC
         logger.info("Sending payment request via NWC")
         try:
-            payment_result = await nwc.pay_invoice(params)
+            payment_result, elapsed_ms = await nwc_wallet.pay_invoice(params, price_sats)
         except Exception as e:
             error_msg = str(e)
             logger.error(f"NWC payment error: {error_msg}")
@@ -673,8 +1026,10 @@ async def pay_lightning_invoice_nwc(
                 logger.error(
                     "Check if your NWC wallet implementation has specific requirements for payments."
                 )
+            raise
 
-        return result
+        logger.info(f"Successfully paid invoice via NWC in {elapsed_ms}ms")
+        return {"preimage": payment_result.preimage, "paid_via": "nwc", "payment_ms": elapsed_ms}
 
     except Exception as e:
         logger.error(f"Error paying Lightning invoice via NWC: {str(e)}")
@@ -717,8 +1072,15 @@ async def pay_lightning_invoice(
         f"Preparing to pay Lightning invoice (price: {price_sats if price_sats else 'unknown'} sats)"
     )
 
-    # Try to pay with NWC first if available
-    if NOSTR_SDK_AVAILABLE and nwc:
+    if loopback_market:
+        logger.info("Paying loopback invoice")
+        return loopback_market.pay_invoice(invoice)
+
+    # Try to pay with NWC first if available, unless its cached info says it would fail
+    unpayable = nwc_wallet.cannot_pay(price_sats) if nwc_wallet else None
+    if unpayable:
+        logger.warning(f"Skipping NWC: {unpayable}")
+    elif NOSTR_SDK_AVAILABLE and nwc:
         try:
             logger.info("Attempting to pay with NWC")
             return await pay_lightning_invoice_nwc(invoice, price_sats, note)
@@ -766,11 +1128,153 @@ async def pay_lightning_invoice(
         )
 
 
+# Upload a screenshot to the configured Blossom servers
+def upload_bytes_to_blossom_servers(data: bytes) -> Optional[str]:
+    """
+    Upload an in-memory PNG to every server in BLOSSOM_SERVERS.
+
+    Returns:
+        The first confirmed public URL, or None if the upload failed
+    """
+    if not NOSTR_SDK_AVAILABLE:
+        logger.error("Nostr SDK not available, cannot sign Blossom uploads")
+        return None
+
+    try:
+        started = time.perf_counter()
+        mirror_urls = upload_to_blossom(data, BLOSSOM_SERVERS, keys)
+        if not mirror_urls:
+            return None
+
+        logger.info(
+            f"Blossom upload confirmed in {(time.perf_counter() - started) * 1000:.0f}ms, "
+            f"mirrors: {mirror_urls}"
+        )
+        screenshot_mirrors[mirror_urls[0]] = mirror_urls
+        return mirror_urls[0]
+    except Exception as e:
+        logger.error(f"An error occurred during Blossom upload: {str(e)}")
+        return None
+
+
+# Store a screenshot on local disk and serve it to the LAN
+def publish_to_local_storage(data: bytes) -> Optional[str]:
+    """
+    Write PNG bytes to the local content-addressed store and start the
+    built-in HTTP server if it isn't running yet.
+
+    Returns:
+        The LAN URL, or None if the screenshot couldn't be stored or served
+    """
+    try:
+        started = time.perf_counter()
+        url = local_storage.publish(data)
+        logger.info(
+            f"Stored screenshot locally in {(time.perf_counter() - started) * 1000:.1f}ms: {url}"
+        )
+        return url
+    except Exception as e:
+        logger.error(f"An error occurred storing the screenshot locally: {str(e)}")
+        return None
+
+
+def cached_upload_url(sha256: str) -> Optional[str]:
+    """URL a screenshot with this content hash was already uploaded to, if any."""
+    with upload_cache_lock:
+        url = upload_cache.get(sha256)
+        if url:
+            upload_cache.move_to_end(sha256)
+        return url
+
+
+def remember_upload(sha256: str, url: str):
+    with upload_cache_lock:
+        upload_cache[sha256] = url
+        upload_cache.move_to_end(sha256)
+        while len(upload_cache) > UPLOAD_CACHE_SIZE:
+            upload_cache.popitem(last=False)
+
+
+# Upload a screenshot held in memory to the configured storage
+def publish_screenshot_bytes(data: bytes) -> Optional[str]:
+    """
+    Upload PNG bytes to the configured storage, reusing the URL of an
+    identical screenshot uploaded earlier by any session.
+    """
+    sha256 = hashlib.sha256(data).hexdigest()
+    with upload_cache_lock:
+        in_flight = uploads_in_flight.setdefault(sha256, threading.Lock())
+    # Sessions sending the same screenshot at once wait for one upload instead of racing
+    with in_flight:
+        url = cached_upload_url(sha256)
+        if url:
+            logger.info(f"Reusing earlier upload of identical screenshot: {url}")
+            return url
+        try:
+            url = upload_screenshot_bytes(data)
+            if url:
+                remember_upload(sha256, url)
+        finally:
+            with upload_cache_lock:
+                uploads_in_flight.pop(sha256, None)
+    return url
+
+
+def upload_screenshot_bytes(data: bytes) -> Optional[str]:
+    """
+    Upload PNG bytes to Blossom, Digital Ocean Spaces or local storage,
+    whichever SCREENSHOT_STORAGE selects, without writing them to disk first.
+
+    Args:
+        data: The encoded PNG
+
+    Returns:
+        The public URL, or None if the upload failed
+    """
+    if SCREENSHOT_STORAGE == "blossom":
+        return upload_bytes_to_blossom_servers(data)
+    if SCREENSHOT_STORAGE == "local":
+        return publish_to_local_storage(data)
+
+    remote_path = f"uploads/screenshot_{int(time.time())}_{random.randint(1,10000)}.png"
+    if upload_bytes_to_space(data, remote_path):
+        return f"https://{DIGITAL_OCEAN_SPACE_NAME}.{DIGITAL_OCEAN_REGION}.digitaloceanspaces.com/{remote_path}"
+    return None
+
+
+# Capture the screen straight into memory
+def capture_screen(region: Optional[List[int]] = None) -> bytes:
+    """
+    Grab the display in-process and encode it as PNG in memory.
+
+    Args:
+        region: Optional [left, top, width, height] to crop to, in screen pixels
+
+    Returns:
+        The PNG bytes
+    """
+    from PIL import ImageGrab
+
+    bbox = None
+    if region:
+        if len(region) != 4 or region[2] <= 0 or region[3] <= 0:
+            raise ValueError("region must be [left, top, width, height]")
+        left, top, width, height = region
+        bbox = (left, top, left + width, top + height)
+
+    image = ImageGrab.grab(bbox=bbox)
+    buffer = io.BytesIO()
+    # Screenshots are mostly flat colour, fast compression is nearly as small
+    image.save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
+
+
 # Function to check if a string is a local file path and upload it if needed
 def ensure_public_url(file_path_or_url: str) -> str:
     """
     Check if the provided string is a local file path.
-    If it is, upload it to Digital Ocean Spaces and return the public URL.
+    If it is, upload it to the configured screenshot storage (Digital Ocean
+    Spaces, Blossom or the local LAN server) and return the public URL.
     Otherwise, return the original URL.
 
     Args:
@@ -782,134 +1286,688 @@ def ensure_public_url(file_path_or_url: str) -> str:
     # Check if it's a local file path
     if os.path.exists(file_path_or_url) and os.path.isfile(file_path_or_url):
         logger.info(f"Detected local file path: {file_path_or_url}")
+        logger.info(f"Uploading to {SCREENSHOT_STORAGE} screenshot storage")
 
-        # Generate a unique remote path
-        remote_path = (
-            f"uploads/screenshot_{int(time.time())}_{random.randint(1,10000)}.png"
-        )
-
-        # Upload the file
-        logger.info(
-            f"Uploading to Digital Ocean Spaces: {file_path_or_url} -> {remote_path}"
-        )
-        success = upload_to_space(file_path_or_url, remote_path)
-
-        if success:
-            # Generate and return the public URL
-            public_url = f"https://{DIGITAL_OCEAN_SPACE_NAME}.{DIGITAL_OCEAN_REGION}.digitaloceanspaces.com/{remote_path}"
-            logger.info(f"Successfully uploaded to Digital Ocean Spaces: {public_url}")
-            return public_url
-        else:
-            logger.error(f"Failed to upload local file: {file_path_or_url}")
-            # Return original path if upload fails
+        try:
+            with open(file_path_or_url, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            logger.error(f"Could not read {file_path_or_url}: {str(e)}")
             return file_path_or_url
+        public_url = publish_screenshot_bytes(data)
+        if public_url:
+            return public_url
+        logger.error(f"Failed to upload local file: {file_path_or_url}")
+        return file_path_or_url
 
-    # If it's not a local file or upload fails, return the original URL
+    # If it's not a local file, return the original URL
     return file_path_or_url
 
 
+
+relay_connect_lock = asyncio.Lock()
+relays_connected = False
+
+
 # Initialize Nostr client
 async def init_nostr_client():
-    """Initialize connection to Nostr relays"""
-    if not NOSTR_SDK_AVAILABLE:
+    """
+    Initialize connection to Nostr relays.
+
+    The connection pool is shared by every session, so only the first caller
+    connects; the SDK reconnects dropped relays on its own after that.
+    """
+    global relays_connected
+    if not NOSTR_SDK_AVAILABLE or relays_connected:
         return
 
-    for relay_url in RELAY_URLS:
-        await client.add_relay(relay_url.strip())
-    await client.connect()
+    async with relay_connect_lock:
+        if relays_connected:
+            return
+        for relay_url in RELAY_URLS:
+            await client.add_relay(relay_url.strip())
+        await client.connect()
+        try:
+            await client.wait_for_connection(timedelta(seconds=RELAY_CONNECT_TIMEOUT))
+        except Exception as e:
+            logger.warning(f"Not all relays connected within {RELAY_CONNECT_TIMEOUT}s: {e}")
+        relays_connected = True
 
 
-# Function to send a request and wait for result
-async def request_and_wait_for_result(
-    description, screenshot_url, max_price_sats=None, timeout=300
-):
+# Connect to relays and subscribe to responses before the job request exists
+async def open_response_subscription() -> Dict[str, Any]:
     """
-    Send a request for visual computer interaction help and wait for the result.
+    Connect to the relays and subscribe to kind 7000 and 6109 events that tag
+    our public key.
+
+    Workers tag the requester with a "p" tag on every offer and result, so this
+    filter does not depend on the job ID and can be set up while the
+    screenshot is still uploading.
+
+    Returns:
+        Dictionary with the subscription ID and how long each step took
     """
-    try:
-        if not NOSTR_SDK_AVAILABLE:
-            logger.warning("Nostr SDK not available, returning mock response")
-            return {
-                "job_id": "mock-job-id",
-                "offers": [],
-                "selected_offer": None,
-                "result": {
-                    "content": f"Mock response for: {description} (Nostr SDK not available)",
-                    "screenshot_url": screenshot_url,
-                    "max_price_sats": max_price_sats,
-                },
-            }
+    started = time.perf_counter()
+    await init_nostr_client()
+    connected = time.perf_counter()
+
+    response_filter = (
+        Filter()
+        .pubkey(keys.public_key())
+        .kinds([Kind(7000), Kind(6109)])
+        .since(Timestamp.now())
+    )
+    output = await client.subscribe(response_filter)
+    subscribed = time.perf_counter()
+
+    logger.info(f"Response subscription {output.id} active on {output.success}")
+    return {
+        "subscription_id": output.id,
+        "relay_connect_ms": round((connected - started) * 1000, 1),
+        "subscribe_ms": round((subscribed - connected) * 1000, 1),
+    }
+
 
-        # Create and broadcast the event
+class ResponseRouter:
+    """
+    One response subscription and one notification loop shared by all jobs.
+
+    Every offer and result tags our public key, so a single subscription sees
+    the responses to every job; each event is handed to the NotificationHandler
+    registered for the job it references. Concurrent sessions therefore don't
+    each open their own subscription and notification loop on the shared client.
+
+    The subscription is closed once no job has been waiting for
+    RESPONSE_SUBSCRIPTION_IDLE_SECONDS, so relays stop streaming to an idle
+    server, and reopened by the next job. If the notification loop ends while
+    jobs are waiting (the gateway connection dropped), it is reopened right
+    away, backing off while that keeps failing.
+    """
+
+    def __init__(self):
+        self.handlers: Dict[str, NotificationHandler] = {}
+        self.subscription_id = None
+        self.task: Optional[asyncio.Task] = None
+        self.dispatches = set()
+        self.idle_timer: Optional[asyncio.TimerHandle] = None
+        self._lock = asyncio.Lock()
+        self.resubscribing = False
+        # Seconds to wait before the next resubscribe, 0 after a long-lived loop
+        self.resubscribe_delay = 0.0
+        self.task_started = 0.0
+        self.stats = {
+            "events": 0,
+            "routed": 0,
+            "unmatched": 0,
+            "subscriptions_opened": 0,
+            "subscriptions_closed": 0,
+            "resubscribes": 0,
+        }
+
+    async def ensure_started(self) -> Dict[str, Any]:
+        """
+        Subscribe and start the notification loop if that hasn't happened yet.
+
+        Returns:
+            Timings of the relay connect and subscribe steps (zero once running)
+        """
+        async with self._lock:
+            self._cancel_idle_timer()
+            if self.task is not None and self.task.done():
+                # The loop ended (the gateway connection dropped), its subscription is gone too
+                await self._close_subscription()
+                self.task = None
+
+            timings = {"relay_connect_ms": 0.0, "subscribe_ms": 0.0}
+            if self.subscription_id is None:
+                timings = await open_response_subscription()
+                self.subscription_id = timings.pop("subscription_id")
+                self.stats["subscriptions_opened"] += 1
+            if self.task is None:
+                self.task = asyncio.create_task(client.handle_notifications(self))
+                self.task_started = asyncio.get_running_loop().time()
+                self.task.add_done_callback(self._on_loop_ended)
+                # Let the loop start before any request can get a response
+                await asyncio.sleep(0)
+            return timings
+
+    def _on_loop_ended(self, task: asyncio.Task):
+        if task.cancelled() or task is not self.task:
+            return
+        if task.exception() is not None:
+            logger.warning(f"Notification loop failed: {task.exception()}")
+        if asyncio.get_running_loop().time() - self.task_started >= RESPONSE_RESUBSCRIBE_MAX_DELAY:
+            self.resubscribe_delay = 0.0
+        if self.handlers and not self.resubscribing:
+            self.resubscribing = True
+            run_in_background(self._resubscribe())
+
+    async def _resubscribe(self):
+        """Reopen the subscription and loop for the jobs still waiting on responses."""
         try:
-            logger.info("Creating and broadcasting Nostr event")
-            broadcast_result = await create_and_broadcast_nostr_event(
-                description, screenshot_url, max_price_sats
-            )
-            job_id = broadcast_result["event_id"]
-            logger.info(f"Sent job request with ID: {job_id}")
+            while self.handlers:
+                if self.resubscribe_delay:
+                    await asyncio.sleep(self.resubscribe_delay)
+                # Back off if this loop ends quickly as well
+                self.resubscribe_delay = min(
+                    max(self.resubscribe_delay * 2, 0.5), RESPONSE_RESUBSCRIBE_MAX_DELAY
+                )
+                logger.warning(
+                    f"Notification loop ended with {len(self.handlers)} jobs waiting, resubscribing"
+                )
+                try:
+                    await self.ensure_started()
+                    self.stats["resubscribes"] += 1
+                    if not self.task.done():
+                        return
+                    # Ended again before this returned, its callback saw us still busy
+                    continue
+                except Exception as e:
+                    logger.warning(
+                        f"Resubscribing failed: {str(e)}, retrying in {self.resubscribe_delay:.1f}s"
+                    )
+        finally:
+            self.resubscribing = False
+
+    async def _close_subscription(self):
+        if self.subscription_id is None:
+            return
+        subscription_id, self.subscription_id = self.subscription_id, None
+        self.stats["subscriptions_closed"] += 1
+        try:
+            await client.unsubscribe(subscription_id)
         except Exception as e:
-            logger.error(
-                f"Failed to create and broadcast Nostr event: {str(e)}", exc_info=True
+            logger.warning(f"Failed to close subscription {subscription_id}: {str(e)}")
+
+    def _cancel_idle_timer(self):
+        if self.idle_timer is not None:
+            self.idle_timer.cancel()
+            self.idle_timer = None
+
+    async def close_if_idle(self):
+        """Close the subscription if still no job is waiting for a response."""
+        async with self._lock:
+            self.idle_timer = None
+            if self.handlers or self.subscription_id is None:
+                return
+            logger.info(
+                f"No jobs waiting for {RESPONSE_SUBSCRIPTION_IDLE_SECONDS:.0f}s, "
+                f"closing response subscription {self.subscription_id}"
+            )
+            await self._close_subscription()
+
+    def register(self, job_id: str, handler: "NotificationHandler"):
+        self.handlers[job_id] = handler
+
+    def unregister(self, job_id: str):
+        self.handlers.pop(job_id, None)
+        if self.handlers or self.subscription_id is None:
+            return
+        if RESPONSE_SUBSCRIPTION_IDLE_SECONDS > 0:
+            self._cancel_idle_timer()
+            self.idle_timer = asyncio.get_running_loop().call_later(
+                RESPONSE_SUBSCRIPTION_IDLE_SECONDS,
+                lambda: run_in_background(self.close_if_idle()),
             )
-            return {
-                "error": str(e),
-                "status": "failed",
-                "job_id": "error-" + str(int(time.time())),
-                "offers": [],
-                "selected_offer": None,
-                "result": {
-                    "content": f"Error creating Nostr event: {str(e)}",
-                    "error": str(e),
-                },
-            }
 
-        # Create notification handler for this job
-        handler = NotificationHandler(job_id)
+    async def handle(self, relay_url, subscription_id, ev):
+        self.stats["events"] += 1
+        for tag in ev.tags().to_vec():
+            tag_vec = tag.as_vec()
+            if len(tag_vec) >= 2 and tag_vec[0] == "e" and tag_vec[1] in self.handlers:
+                self.stats["routed"] += 1
+                # Handlers may pay an invoice; don't hold up other jobs' events meanwhile
+                task = asyncio.create_task(
+                    self.handlers[tag_vec[1]].handle(relay_url, subscription_id, ev)
+                )
+                self.dispatches.add(task)
+                task.add_done_callback(self.dispatches.discard)
+                return
+        self.stats["unmatched"] += 1
 
-        # Set up filter for responses to our event
-        one_hour_ago = Timestamp.from_secs(Timestamp.now().as_secs() - 3600)
+    async def handle_msg(self, relay_url, msg):
+        if msg.as_enum().is_end_of_stored_events():
+            logger.info(f"Received EOSE from {relay_url}")
 
-        # Create a filter for events that reference our event ID
-        response_filter = (
-            Filter()
-            .event(EventId.parse(job_id))  # Filter for events referencing our event ID
-            .since(one_hour_ago)
-        )
 
-        logger.info(f"Setting up filter for events referencing job ID: {job_id}")
+response_router = ResponseRouter()
 
-        try:
-            await client.subscribe(response_filter)
-            logger.info(f"Successfully subscribed to filter for job ID: {job_id}")
-        except Exception as e:
-            logger.error(f"Failed to subscribe to filter: {str(e)}", exc_info=True)
-            return {
-                "error": str(e),
-                "status": "failed",
-                "job_id": job_id,
-                "offers": [],
-                "selected_offer": None,
-                "result": {
-                    "content": f"Error subscribing to filter: {str(e)}",
-                    "error": str(e),
-                },
-                "broadcast_info": {
-                    "sent_to": broadcast_result["success"],
-                    "failed_relays": broadcast_result["failed"],
-                },
-            }
 
-        # Start handling notifications
-        notification_task = asyncio.create_task(client.handle_notifications(handler))
+# Ask workers to stop on job requests nobody is waiting for anymore
+async def cancel_job_requests(request_ids: List[str], reason: str):
+    """
+    Publish a NIP-09 deletion request (kind 5) for job requests, which DVM
+    workers treat as a cancellation.
 
-        try:
-            # Wait for job completion or timeout
-            logger.info(f"Waiting for job completion (timeout: {timeout}s)")
-            await asyncio.wait_for(handler.job_completed.wait(), timeout=timeout)
+    Args:
+        request_ids: Event ids of the kind 5109 requests to cancel
+        reason: Shown to workers as the deletion reason
+    """
+    try:
+        builder = EventBuilder.delete(
+            EventDeletionRequest(
+                ids=[EventId.parse(request_id) for request_id in request_ids],
+                coordinates=[],
+                reason=reason,
+            )
+        )
+        event = await client.sign_event_builder(builder)
+        output = await client.send_event(event)
+        logger.info(
+            f"Cancelled job requests {request_ids} ({reason}), sent to: {output.success}"
+        )
+    except Exception as e:
+        logger.error(f"Failed to cancel job requests {request_ids}: {str(e)}")
+
+
+# Build and sign a kind 5109 help request without sending it
+async def build_help_request_event(
+    description: str, screenshot_url: str, max_price_sats: Optional[int] = None
+):
+    """
+    Build and sign a kind 5109 event requesting visual help.
+
+    Signing locally gives us the event ID before anything is published, so the
+    caller can be listening for responses before the request goes out.
+
+    Args:
+        description: A detailed description of what help is needed
+        screenshot_url: URL to a screenshot or image showing the visual context
+        max_price_sats: Maximum price willing to pay in satoshis (optional)
+
+    Returns:
+        The signed Event
+    """
+    # Create kind 5109 event for help request
+    logger.info("Creating Nostr event tags")
+    try:
+        tags = [Tag.parse(["description", description])]
+        # One image tag per mirror so workers can fall back if a host is down
+        for image_url in screenshot_mirrors.get(screenshot_url, [screenshot_url]):
+            tags.append(Tag.parse(["image", image_url]))
+
+        if max_price_sats:
+            tags.append(Tag.parse(["max_price", str(max_price_sats)]))
+    except Exception as e:
+        logger.error(f"Error creating tags: {str(e)}", exc_info=True)
+        raise
+
+    # Build and sign the event
+    logger.info("Building Nostr event")
+    try:
+        builder = EventBuilder(Kind(5109), description).tags(tags)
+        return await client.sign_event_builder(builder)
+    except Exception as e:
+        logger.error(f"Error building event: {str(e)}", exc_info=True)
+        raise
+
+
+amplify_client = None
+amplify_connect_lock = asyncio.Lock()
+
+
+async def publish_job_note(
+    job_id: str, description: str, screenshot_url: str, price_sats: Optional[int]
+):
+    """
+    Publish a kind 1 note announcing a job to AMPLIFY_RELAY_URLS.
+
+    The note goes out through its own client so the broader relays never see
+    the job requests or our response subscription.
+
+    Returns:
+        The SDK's send output
+    """
+    global amplify_client
+    async with amplify_connect_lock:
+        if amplify_client is None:
+            # The loopback relay stands in for the broader relays too
+            new_client = client if loopback_market else Client(signer)
+            for relay_url in AMPLIFY_RELAY_URLS:
+                await new_client.add_relay(relay_url)
+            await new_client.connect()
+            # Set only once connected, so a failed setup is retried by the next note
+            amplify_client = new_client
+            try:
+                await amplify_client.wait_for_connection(
+                    timedelta(seconds=RELAY_CONNECT_TIMEOUT)
+                )
+            except Exception as e:
+                logger.warning(f"Not all amplification relays connected: {e}")
+
+    job_uri = Nip19Event(
+        EventId.parse(job_id),
+        keys.public_key(),
+        Kind(5109),
+        [relay_url.strip() for relay_url in RELAY_URLS[:2]],
+    ).to_nostr_uri()
+    content = compose_note(
+        description,
+        job_uri,
+        price_sats,
+        AMPLIFY_HASHTAGS,
+        screenshot_url if AMPLIFY_INCLUDE_IMAGE else None,
+    )
+    tags = [Tag.parse(["e", job_id, RELAY_URLS[0].strip(), "mention"])]
+    tags += [Tag.hashtag(tag) for tag in AMPLIFY_HASHTAGS]
+    return await amplify_client.send_event_builder(
+        EventBuilder.text_note(content).tags(tags)
+    )
+
+
+async def amplify_if_stalled(
+    handler: "NotificationHandler",
+    description: str,
+    screenshot_url: str,
+    price_sats: Optional[int],
+):
+    """
+    Announce the job with a kind 1 note if no offer arrives within
+    AMPLIFY_AFTER_SECONDS, then record how long the first offer took.
+
+    Runs alongside the job and is cancelled when the job ends.
+    """
+    if await wait_for_any(
+        [handler.offer_received, handler.job_completed], AMPLIFY_AFTER_SECONDS
+    ):
+        amplifier.record_not_stalled()
+        return
+
+    stalled_at = time.time()
+    decision = amplifier.admit(description)
+    if decision == "posted":
+        try:
+            output = await publish_job_note(
+                handler.event_id, description, screenshot_url, price_sats
+            )
+            logger.info(
+                f"No offer for job {handler.event_id} after {AMPLIFY_AFTER_SECONDS:.0f}s, "
+                f"announced it in note {output.id.to_hex()} on {output.success}"
+            )
+        except Exception as e:
+            logger.error(f"Failed to announce job {handler.event_id}: {str(e)}")
+            amplifier.post_failed()
+            decision = "failed"
+    else:
+        logger.info(f"No offer for job {handler.event_id}, not announcing it: {decision}")
+
+    try:
+        await handler.offer_received.wait()
+        amplifier.record_outcome(
+            decision, round((handler.first_offer_at - stalled_at) * 1000, 1)
+        )
+    except asyncio.CancelledError:
+        amplifier.record_outcome(decision, None)
+        raise
+
+
+async def wait_for_any(events: List[asyncio.Event], timeout: float) -> bool:
+    """Wait until one of the events is set, False if timeout passes first."""
+    waiters = [asyncio.create_task(event.wait()) for event in events]
+    try:
+        done, _ = await asyncio.wait(
+            waiters, timeout=max(timeout, 0), return_when=asyncio.FIRST_COMPLETED
+        )
+        return bool(done)
+    finally:
+        for waiter in waiters:
+            waiter.cancel()
+
+
+# Wait for a job's result, raising the bid while nobody takes the job
+async def escalate_and_wait(
+    handler: NotificationHandler,
+    ladder: List[int],
+    description: str,
+    screenshot_url: str,
+    timeout: float,
+    bids: List[Dict[str, Any]],
+):
+    """
+    Wait for the job's result, moving one step up the price ladder every
+    BID_STEP_SECONDS until an offer is paid.
+
+    A step first pays the cheapest held offer the new price covers; if there
+    is none the request is re-published at the new price. Responses to every
+    published request go to the same handler.
+
+    Raises:
+        asyncio.TimeoutError: If no result arrives within timeout seconds
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + timeout
+    for price in ladder[1:]:
+        step_ends = min(loop.time() + BID_STEP_SECONDS, deadline)
+        if await wait_for_any(
+            [handler.job_completed, handler.offer_paid], step_ends - loop.time()
+        ):
+            break
+        if loop.time() >= deadline:
+            break
+
+        at_ms = round((loop.time() - started) * 1000, 1)
+        if await handler.raise_bid(price):
+            logger.info(f"Bid raised to {price} sats, paid a held offer")
+            bids.append({"at_ms": at_ms, "price_sats": price, "event_id": None})
+            break
+        try:
+            event = await build_help_request_event(description, screenshot_url, price)
+            request_id = event.id().to_hex()
+            handler.request_ids.append(request_id)
+            response_router.register(request_id, handler)
+            await client.send_event(event)
+            bids.append({"at_ms": at_ms, "price_sats": price, "event_id": request_id})
+            logger.info(
+                f"No offer for job {handler.event_id} yet, re-published at {price} sats as {request_id}"
+            )
+        except Exception as e:
+            logger.error(f"Failed to re-publish job at {price} sats: {str(e)}")
+
+    if not handler.job_completed.is_set():
+        await asyncio.wait_for(
+            handler.job_completed.wait(), timeout=max(deadline - loop.time(), 0)
+        )
+
+
+def record_bidding(
+    handler: NotificationHandler,
+    ladder: List[int],
+    job_cap: int,
+    bids: List[Dict[str, Any]],
+    published_at: float,
+    status: str,
+) -> Dict[str, Any]:
+    """Summarize how a job's bidding went and add it to the price/latency history."""
+    paid = handler.paid_offer if handler.paid_offer and "payment_result" in handler.paid_offer else None
+    finished_at = time.time()
+    summary = {
+        "ladder": ladder,
+        "bids": bids,
+        "final_bid_sats": handler.bid_sats if handler.bid_sats is not None else job_cap,
+        "paid_sats": paid["price_sats"] if paid else None,
+        "first_offer_ms": round((handler.first_offer_at - published_at) * 1000, 1)
+        if handler.first_offer_at
+        else None,
+        "result_ms": round((finished_at - published_at) * 1000, 1),
+        "status": status,
+    }
+    bid_ledger.record_job({**summary, "job_id": handler.event_id, "finished_at": finished_at})
+    return summary
+
+
+# Function to send a request and wait for result
+async def request_and_wait_for_result(
+    description,
+    screenshot_url,
+    max_price_sats=None,
+    timeout=300,
+    response_subscription=None,
+    timings=None,
+    pipeline_started=None,
+    region=None,
+):
+    """
+    Send a request for visual computer interaction help and wait for the result.
+
+    Args:
+        response_subscription: Optional task from response_router.ensure_started()
+            that was started while the screenshot uploaded; started here if not given
+        timings: Optional dictionary of pipeline timings to add to the result
+        pipeline_started: perf_counter() value the request pipeline started at
+        region: Screen region the screenshot was cropped to, for mapping actions
+    """
+    try:
+        if not NOSTR_SDK_AVAILABLE:
+            logger.warning("Nostr SDK not available, returning mock response")
+            return {
+                "job_id": "mock-job-id",
+                "offers": [],
+                "selected_offer": None,
+                "result": {
+                    "content": f"Mock response for: {description} (Nostr SDK not available)",
+                    "screenshot_url": screenshot_url,
+                    "max_price_sats": max_price_sats,
+                },
+            }
+
+        timings = timings if timings is not None else {}
+        pipeline_started = pipeline_started or time.perf_counter()
+
+        # With a ladder the job starts at its cheapest step and escalates from there
+        job_cap = (
+            min(max_price_sats, MAX_AUTO_PAYMENT_SATS)
+            if max_price_sats
+            else MAX_AUTO_PAYMENT_SATS
+        )
+        ladder = plan_ladder(BID_LADDER, job_cap) if BID_LADDER else []
+        bid_sats = ladder[0] if ladder else max_price_sats
+
+        # Sign the request locally so we know its ID before publishing
+        try:
+            event = await build_help_request_event(
+                description, screenshot_url, bid_sats
+            )
+            job_id = event.id().to_hex()
+            logger.info(f"Signed job request with ID: {job_id}")
+        except Exception as e:
+            logger.error(f"Failed to create Nostr event: {str(e)}", exc_info=True)
+            return {
+                "error": str(e),
+                "status": "failed",
+                "job_id": "error-" + str(int(time.time())),
+                "offers": [],
+                "selected_offer": None,
+                "result": {
+                    "content": f"Error creating Nostr event: {str(e)}",
+                    "error": str(e),
+                },
+            }
+
+        # Normally done at startup; otherwise the wallet warms up while we wait for offers
+        start_services()
+
+        # Make sure the relays are connected and we are subscribed before publishing
+        try:
+            if response_subscription is None:
+                response_subscription = asyncio.create_task(
+                    response_router.ensure_started()
+                )
+            timings.update(await response_subscription)
+            logger.info(
+                f"Subscription {response_router.subscription_id} listening for job ID: {job_id}"
+            )
+        except Exception as e:
+            logger.error(f"Failed to subscribe to filter: {str(e)}", exc_info=True)
+            return {
+                "error": str(e),
+                "status": "failed",
+                "job_id": job_id,
+                "offers": [],
+                "selected_offer": None,
+                "result": {
+                    "content": f"Error subscribing to filter: {str(e)}",
+                    "error": str(e),
+                },
+            }
+
+        # Route responses to this job's handler before the request goes out
+        handler = NotificationHandler(job_id, region, bid_sats)
+        response_router.register(job_id, handler)
+        bids = [{"at_ms": 0.0, "price_sats": bid_sats, "event_id": job_id}]
+        amplify_task = None
+        # The subscription may have been closed as idle between starting it and registering
+        await response_router.ensure_started()
+
+        try:
+            # Send the event to relays
+            try:
+                logger.info("Sending event to relays")
+                publish_started = time.perf_counter()
+                output = await client.send_event(event)
+                timings["publish_ms"] = round(
+                    (time.perf_counter() - publish_started) * 1000, 1
+                )
+                broadcast_result = {
+                    "event_id": job_id,
+                    "success": output.success,
+                    "failed": output.failed,
+                }
+                logger.info(f"Sent to: {output.success}")
+                logger.info(f"Not sent to: {output.failed}")
+            except Exception as e:
+                logger.error(f"Error sending event to relays: {str(e)}", exc_info=True)
+                return {
+                    "error": str(e),
+                    "status": "failed",
+                    "job_id": job_id,
+                    "offers": [],
+                    "selected_offer": None,
+                    "result": {
+                        "content": f"Error sending Nostr event: {str(e)}",
+                        "error": str(e),
+                    },
+                }
+
+            timings["time_to_publish_ms"] = round(
+                (time.perf_counter() - pipeline_started) * 1000, 1
+            )
+            # What the same steps would have cost run one after another
+            sequential_ms = sum(
+                timings.get(step, 0)
+                for step in ("upload_ms", "relay_connect_ms", "subscribe_ms", "publish_ms")
+            )
+            timings["overlap_saved_ms"] = round(
+                max(sequential_ms - timings["time_to_publish_ms"], 0), 1
+            )
+            logger.info(f"Request pipeline timings: {timings}")
+
+            if AMPLIFY_ENABLED:
+                amplify_task = asyncio.create_task(
+                    amplify_if_stalled(
+                        handler,
+                        description,
+                        screenshot_url,
+                        ladder[-1] if ladder else max_price_sats,
+                    )
+                )
+
+            # Wait for job completion or timeout
+            logger.info(f"Waiting for job completion (timeout: {timeout}s)")
+            published_at = time.time()
+            await escalate_and_wait(
+                handler, ladder, description, screenshot_url, timeout, bids
+            )
             logger.info(f"Job {job_id} completed")
         except asyncio.TimeoutError:
             logger.warning(f"Timeout waiting for job {job_id} to complete")
+            if CANCEL_ON_TIMEOUT:
+                run_in_background(
+                    cancel_job_requests(
+                        handler.request_ids,
+                        f"Timed out waiting for a result after {timeout} seconds",
+                    )
+                )
             # Return a timeout result
             return {
                 "job_id": job_id,
@@ -924,6 +1982,10 @@ async def request_and_wait_for_result(
                     "sent_to": broadcast_result["success"],
                     "failed_relays": broadcast_result["failed"],
                 },
+                "timings": timings,
+                "bidding": record_bidding(
+                    handler, ladder, job_cap, bids, published_at, "timeout"
+                ),
                 "status": "timeout",
             }
         except Exception as e:
@@ -945,13 +2007,21 @@ async def request_and_wait_for_result(
                 },
             }
         finally:
-            # Cancel notification handling
-            logger.info("Canceling notification handling task")
-            notification_task.cancel()
-            try:
-                await notification_task
-            except asyncio.CancelledError:
-                pass
+            if amplify_task is not None:
+                amplify_task.cancel()
+            for request_id in handler.request_ids:
+                response_router.unregister(request_id)
+
+        # Copies re-published at higher bids that didn't get the result are dead now
+        superseded = [
+            request_id
+            for request_id in handler.request_ids
+            if request_id != handler.answered_request_id
+        ]
+        if handler.answered_request_id and superseded:
+            run_in_background(
+                cancel_job_requests(superseded, "Answered under another request")
+            )
 
         # Return the job result
         logger.info(f"Returning job result for job ID: {job_id}")
@@ -965,6 +2035,10 @@ async def request_and_wait_for_result(
                 "sent_to": broadcast_result["success"],
                 "failed_relays": broadcast_result["failed"],
             },
+            "timings": timings,
+            "bidding": record_bidding(
+                handler, ladder, job_cap, bids, published_at, "completed"
+            ),
         }
     except Exception as e:
         logger.error(
@@ -1004,34 +2078,14 @@ async def create_and_broadcast_nostr_event(
             logger.warning("Nostr SDK not available, cannot create event")
             return {"event_id": "mock-event-id", "success": [], "failed": []}
 
-        # Create kind 5109 event for help request
-        logger.info("Creating Nostr event tags")
-        try:
-            tags = [
-                Tag.parse(["description", description]),
-                Tag.parse(["image", screenshot_url]),
-            ]
-
-            if max_price_sats:
-                tags.append(Tag.parse(["max_price", str(max_price_sats)]))
-        except Exception as e:
-            logger.error(f"Error creating tags: {str(e)}", exc_info=True)
-            raise
-
-        # Build the event
-        logger.info("Building Nostr event")
-        try:
-            builder = EventBuilder(Kind(5109), description).tags(tags)
-        except Exception as e:
-            logger.error(f"Error building event: {str(e)}", exc_info=True)
-            raise
+        event = await build_help_request_event(
+            description, screenshot_url, max_price_sats
+        )
 
         # Add relays and connect
         logger.info("Connecting to relays")
         try:
-            for relay_url in RELAY_URLS:
-                await client.add_relay(relay_url.strip())
-            await client.connect()
+            await init_nostr_client()
             logger.info(f"Connected to relays: {RELAY_URLS}")
         except Exception as e:
             logger.error(f"Error connecting to relays: {str(e)}", exc_info=True)
@@ -1040,7 +2094,7 @@ async def create_and_broadcast_nostr_event(
         # Send the event to relays
         logger.info("Sending event to relays")
         try:
-            output = await client.send_event_builder(builder)
+            output = await client.send_event(event)
             event_id = output.id.to_hex()
 
             logger.info(f"Event ID: {event_id}")
@@ -1070,13 +2124,437 @@ async def create_and_broadcast_nostr_event(
         }
 
 
+# Answer a request from the local cache of past results
+async def answer_from_cache(
+    cached: Dict[str, Any], region: Optional[List[int]] = None
+) -> Dict[str, Any]:
+    """
+    Build a request_visual_help result from a cached answer, executing its
+    actions the same way a fresh kind 6109 result would be.
+
+    Args:
+        cached: The entry returned by AnswerCache.lookup
+        region: Screen region the new screenshot was cropped to, if any
+
+    Returns:
+        A dictionary shaped like a normal job result, with status "cached"
+    """
+    content = cached["content"]
+    try:
+        content_json = json.loads(content)
+    except json.JSONDecodeError:
+        content_json = None
+
+    if (
+        PYAUTOGUI_AVAILABLE
+        and isinstance(content_json, dict)
+        and isinstance(content_json.get("actions"), list)
+    ):
+        logger.info(f"Executing {len(content_json['actions'])} cached actions")
+        async with actions_lock:
+            content_json["execution_result"] = await asyncio.to_thread(
+                execute_actions, content_json, region
+            )
+        content = json.dumps(content_json)
+
+    return {
+        "job_id": f"cache-{cached['job_id']}",
+        "cached": True,
+        "note": (
+            "Replayed from an earlier job on a similar-looking screen, not answered "
+            "by a human for this one. Check the screen and request help with "
+            "use_cache=False if the actions were wrong."
+        ),
+        "offers": [],
+        "selected_offer": None,
+        "result": {
+            "content": content,
+            "status": "cached",
+            "cache": {
+                "original_job_id": cached["job_id"],
+                "hamming_distance": cached["distance"],
+                "sats_saved": cached.get("price_sats") or 0,
+            },
+        },
+        "status": "cached",
+    }
+
+
+# Remember a completed job so the next near-duplicate request is free
+def cache_job_result(image_hash: int, description: str, result: Dict[str, Any]):
+    """Store the kind 6109 result of a finished job in the answer cache."""
+    job_result = result.get("result") or {}
+    if job_result.get("kind") != 6109:
+        return
+
+    try:
+        content_json = json.loads(job_result["content"])
+    except (json.JSONDecodeError, KeyError, TypeError):
+        return
+    if not isinstance(content_json, dict) or not isinstance(
+        content_json.get("actions"), list
+    ):
+        return
+
+    # Cache what the human sent, not what happened when we ran it
+    content_json.pop("execution_result", None)
+    content_json.pop("execution_error", None)
+    price_sats = sum(
+        offer.get("price_sats") or 0
+        for offer in result.get("offers", [])
+        if "payment_result" in offer
+    )
+    answer_cache.store(
+        image_hash, description, json.dumps(content_json), result["job_id"], price_sats
+    )
+    logger.info(f"Cached answer from job {result['job_id']} ({price_sats} sats)")
+
+
+@mcp.tool()
+def get_bidding_report() -> Dict[str, Any]:
+    """
+    Report the price ladder, today's spending and what each final bid bought.
+
+    Returns:
+        The ladder settings, sats spent today against the daily cap, and per
+        final bid price: jobs, completion rate, median time to first offer
+        and to result, and sats paid
+    """
+    return {
+        "ladder": BID_LADDER,
+        "step_seconds": BID_STEP_SECONDS,
+        "job_cap_sats": MAX_AUTO_PAYMENT_SATS,
+        "daily_cap_sats": DAILY_SPEND_CAP_SATS,
+        "spent_today_sats": bid_ledger.spent_today(),
+        "curve": bid_ledger.curve(),
+    }
+
+
+@mcp.tool()
+def get_amplification_stats() -> Dict[str, Any]:
+    """
+    Report how announcing stalled jobs with kind 1 notes is working.
+
+    Returns:
+        How many jobs got an offer in time, were announced, or were skipped by
+        the rate limit or as duplicates; and for each group of stalled jobs how
+        many got an offer afterwards and the median time it took
+    """
+    return {
+        "enabled": AMPLIFY_ENABLED,
+        "after_seconds": AMPLIFY_AFTER_SECONDS,
+        "relays": AMPLIFY_RELAY_URLS,
+        **amplifier.stats(),
+    }
+
+
+@mcp.tool()
+def get_profile_report(calls: int = 10, top: int = 20, tool: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Report where recent profiled tool calls spent their time.
+
+    Calls are profiled when PROFILE_TOOLS names the tool, or when
+    request_visual_help or request_visual_help_screen is called with profile=true.
+
+    Args:
+        calls: How many of the most recent profiled calls to include (default: 10)
+        top: How many functions to list (default: 20)
+        tool: Only include calls of this tool (optional)
+
+    Returns:
+        Per call its wall time, time on the event loop and time awaiting, and
+        the paths of its .prof and .folded files; plus the hottest functions of
+        those calls combined, by self time and by cumulative time
+    """
+    return profiler.report(calls, top, tool)
+
+
+@mcp.tool()
+def get_event_loop_report(top: int = 10) -> Dict[str, Any]:
+    """
+    Report event-loop lag and the calls that blocked the loop.
+
+    Args:
+        top: How many blocking call sites to list (default: 10)
+
+    Returns:
+        Lag percentiles, how often and how long the loop was blocked beyond
+        LOOP_LAG_THRESHOLD_MS, and the blocking call sites by total time
+        blocked, each with its count, worst duration and the stack it was
+        caught in
+    """
+    if loop_watchdog is None:
+        return {"enabled": False}
+    return {"enabled": True, **loop_watchdog.report(top)}
+
+
 @mcp.tool()
+def get_answer_cache_stats() -> Dict[str, Any]:
+    """
+    Report how well the local answer cache is doing.
+
+    Returns:
+        Hits, misses, hit rate, sats saved, and the number of cached answers
+    """
+    if answer_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **answer_cache.stats()}
+
+
+# Shared pipeline behind the request_visual_help tools
+def session_key(ctx: Optional[Context]) -> Optional[str]:
+    """Identify the MCP session a tool call came from, None outside of one."""
+    try:
+        return f"session-{id(ctx.session)}"
+    except (AttributeError, ValueError):
+        return None
+
+
+def http_client_key(request: Request) -> str:
+    """
+    Owner of jobs submitted over HTTP: the caller's X-Client-Id header, or its
+    address without one. Only the same owner can read a job, and
+    MAX_JOBS_PER_SESSION applies per owner.
+    """
+    client_id = request.headers.get("x-client-id")
+    if client_id:
+        return f"client-{client_id}"
+    return f"address-{request.client.host if request.client else 'unknown'}"
+
+
+def claim_session_slot(owner: Optional[str]):
+    """Count a job against its session, refusing it above MAX_JOBS_PER_SESSION."""
+    if owner is None:
+        return
+    running = running_jobs_by_session.get(owner, 0)
+    if running >= MAX_JOBS_PER_SESSION:
+        raise McpError(
+            ErrorData(
+                code=INVALID_REQUEST,
+                message=f"This session already has {running} help requests running "
+                f"(limit {MAX_JOBS_PER_SESSION})",
+            )
+        )
+    running_jobs_by_session[owner] = running + 1
+
+
+def release_session_slot(owner: Optional[str]):
+    if owner is None:
+        return
+    running = running_jobs_by_session.get(owner, 0) - 1
+    if running > 0:
+        running_jobs_by_session[owner] = running
+    else:
+        running_jobs_by_session.pop(owner, None)
+
+
+async def run_help_request(
+    description: str,
+    screenshot_url: str,
+    max_price_sats: Optional[int],
+    wait_for_result: bool,
+    timeout: int,
+    use_cache: bool,
+    screenshot_png: Optional[bytes] = None,
+    region: Optional[List[int]] = None,
+) -> Dict[str, Any]:
+    """
+    Check the answer cache, upload the screenshot while warming up the relays,
+    then broadcast the job and optionally wait for its result.
+
+    Args:
+        screenshot_png: PNG bytes captured in memory; uploaded instead of screenshot_url
+        region: [left, top, width, height] the screenshot was cropped to, so
+            result coordinates can be mapped back onto the full screen
+    """
+    pipeline_started = time.perf_counter()
+    timings = {}
+
+    # A near-duplicate of a screenshot we already paid for needs no new job
+    image_hash = None
+    if (
+        answer_cache is not None
+        and use_cache
+        and wait_for_result
+        and description
+        and (screenshot_png is not None or os.path.isfile(screenshot_url))
+    ):
+        image_hash = await asyncio.to_thread(
+            perceptual_hash,
+            io.BytesIO(screenshot_png) if screenshot_png is not None else screenshot_url,
+        )
+        if image_hash is not None:
+            cached = await asyncio.to_thread(
+                answer_cache.lookup, image_hash, description
+            )
+            if cached:
+                logger.info(
+                    f"Answer cache hit (distance {cached['distance']}) from job {cached['job_id']}"
+                )
+                return await answer_from_cache(cached, region)
+
+    # Warm up the relays (and the response subscription) while the screenshot uploads
+    relay_warmup = None
+    if NOSTR_SDK_AVAILABLE:
+        relay_warmup = asyncio.create_task(
+            response_router.ensure_started() if wait_for_result else init_nostr_client()
+        )
+
+    # Check if screenshot_url is a local file path and upload if needed
+    public_url = ""
+    if screenshot_png is not None:
+        # Captured in memory, stream the buffer straight to storage
+        upload_started = time.perf_counter()
+        public_url = await asyncio.to_thread(publish_screenshot_bytes, screenshot_png)
+        timings["upload_ms"] = round((time.perf_counter() - upload_started) * 1000, 1)
+        if not public_url:
+            logger.error("Failed to upload captured screenshot")
+            if relay_warmup:
+                relay_warmup.cancel()
+            return {
+                "error": "Screenshot upload failed",
+                "status": "failed",
+                "job_id": "error-" + str(int(time.time())),
+                "offers": [],
+                "selected_offer": None,
+                "result": {
+                    "content": "Error: Failed to upload captured screenshot",
+                    "error": "Screenshot upload failed",
+                },
+            }
+        logger.info(f"Captured screenshot uploaded to: {public_url}")
+    elif screenshot_url:
+        logger.info(f"Processing screenshot URL: {screenshot_url}")
+        try:
+            upload_started = time.perf_counter()
+            public_url = await asyncio.to_thread(ensure_public_url, screenshot_url)
+            timings["upload_ms"] = round(
+                (time.perf_counter() - upload_started) * 1000, 1
+            )
+            if public_url == screenshot_url and not public_url.startswith(
+                ("http://", "https://")
+            ):
+                # If the URL didn't change and it's not a web URL, it means upload failed
+                logger.error(f"Failed to upload local screenshot: {screenshot_url}")
+                if relay_warmup:
+                    relay_warmup.cancel()
+                return {
+                    "error": "Screenshot upload failed",
+                    "status": "failed",
+                    "job_id": "error-" + str(int(time.time())),
+                    "offers": [],
+                    "selected_offer": None,
+                    "result": {
+                        "content": f"Error: Failed to upload local screenshot: {screenshot_url}",
+                        "error": "Screenshot upload failed",
+                    },
+                }
+            logger.info(f"Successfully processed to: {public_url}")
+        except Exception as e:
+            logger.error(
+                f"Failed to process screenshot URL: {str(e)}", exc_info=True
+            )
+            if relay_warmup:
+                relay_warmup.cancel()
+            return {
+                "error": str(e),
+                "status": "failed",
+                "job_id": "error-" + str(int(time.time())),
+                "offers": [],
+                "selected_offer": None,
+                "result": {
+                    "content": f"Error processing screenshot URL: {str(e)}",
+                    "error": str(e),
+                },
+            }
+    else:
+        logger.warning("No screenshot URL provided")
+        # If screenshot is required, return an error
+        if not description:
+            logger.error("Neither screenshot URL nor description provided")
+            if relay_warmup:
+                relay_warmup.cancel()
+            return {
+                "error": "Missing required parameters",
+                "status": "failed",
+                "job_id": "error-" + str(int(time.time())),
+                "offers": [],
+                "selected_offer": None,
+                "result": {
+                    "content": "Error: Neither screenshot URL nor description provided",
+                    "error": "Missing required parameters",
+                },
+            }
+
+    if wait_for_result:
+        # Use the request_and_wait_for_result function to wait for responses
+        logger.info("Waiting for result...")
+        result = await request_and_wait_for_result(
+            description,
+            public_url,
+            max_price_sats,
+            timeout,
+            response_subscription=relay_warmup,
+            timings=timings,
+            pipeline_started=pipeline_started,
+            region=region,
+        )
+        logger.info(f"Received result after waiting: {result}")
+        if image_hash is not None:
+            try:
+                cache_job_result(image_hash, description, result)
+            except Exception as e:
+                logger.error(f"Failed to cache job result: {str(e)}")
+        return result
+    else:
+        # Just broadcast the event without waiting
+        logger.info("Broadcasting event without waiting for result")
+        if relay_warmup:
+            await relay_warmup
+        broadcast_result = await create_and_broadcast_nostr_event(
+            description, public_url, max_price_sats
+        )
+
+        event_id = broadcast_result["event_id"]
+        logger.info(f"Broadcast Nostr event with ID: {event_id}")
+        logger.info(f"Successfully sent to: {broadcast_result['success']}")
+
+        if broadcast_result["failed"]:
+            logger.warning(f"Failed to send to: {broadcast_result['failed']}")
+
+        # Return a response with the event ID and broadcast results
+        result = {
+            "job_id": event_id,
+            "offers": [],
+            "selected_offer": None,
+            "result": {
+                "content": f"Broadcast request for: {description}",
+                "screenshot_url": public_url,
+                "original_screenshot_path": (
+                    screenshot_url if public_url != screenshot_url else None
+                ),
+                "max_price_sats": max_price_sats,
+                "event_id": event_id,
+                "sent_to": broadcast_result["success"],
+                "failed_relays": broadcast_result["failed"],
+            },
+        }
+
+        logger.info(f"Returning immediate result: {result}")
+        return result
+
+
+@mcp.tool()
+@profiler.wrap
 async def request_visual_help(
     description: str = "",
     screenshot_url: str = "",
     max_price_sats: Optional[int] = None,
     wait_for_result: bool = True,
     timeout: int = 300,
+    use_cache: bool = True,
+    profile: bool = False,
+    ctx: Context = None,
 ) -> Dict[str, Any]:
     """
     Request visual computer interaction help from humans through Nostr.
@@ -1090,6 +2568,9 @@ async def request_visual_help(
         max_price_sats: Maximum price willing to pay in satoshis (optional)
         wait_for_result: Whether to wait for the result (default: True)
         timeout: Maximum time to wait for result in seconds (default: 300)
+        use_cache: Reuse the answer to a near-identical past request instead of
+            broadcasting a new job (default: True)
+        profile: Profile this call; see get_profile_report (default: False)
 
     Returns:
         A dictionary containing the job ID, offers received, selected offer, and result
@@ -1116,106 +2597,96 @@ async def request_visual_help(
                     logger.info(f"{arg}: {values[arg]}")
             logger.info("=======================")
 
-        # Check if screenshot_url is a local file path and upload if needed
-        public_url = ""
-        if screenshot_url:
-            logger.info(f"Processing screenshot URL: {screenshot_url}")
-            try:
-                public_url = ensure_public_url(screenshot_url)
-                if public_url == screenshot_url and not public_url.startswith(
-                    ("http://", "https://")
-                ):
-                    # If the URL didn't change and it's not a web URL, it means upload failed
-                    logger.error(f"Failed to upload local screenshot: {screenshot_url}")
-                    return {
-                        "error": "Screenshot upload failed",
-                        "status": "failed",
-                        "job_id": "error-" + str(int(time.time())),
-                        "offers": [],
-                        "selected_offer": None,
-                        "result": {
-                            "content": f"Error: Failed to upload local screenshot: {screenshot_url}",
-                            "error": "Screenshot upload failed",
-                        },
-                    }
-                logger.info(f"Successfully processed to: {public_url}")
-            except Exception as e:
-                logger.error(
-                    f"Failed to process screenshot URL: {str(e)}", exc_info=True
-                )
-                return {
-                    "error": str(e),
-                    "status": "failed",
-                    "job_id": "error-" + str(int(time.time())),
-                    "offers": [],
-                    "selected_offer": None,
-                    "result": {
-                        "content": f"Error processing screenshot URL: {str(e)}",
-                        "error": str(e),
-                    },
-                }
-        else:
-            logger.warning("No screenshot URL provided")
-            # If screenshot is required, return an error
-            if not description:
-                logger.error("Neither screenshot URL nor description provided")
-                return {
-                    "error": "Missing required parameters",
-                    "status": "failed",
-                    "job_id": "error-" + str(int(time.time())),
-                    "offers": [],
-                    "selected_offer": None,
-                    "result": {
-                        "content": "Error: Neither screenshot URL nor description provided",
-                        "error": "Missing required parameters",
-                    },
-                }
-
-        if wait_for_result:
-            # Use the request_and_wait_for_result function to wait for responses
-            logger.info("Waiting for result...")
-            result = await request_and_wait_for_result(
-                description, public_url, max_price_sats, timeout
-            )
-            logger.info(f"Received result after waiting: {result}")
-            return result
-        else:
-            # Just broadcast the event without waiting
-            logger.info("Broadcasting event without waiting for result")
-            broadcast_result = await create_and_broadcast_nostr_event(
-                description, public_url, max_price_sats
+        owner = session_key(ctx)
+        claim_session_slot(owner)
+        try:
+            return await run_help_request(
+                description,
+                screenshot_url,
+                max_price_sats,
+                wait_for_result,
+                timeout,
+                use_cache,
             )
+        finally:
+            release_session_slot(owner)
+    except Exception as e:
+        logger.error(f"Error requesting visual help: {str(e)}", exc_info=True)
+        # Always return a result, even on error
+        return {
+            "error": str(e),
+            "status": "failed",
+            "job_id": "error-" + str(int(time.time())),
+            "offers": [],
+            "selected_offer": None,
+            "result": {
+                "content": f"Error in request_visual_help: {str(e)}",
+                "error": str(e),
+            },
+        }
 
-            event_id = broadcast_result["event_id"]
-            logger.info(f"Broadcast Nostr event with ID: {event_id}")
-            logger.info(f"Successfully sent to: {broadcast_result['success']}")
 
-            if broadcast_result["failed"]:
-                logger.warning(f"Failed to send to: {broadcast_result['failed']}")
+@mcp.tool()
+@profiler.wrap
+async def request_visual_help_screen(
+    description: str,
+    region: Optional[List[int]] = None,
+    max_price_sats: Optional[int] = None,
+    wait_for_result: bool = True,
+    timeout: int = 300,
+    use_cache: bool = True,
+    profile: bool = False,
+    ctx: Context = None,
+) -> Dict[str, Any]:
+    """
+    Capture the screen and request visual computer interaction help from humans through Nostr.
 
-            # Return a response with the event ID and broadcast results
-            result = {
-                "job_id": event_id,
-                "offers": [],
-                "selected_offer": None,
-                "result": {
-                    "content": f"Broadcast request for: {description}",
-                    "screenshot_url": public_url,
-                    "original_screenshot_path": (
-                        screenshot_url if public_url != screenshot_url else None
-                    ),
-                    "max_price_sats": max_price_sats,
-                    "event_id": event_id,
-                    "sent_to": broadcast_result["success"],
-                    "failed_relays": broadcast_result["failed"],
-                },
-            }
+    Unlike request_visual_help, there is no need to take a screenshot and save it
+    to a file first: the display is captured in memory and uploaded directly.
 
-            logger.info(f"Returning immediate result: {result}")
-            return result
+    Args:
+        description: A detailed description of what help is needed
+        region: Optional [left, top, width, height] in screen pixels to crop the capture to
+        max_price_sats: Maximum price willing to pay in satoshis (optional)
+        wait_for_result: Whether to wait for the result (default: True)
+        timeout: Maximum time to wait for result in seconds (default: 300)
+        use_cache: Reuse the answer to a near-identical past request instead of
+            broadcasting a new job (default: True)
+        profile: Profile this call; see get_profile_report (default: False)
+
+    Returns:
+        A dictionary containing the job ID, offers received, selected offer, and result
+    """
+    try:
+        logger.info("==== SCREEN CAPTURE TOOL CALL ====")
+        logger.info(f"Description: {description}")
+        logger.info(f"Region: {region}")
+
+        capture_started = time.perf_counter()
+        screenshot_png = await asyncio.to_thread(capture_screen, region)
+        capture_ms = round((time.perf_counter() - capture_started) * 1000, 1)
+        logger.info(f"Captured {len(screenshot_png)} byte screenshot in {capture_ms}ms")
+
+        owner = session_key(ctx)
+        claim_session_slot(owner)
+        try:
+            result = await run_help_request(
+                description,
+                "",
+                max_price_sats,
+                wait_for_result,
+                timeout,
+                use_cache,
+                screenshot_png=screenshot_png,
+                region=region,
+            )
+        finally:
+            release_session_slot(owner)
+        if "timings" in result:
+            result["timings"]["capture_ms"] = capture_ms
+        return result
     except Exception as e:
         logger.error(f"Error requesting visual help: {str(e)}", exc_info=True)
-        # Always return a result, even on error
         return {
             "error": str(e),
             "status": "failed",
@@ -1223,11 +2694,279 @@ async def request_visual_help(
             "offers": [],
             "selected_offer": None,
             "result": {
-                "content": f"Error in request_visual_help: {str(e)}",
+                "content": f"Error in request_visual_help_screen: {str(e)}",
                 "error": str(e),
             },
         }
 
 
+def prune_help_jobs():
+    """Forget finished jobs nobody has fetched within HELP_JOB_RETENTION."""
+    now = time.time()
+    for job_id, job in list(help_jobs.items()):
+        if job["finished_at"] and now - job["finished_at"] > HELP_JOB_RETENTION:
+            del help_jobs[job_id]
+
+
+def help_job_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of a background job that are returned to callers."""
+    view = {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "created_at": job["created_at"],
+        "finished_at": job["finished_at"],
+    }
+    if job["finished_at"]:
+        view["result"] = job["result"]
+    return view
+
+
+async def run_help_job(job: Dict[str, Any], screenshot_url: str, region, **kwargs):
+    """Run one submitted help request to completion and record the outcome."""
+    job["status"] = "running"
+    try:
+        screenshot_png = None
+        if not screenshot_url:
+            # Nothing to upload, so capture the screen the agent is looking at
+            screenshot_png = await asyncio.to_thread(capture_screen, region)
+        job["result"] = await run_help_request(
+            job["description"],
+            screenshot_url,
+            wait_for_result=True,
+            screenshot_png=screenshot_png,
+            region=region,
+            **kwargs,
+        )
+        job["status"] = (
+            "failed" if job["result"].get("status") == "failed" else "completed"
+        )
+    except Exception as e:
+        logger.error(f"Help job {job['job_id']} failed: {str(e)}", exc_info=True)
+        job["status"] = "failed"
+        job["result"] = {"error": str(e), "status": "failed"}
+    finally:
+        release_session_slot(job["owner"])
+        job["finished_at"] = time.time()
+        job["done"].set()
+
+
+def submit_help_job(
+    description: str,
+    screenshot_url: str = "",
+    max_price_sats: Optional[int] = None,
+    timeout: int = 300,
+    use_cache: bool = True,
+    region: Optional[List[int]] = None,
+    owner: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Start a help request in the background and return its job id right away.
+
+    Args:
+        owner: The MCP session submitting the job; only that session can see it
+    """
+    prune_help_jobs()
+    claim_session_slot(owner)
+    job_id = uuid.uuid4().hex
+    job = {
+        "job_id": job_id,
+        "owner": owner,
+        "description": description,
+        "status": "pending",
+        "created_at": time.time(),
+        "finished_at": None,
+        "result": None,
+        "done": asyncio.Event(),
+    }
+    help_jobs[job_id] = job
+    job["task"] = asyncio.create_task(
+        run_help_job(
+            job,
+            screenshot_url,
+            region,
+            max_price_sats=max_price_sats,
+            timeout=timeout,
+            use_cache=use_cache,
+        )
+    )
+    logger.info(f"Submitted help job {job_id}: {description}")
+    return help_job_view(job)
+
+
+async def wait_for_help_job(
+    job_id: str, wait_seconds: float = 0, owner: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Long-poll a job: return once it finishes or after wait_seconds.
+
+    Returns None if the job is unknown or belongs to another session.
+    """
+    job = help_jobs.get(job_id)
+    if job is None or (job["owner"] is not None and job["owner"] != owner):
+        return None
+    wait_seconds = max(0.0, min(float(wait_seconds), MAX_JOB_WAIT_SECONDS))
+    if wait_seconds and not job["done"].is_set():
+        try:
+            await asyncio.wait_for(job["done"].wait(), wait_seconds)
+        except asyncio.TimeoutError:
+            pass
+    return help_job_view(job)
+
+
+@mcp.tool()
+@profiler.wrap
+async def submit_visual_help(
+    description: str,
+    screenshot_url: str = "",
+    max_price_sats: Optional[int] = None,
+    timeout: int = 300,
+    use_cache: bool = True,
+    region: Optional[List[int]] = None,
+    ctx: Context = None,
+) -> Dict[str, Any]:
+    """
+    Submit a visual help request and return immediately with a job id.
+
+    The request runs in the background; poll it with get_visual_help_job. If
+    screenshot_url is empty, the screen (or region of it) is captured.
+
+    Args:
+        description: A detailed description of what help is needed
+        screenshot_url: URL or local path of a screenshot (optional)
+        max_price_sats: Maximum price willing to pay in satoshis (optional)
+        timeout: Maximum time to wait for a result in seconds (default: 300)
+        use_cache: Reuse the answer to a near-identical past request (default: True)
+        region: Optional [left, top, width, height] to crop a screen capture to
+
+    Returns:
+        The job id and its status
+    """
+    return submit_help_job(
+        description,
+        screenshot_url,
+        max_price_sats,
+        timeout,
+        use_cache,
+        region,
+        owner=session_key(ctx),
+    )
+
+
+@mcp.tool()
+@profiler.wrap
+async def get_visual_help_job(
+    job_id: str, wait_seconds: float = 0, ctx: Context = None
+) -> Dict[str, Any]:
+    """
+    Get the status of a job started with submit_visual_help.
+
+    Args:
+        job_id: The id submit_visual_help returned
+        wait_seconds: Wait up to this long (max 60) for the job to finish before answering
+
+    Returns:
+        The job status, plus the result once it is completed or failed
+    """
+    view = await wait_for_help_job(job_id, wait_seconds, owner=session_key(ctx))
+    if view is None:
+        raise McpError(ErrorData(code=INVALID_PARAMS, message=f"Unknown job id: {job_id}"))
+    return view
+
+
+# Plain HTTP endpoints next to the MCP transport, for clients that don't speak MCP
+@mcp.custom_route("/health", methods=["GET"])
+async def health(request: Request) -> JSONResponse:
+    running = sum(1 for job in help_jobs.values() if not job["finished_at"])
+    return JSONResponse(
+        {
+            "status": "ok",
+            "jobs_running": running,
+            "sessions_with_jobs": len(running_jobs_by_session),
+            "jobs_waiting_for_responses": len(response_router.handlers),
+            "response_subscription": response_router.subscription_id,
+            "response_events": response_router.stats,
+            "upload_cache_entries": len(upload_cache),
+            "loopback": loopback_market.stats() if loopback_market else None,
+            "wallet": nwc_wallet.stats() if nwc_wallet else None,
+            "event_loop": {
+                key: value
+                for key, value in loop_watchdog.report(0).items()
+                if key != "offenders"
+            }
+            if loop_watchdog
+            else None,
+        }
+    )
+
+
+@mcp.custom_route("/jobs", methods=["POST"])
+async def submit_job_route(request: Request) -> JSONResponse:
+    try:
+        body = await request.json()
+    except ValueError:
+        return JSONResponse({"error": "Invalid JSON"}, status_code=400)
+    if not isinstance(body, dict):
+        return JSONResponse({"error": "Body must be a JSON object"}, status_code=400)
+    description = body.get("description")
+    if not isinstance(description, str) or not description.strip():
+        return JSONResponse({"error": "description is required"}, status_code=400)
+    screenshot_url = body.get("screenshot_url") or ""
+    if not isinstance(screenshot_url, str):
+        return JSONResponse({"error": "screenshot_url must be a string"}, status_code=400)
+    try:
+        timeout = int(body.get("timeout", 300))
+        max_price_sats = body.get("max_price_sats")
+        if max_price_sats is not None:
+            max_price_sats = int(max_price_sats)
+    except (TypeError, ValueError):
+        return JSONResponse(
+            {"error": "timeout and max_price_sats must be integers"}, status_code=400
+        )
+    if timeout <= 0 or (max_price_sats is not None and max_price_sats < 0):
+        return JSONResponse(
+            {"error": "timeout must be positive and max_price_sats not negative"},
+            status_code=400,
+        )
+    region = body.get("region")
+    if region is not None and not (
+        isinstance(region, list)
+        and len(region) == 4
+        and all(isinstance(value, int) and not isinstance(value, bool) for value in region)
+        and region[2] > 0
+        and region[3] > 0
+    ):
+        return JSONResponse(
+            {"error": "region must be [left, top, width, height] in whole pixels"},
+            status_code=400,
+        )
+    try:
+        view = submit_help_job(
+            description,
+            screenshot_url,
+            max_price_sats,
+            timeout,
+            bool(body.get("use_cache", True)),
+            region,
+            owner=http_client_key(request),
+        )
+    except McpError as e:
+        return JSONResponse({"error": e.error.message}, status_code=429)
+    return JSONResponse(view, status_code=202)
+
+
+@mcp.custom_route("/jobs/{job_id}", methods=["GET"])
+async def get_job_route(request: Request) -> JSONResponse:
+    try:
+        wait_seconds = float(request.query_params.get("wait", 0))
+    except ValueError:
+        return JSONResponse({"error": "wait must be a number"}, status_code=400)
+    view = await wait_for_help_job(
+        request.path_params["job_id"], wait_seconds, owner=http_client_key(request)
+    )
+    if view is None:
+        return JSONResponse({"error": "Unknown job id"}, status_code=404)
+    return JSONResponse(view)
+
+
 if __name__ == "__main__":
     mcp.run()
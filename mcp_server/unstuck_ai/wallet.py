@@ -0,0 +1,148 @@
+"""
+A warmed-up, kept-alive Nostr Wallet Connect (NIP-47) wallet.
+
+Nwc connects to the wallet's relay and does its handshake on the first
+request, which used to be the first invoice payment of a session. warm_up()
+does that work at startup with get_info and get_balance, a keepalive loop
+repeats get_balance so the relay connection isn't dropped while idle, and
+the answers are cached for a TTL so checking whether the wallet can pay an
+invoice costs nothing. Payment latency is recorded, first payment separately
+and with whether the wallet had been warmed by then.
+"""
+
+import asyncio
+import logging
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("unstuck-ai")
+
+# Recent payment latencies kept for the stats
+PAYMENT_HISTORY = 100
+
+
+class NwcWallet:
+    """An Nwc client with startup warm-up, keepalive and cached wallet info."""
+
+    def __init__(self, nwc, info_ttl_seconds: float = 300, keepalive_seconds: float = 60):
+        self.nwc = nwc
+        self.info_ttl_seconds = info_ttl_seconds
+        # 0 disables the keepalive loop
+        self.keepalive_seconds = keepalive_seconds
+        self.methods: Optional[List[str]] = None
+        self.balance_msats: Optional[int] = None
+        self.refreshed_at = 0.0
+        self.warmed_up = False
+        self.warmup_ms: Optional[float] = None
+        self.first_payment: Optional[Dict[str, Any]] = None
+        self.payment_ms: List[float] = []
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._refreshing: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Warm up and keep the connection alive in the background; safe to call repeatedly."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        await self.warm_up()
+        while self.keepalive_seconds > 0:
+            await asyncio.sleep(self.keepalive_seconds)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"NWC keepalive failed: {str(e)}")
+
+    async def warm_up(self):
+        """Connect to the wallet relay and load its capabilities and balance."""
+        started = time.perf_counter()
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(f"NWC warm-up failed, the first payment will connect: {str(e)}")
+            return
+        self.warmup_ms = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(
+            f"NWC wallet warmed up in {self.warmup_ms}ms "
+            f"(balance {self.balance_msats // 1000} sats, methods {self.methods})"
+        )
+
+    async def refresh(self):
+        """Fetch capabilities and balance from the wallet."""
+        try:
+            info = await self.nwc.get_info()
+            self.methods = list(info.methods)
+            self.balance_msats = await self.nwc.get_balance()
+        except Exception as e:
+            self.last_error = str(e)
+            raise
+        self.refreshed_at = time.time()
+        self.last_error = None
+        # Also when warm-up failed and a later keepalive got through
+        self.warmed_up = True
+
+    def _refresh_if_stale(self):
+        if time.time() - self.refreshed_at < self.info_ttl_seconds:
+            return
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.create_task(self._refresh_quietly())
+
+    async def _refresh_quietly(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(f"Refreshing NWC wallet info failed: {str(e)}")
+
+    def cannot_pay(self, price_sats: Optional[int]) -> Optional[str]:
+        """
+        Why the cached wallet info says a payment would fail, or None if it may
+        succeed (including when nothing is known yet). Never waits on the wallet;
+        stale info is refreshed in the background for the next check.
+        """
+        self._refresh_if_stale()
+        if self.methods is not None and "pay_invoice" not in self.methods:
+            return "wallet connection does not allow pay_invoice"
+        if price_sats and self.balance_msats is not None and self.balance_msats < price_sats * 1000:
+            return f"wallet balance {self.balance_msats // 1000} sats is below {price_sats} sats"
+        return None
+
+    async def pay_invoice(self, params, price_sats: Optional[int] = None):
+        """Pay through Nwc, timing the payment and keeping the cached balance current."""
+        warmed = self.warmed_up
+        started = time.perf_counter()
+        response = await self.nwc.pay_invoice(params)
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        if self.first_payment is None:
+            self.first_payment = {"ms": elapsed_ms, "warmed_up": warmed}
+            logger.info(f"First NWC payment took {elapsed_ms}ms (warmed up: {warmed})")
+        self.payment_ms.append(elapsed_ms)
+        del self.payment_ms[:-PAYMENT_HISTORY]
+        if price_sats and self.balance_msats is not None:
+            # Fees are unknown until the next refresh
+            self.balance_msats = max(self.balance_msats - price_sats * 1000, 0)
+        return response, elapsed_ms
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "warmed_up": self.warmed_up,
+            "warmup_ms": self.warmup_ms,
+            "balance_sats": self.balance_msats // 1000 if self.balance_msats is not None else None,
+            "methods": self.methods,
+            "info_age_seconds": round(time.time() - self.refreshed_at, 1) if self.refreshed_at else None,
+            "first_payment": self.first_payment,
+            "payments": len(self.payment_ms),
+            "median_payment_ms": round(statistics.median(self.payment_ms), 1) if self.payment_ms else None,
+            "last_error": self.last_error,
+        }
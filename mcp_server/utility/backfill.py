@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+import os
+import asyncio
+import argparse
+import json
+import time
+from datetime import timedelta
+from typing import Dict, List, Set
+from dotenv import load_dotenv
+from nostr_sdk import (
+    Keys,
+    Client,
+    NostrSigner,
+    Kind,
+    Filter,
+    Event,
+    Timestamp,
+)
+
+# Load environment variables
+load_dotenv()
+
+# Get environment variables
+RELAY_URLS = os.getenv(
+    "RELAY_URLS",
+    "wss://relay.damus.io,wss://relay.supertech.ai,wss://relay.primal.net,wss://relay.dvmdash.live",
+).split(",")
+
+# Job requests, offers/feedback and results
+DEFAULT_KINDS = [5109, 7000, 6109]
+
+
+class BackfillCheckpoint:
+    """Per-relay `until` cursors, persisted so a restarted backfill resumes where it stopped."""
+
+    def __init__(self, path: str, days: float, kinds: List[int], restart: bool = False):
+        self.path = path
+        self.days = days
+        self.kinds = kinds
+        self.since = int(Timestamp.now().as_secs() - days * 86400)
+        self.relays: Dict[str, dict] = {}
+
+        if os.path.exists(path) and not restart:
+            with open(path, "r") as f:
+                saved = json.load(f)
+            if saved.get("days") == days and saved.get("kinds") == kinds:
+                # Keep the original window, however long ago the backfill started
+                self.since = saved["since"]
+                self.relays = saved.get("relays", {})
+                print(f"Resuming from checkpoint {path}")
+            else:
+                print(
+                    f"Checkpoint {path} was written for different --days/--kinds, starting over"
+                )
+
+    def cursor(self, relay_url: str, default_until: int) -> dict:
+        return self.relays.setdefault(
+            relay_url,
+            {
+                "until": default_until,
+                # Ids already fetched at the `until` second
+                "boundary": [],
+                "done": False,
+                "pages": 0,
+                "events": 0,
+            },
+        )
+
+    def save(self):
+        # Write to a temp file first so a crash mid-write never corrupts the checkpoint
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "since": self.since,
+                    "days": self.days,
+                    "kinds": self.kinds,
+                    "relays": self.relays,
+                },
+                f,
+                indent=2,
+            )
+        os.replace(tmp_path, self.path)
+
+
+class HistoricalBackfill:
+    """Walks relay history backwards page by page, merging and deduplicating by event id."""
+
+    def __init__(
+        self,
+        client: Client,
+        relay_urls: List[str],
+        output_path: str,
+        checkpoint: BackfillCheckpoint,
+        page_size: int = 500,
+        page_delay: float = 1.0,
+        fetch_timeout: float = 15.0,
+        max_retries: int = 5,
+    ):
+        self.client = client
+        self.relay_urls = relay_urls
+        self.output_path = output_path
+        self.checkpoint = checkpoint
+        self.page_size = page_size
+        self.page_delay = page_delay
+        self.fetch_timeout = fetch_timeout
+        self.max_retries = max_retries
+        self.seen_events: Set[str] = self._load_seen_events()
+        self.kind_counts: Dict[int, int] = {}
+
+    def _load_seen_events(self) -> Set[str]:
+        """Rebuild the dedup set from events already written by a previous run."""
+        seen = set()
+        if os.path.exists(self.output_path):
+            with open(self.output_path, "r") as f:
+                for line in f:
+                    try:
+                        seen.add(json.loads(line)["id"])
+                    except (json.JSONDecodeError, KeyError):
+                        continue
+        if seen:
+            print(f"Loaded {len(seen)} previously saved events from {self.output_path}")
+        return seen
+
+    def _store(self, relay_url: str, events: List[Event]) -> int:
+        """Append unseen events to the dataset, returns the number of new events."""
+        new_count = 0
+        with open(self.output_path, "a") as f:
+            for event in events:
+                event_id = event.id().to_hex()
+                if event_id in self.seen_events:
+                    continue
+                self.seen_events.add(event_id)
+                record = json.loads(event.as_json())
+                record["source_relay"] = relay_url
+                f.write(json.dumps(record) + "\n")
+                kind = event.kind().as_u16()
+                self.kind_counts[kind] = self.kind_counts.get(kind, 0) + 1
+                new_count += 1
+        return new_count
+
+    async def _backfill_relay(self, relay_url: str, start_until: int):
+        """Page backwards through one relay until it runs dry or passes `since`."""
+        cursor = self.checkpoint.cursor(relay_url, start_until)
+        if cursor["done"]:
+            print(f"[{relay_url}] already complete, skipping")
+            return
+
+        since = self.checkpoint.since
+        kinds = [Kind(k) for k in self.checkpoint.kinds]
+        # A relay that failed last time is retried; the error is cleared once a page arrives
+        failures = 0
+
+        while not cursor["done"]:
+            until = cursor["until"]
+            page_filter = (
+                Filter()
+                .kinds(kinds)
+                .since(Timestamp.from_secs(since))
+                .until(Timestamp.from_secs(until))
+                .limit(self.page_size)
+            )
+
+            try:
+                events = await self.client.fetch_events_from(
+                    [relay_url], page_filter, timedelta(seconds=self.fetch_timeout)
+                )
+                page = events.to_vec()
+            except Exception as e:
+                failures += 1
+                if failures > self.max_retries:
+                    # Not done: rerunning the backfill resumes this relay from `until`
+                    cursor["failed"] = f"{type(e).__name__}: {e}"
+                    self.checkpoint.save()
+                    print(f"[{relay_url}] giving up after {failures} failed attempts: {e}")
+                    return
+                delay = self.page_delay * 5 * 2 ** (failures - 1)
+                print(
+                    f"[{relay_url}] error fetching page before {until}: {e}, "
+                    f"retrying in {delay:.1f}s ({failures}/{self.max_retries})"
+                )
+                await asyncio.sleep(delay)
+                continue
+            failures = 0
+            cursor.pop("failed", None)
+
+            if not page:
+                cursor["done"] = True
+                self.checkpoint.save()
+                print(f"[{relay_url}] reached the end of its history")
+                break
+
+            new_count = self._store(relay_url, page)
+            page_ids = {event.id().to_hex() for event in page}
+            boundary = set(cursor.get("boundary", []))
+            if page_ids <= boundary:
+                # Nothing more at the `until` second, step past it
+                cursor["until"] = until - 1
+                cursor["boundary"] = []
+            else:
+                # `until` is inclusive, so stay on the oldest second to pick up the
+                # events the page limit cut off there; the ids already fetched at
+                # that second tell when it is exhausted
+                oldest = min(event.created_at().as_secs() for event in page)
+                at_oldest = {
+                    event.id().to_hex()
+                    for event in page
+                    if event.created_at().as_secs() == oldest
+                }
+                if oldest == until:
+                    at_oldest |= boundary
+                cursor["until"] = oldest
+                cursor["boundary"] = sorted(at_oldest)
+            cursor["pages"] += 1
+            cursor["events"] += new_count
+            if cursor["until"] < since:
+                cursor["done"] = True
+            self.checkpoint.save()
+
+            print(
+                f"[{relay_url}] page {cursor['pages']}: {len(page)} events, {new_count} new, "
+                f"now before {time.strftime('%Y-%m-%d %H:%M', time.gmtime(cursor['until']))}"
+            )
+
+            # Be polite, each relay only ever sees one outstanding request from us
+            await asyncio.sleep(self.page_delay)
+
+    async def run(self):
+        """Backfill every relay in parallel."""
+        start_until = Timestamp.now().as_secs()
+        await asyncio.gather(
+            *(
+                self._backfill_relay(relay_url, start_until)
+                for relay_url in self.relay_urls
+            )
+        )
+
+
+async def main():
+    """Main function to run the historical backfill."""
+    parser = argparse.ArgumentParser(
+        description="Backfill historical 5109 jobs with their offers and results from all relays."
+    )
+    parser.add_argument(
+        "--days", type=float, default=7, help="How far back to walk (default: 7)"
+    )
+    parser.add_argument(
+        "--output", default="backfill_events.jsonl", help="JSONL dataset to append to"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default="backfill_checkpoint.json",
+        help="Checkpoint file used to resume an interrupted backfill",
+    )
+    parser.add_argument(
+        "--kinds",
+        default=",".join(str(k) for k in DEFAULT_KINDS),
+        help="Comma-separated event kinds to collect",
+    )
+    parser.add_argument(
+        "--page-size", type=int, default=500, help="Events requested per page"
+    )
+    parser.add_argument(
+        "--page-delay",
+        type=float,
+        default=1.0,
+        help="Seconds to wait between pages on the same relay",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=15.0, help="Seconds to wait for each page"
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore the checkpoint and walk the whole window again",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=5,
+        help="Retries of a failing page, with doubling delays, before giving up on a relay",
+    )
+    args = parser.parse_args()
+
+    kinds = [int(k) for k in args.kinds.split(",") if k.strip()]
+    relay_urls = [relay_url.strip() for relay_url in RELAY_URLS if relay_url.strip()]
+
+    print("Starting Nostr Historical Backfill")
+    print(f"Connecting to relays: {', '.join(relay_urls)}")
+
+    # Generate temporary keys for the backfill
+    keys = Keys.generate()
+    signer = NostrSigner.keys(keys)
+    client = Client(signer)
+
+    # Connect to relays
+    for relay_url in relay_urls:
+        await client.add_relay(relay_url)
+    await client.connect()
+
+    checkpoint = BackfillCheckpoint(args.checkpoint, args.days, kinds, args.restart)
+    backfill = HistoricalBackfill(
+        client,
+        relay_urls,
+        args.output,
+        checkpoint,
+        page_size=args.page_size,
+        page_delay=args.page_delay,
+        fetch_timeout=args.timeout,
+        max_retries=args.max_retries,
+    )
+
+    started = time.time()
+    try:
+        await backfill.run()
+    finally:
+        await client.disconnect()
+        print("Disconnected from relays")
+
+    print(f"Backfill finished in {time.time() - started:.1f}s")
+    print(f"Total unique events in {args.output}: {len(backfill.seen_events)}")
+    for kind, count in sorted(backfill.kind_counts.items()):
+        print(f"  kind {kind}: {count} new")
+    failed = {
+        relay_url: cursor["failed"]
+        for relay_url, cursor in checkpoint.relays.items()
+        if cursor.get("failed")
+    }
+    for relay_url, error in failed.items():
+        print(f"  {relay_url} failed ({error}), rerun the same command to retry it")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\nBackfill stopped, rerun the same command to resume")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Compare capture-to-published latency of the two screenshot paths:
+
+  file:      take a screenshot to a file (scrot, like an agent would), then
+             ensure_public_url() reads it back and uploads it
+  in-memory: capture_screen() grabs the display into a PNG buffer and
+             publish_screenshot_bytes() uploads the buffer directly
+
+Uploads go to a local Blossom stand-in so the numbers measure our overhead,
+not the network. Run it under a virtual display:
+
+  xvfb-run -s "-screen 0 1920x1080x24" python utility/benchmark_screen_capture.py
+"""
+
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Make the server importable when run from the mcp_server directory
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "unstuck_ai"))
+from blossom_stand_in import start_stand_in  # noqa: E402
+
+start_stand_in(3401)
+os.environ["SCREENSHOT_STORAGE"] = "blossom"
+os.environ["BLOSSOM_SERVERS"] = "http://127.0.0.1:3401"
+os.environ["ANSWER_CACHE_ENABLED"] = "false"
+
+import server  # noqa: E402
+
+ROUNDS = int(os.getenv("BENCHMARK_ROUNDS", "20"))
+
+
+def screenshot_to_file(path):
+    if shutil.which("scrot"):
+        subprocess.run(["scrot", "-o", path], check=True)
+    else:
+        from PIL import ImageGrab
+
+        ImageGrab.grab().save(path)
+
+
+def time_file_path(workdir):
+    timings = []
+    for i in range(ROUNDS):
+        path = os.path.join(workdir, f"screenshot_{i}.png")
+        started = time.perf_counter()
+        screenshot_to_file(path)
+        url = server.ensure_public_url(path)
+        elapsed = (time.perf_counter() - started) * 1000
+        if url == path:
+            print(f"  round {i + 1}: upload FAILED")
+            continue
+        timings.append(elapsed)
+    return timings
+
+
+def time_in_memory(region=None):
+    timings = []
+    for i in range(ROUNDS):
+        started = time.perf_counter()
+        data = server.capture_screen(region)
+        url = server.publish_screenshot_bytes(data)
+        elapsed = (time.perf_counter() - started) * 1000
+        if not url:
+            print(f"  round {i + 1}: upload FAILED")
+            continue
+        timings.append(elapsed)
+    return timings
+
+
+def summarize(name, timings):
+    if not timings:
+        print(f"{name:>28}: no successful rounds")
+        return
+    print(
+        f"{name:>28}: median {statistics.median(timings):.1f}ms, "
+        f"p90 {sorted(timings)[int(len(timings) * 0.9) - 1]:.1f}ms, "
+        f"min {min(timings):.1f}ms"
+    )
+
+
+def main():
+    if not os.getenv("DISPLAY"):
+        print("ERROR: no DISPLAY, run this under xvfb-run")
+        return
+
+    print(f"Capture-to-published latency over {ROUNDS} rounds")
+    with tempfile.TemporaryDirectory() as workdir:
+        summarize("file + ensure_public_url", time_file_path(workdir))
+    summarize("in-memory capture", time_in_memory())
+    summarize("in-memory capture, region", time_in_memory([0, 0, 800, 600]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+import argparse
+import base64
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from nostr_sdk import Event
+
+
+class BlossomStandIn(BaseHTTPRequestHandler):
+    """Minimal in-memory Blossom server: PUT /upload and GET /<sha256>[.ext]."""
+
+    blobs: Dict[str, bytes] = {}
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        print(f"[{self.server.server_port}] {format % args}")
+
+    def do_PUT(self):
+        if self.path != "/upload":
+            self.send_error(404)
+            return
+
+        data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        sha256 = hashlib.sha256(data).hexdigest()
+
+        error = self._check_auth(sha256)
+        if error:
+            self.send_response(401)
+            self.send_header("X-Reason", error)
+            self.end_headers()
+            return
+
+        # Simulate a slow or far away server
+        time.sleep(self.latency)
+        self.blobs[sha256] = data
+
+        port = self.server.server_port
+        self._send_json(
+            {
+                "url": f"http://127.0.0.1:{port}/{sha256}.png",
+                "sha256": sha256,
+                "size": len(data),
+                "type": self.headers.get("Content-Type", "application/octet-stream"),
+                "uploaded": int(time.time()),
+            }
+        )
+
+    def do_GET(self):
+        sha256 = self.path.lstrip("/").split(".")[0]
+        data = self.blobs.get(sha256)
+        if data is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _check_auth(self, sha256: str):
+        """Validate the kind 24242 authorization event, returns an error or None."""
+        header = self.headers.get("Authorization", "")
+        if not header.startswith("Nostr "):
+            return "missing Nostr authorization"
+        try:
+            event = Event.from_json(base64.b64decode(header[6:]).decode())
+        except Exception as e:
+            return f"invalid authorization event: {e}"
+
+        if not event.verify():
+            return "bad signature"
+        if event.kind().as_u16() != 24242:
+            return "wrong kind"
+
+        tags = {}
+        for tag in event.tags().to_vec():
+            tag_vec = tag.as_vec()
+            if len(tag_vec) >= 2:
+                tags.setdefault(tag_vec[0], []).append(tag_vec[1])
+
+        if "upload" not in tags.get("t", []):
+            return "not an upload authorization"
+        if sha256 not in tags.get("x", []):
+            return "blob hash not authorized"
+        if int(tags.get("expiration", ["0"])[0]) < time.time():
+            return "authorization expired"
+        return None
+
+    def _send_json(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_stand_in(port: int, latency: float = 0.0) -> ThreadingHTTPServer:
+    """Start one stand-in server in a background thread."""
+    handler = type(
+        f"BlossomStandIn{port}", (BlossomStandIn,), {"blobs": {}, "latency": latency}
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    """Run one or more local Blossom stand-ins."""
+    parser = argparse.ArgumentParser(description="Local Blossom stand-in servers")
+    parser.add_argument(
+        "--ports", default="3001,3002,3003", help="Comma-separated ports to listen on"
+    )
+    parser.add_argument(
+        "--latency",
+        default="0,0.2,1.0",
+        help="Comma-separated artificial upload latency per server, in seconds",
+    )
+    args = parser.parse_args()
+
+    ports = [int(p) for p in args.ports.split(",")]
+    latencies = [float(l) for l in args.latency.split(",")]
+    latencies += [0.0] * (len(ports) - len(latencies))
+
+    for port, latency in zip(ports, latencies):
+        start_stand_in(port, latency)
+        print(f"Blossom stand-in listening on http://127.0.0.1:{port} (latency {latency}s)")
+
+    servers = ",".join(f"http://127.0.0.1:{port}" for port in ports)
+    print(f"Use with: SCREENSHOT_STORAGE=blossom BLOSSOM_SERVERS={servers}")
+    print("Press Ctrl+C to stop")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\nBlossom stand-in stopped")
+
+
+if __name__ == "__main__":
+    main()
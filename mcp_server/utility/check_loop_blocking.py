@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Fail when help requests block the event loop.
+
+Runs requests through the loopback marketplace (see loopback_throughput.py)
+with the event-loop watchdog on and prints its report. Exits with status 1
+if any call blocked the loop longer than --max-block-ms, so a blocking call
+added to an async path shows up in CI with the stack that caused it.
+
+  python utility/check_loop_blocking.py --requests 200 --max-block-ms 100
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+
+# Make the server importable when run from the mcp_server directory
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "unstuck_ai"))
+
+os.environ["MARKETPLACE_BACKEND"] = "loopback"
+os.environ["ANSWER_CACHE_ENABLED"] = "false"
+os.environ["LOOP_WATCHDOG_ENABLED"] = "true"
+os.environ.setdefault(
+    "BID_LEDGER_PATH", os.path.join(tempfile.mkdtemp(), "bid_ledger.json")
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event-loop blocking check")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--max-block-ms", type=float, default=100)
+    args = parser.parse_args()
+    # Catch every block at or above the limit
+    os.environ["LOOP_LAG_THRESHOLD_MS"] = str(args.max_block_ms)
+
+    import server
+
+    logging.getLogger("unstuck-ai").setLevel(logging.WARNING)
+
+    async def run():
+        server.start_services()
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def one(i):
+            async with semaphore:
+                await server.request_visual_help(
+                    description=f"loop check {i}: click the OK button",
+                    screenshot_url="https://example.com/screenshot.png",
+                    max_price_sats=50,
+                    timeout=30,
+                    use_cache=False,
+                )
+
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        # Let the last heartbeat land
+        await asyncio.sleep(server.LOOP_WATCHDOG_INTERVAL_MS / 1000 * 2)
+        return server.loop_watchdog.report()
+
+    report = asyncio.run(run())
+    print(json.dumps(report, indent=2))
+    if report["blocks"]:
+        print(
+            f"FAIL: the event loop was blocked {report['blocks']} times "
+            f"for over {args.max_block_ms}ms (worst {report['lag_ms']['max']}ms)"
+        )
+        sys.exit(1)
+    print(f"OK: no blocks over {args.max_block_ms}ms (max lag {report['lag_ms']['max']}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Load test for one shared MCP server process running the SSE transport.
+
+Opens N concurrent MCP sessions (one per simulated agent), each calling tools
+in a loop, and reports per-call latency and errors at each concurrency level:
+
+  overhead   get_answer_cache_stats: MCP session and transport cost only
+  submit     submit_visual_help, then get_visual_help_job until the job
+             finishes; exercises job isolation, the shared relay pool and
+             the response router. Point the server at test relays first.
+
+Start the server, then run for example:
+
+  fastmcp run unstuck_ai/server.py:mcp --transport sse
+  python utility/load_test_sessions.py --levels 1,10,50,100 --calls 20
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run_agent(url, mode, calls, screenshot, job_timeout, latencies, errors):
+    """One simulated agent: its own MCP session, calling tools back to back"""
+    try:
+        async with sse_client(url) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                for _ in range(calls):
+                    started = time.perf_counter()
+                    try:
+                        if mode == "overhead":
+                            result = await session.call_tool("get_answer_cache_stats", {})
+                        else:
+                            result = await session.call_tool(
+                                "submit_visual_help",
+                                {
+                                    "description": "load test: click the OK button",
+                                    "screenshot_url": screenshot,
+                                    "timeout": job_timeout,
+                                },
+                            )
+                            if not result.isError:
+                                job_id = json.loads(result.content[0].text)["job_id"]
+                                while True:
+                                    result = await session.call_tool(
+                                        "get_visual_help_job",
+                                        {"job_id": job_id, "wait_seconds": 30},
+                                    )
+                                    if result.isError:
+                                        break
+                                    if json.loads(result.content[0].text)["finished_at"]:
+                                        break
+                        if result.isError:
+                            errors.append(result.content[0].text if result.content else "error")
+                        else:
+                            latencies.append((time.perf_counter() - started) * 1000)
+                    except Exception as e:
+                        errors.append(str(e))
+    except Exception as e:
+        errors.append(f"session failed: {e}")
+
+
+async def run_level(args, sessions):
+    latencies, errors = [], []
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            run_agent(
+                args.url,
+                args.mode,
+                args.calls,
+                args.screenshot,
+                args.job_timeout,
+                latencies,
+                errors,
+            )
+            for _ in range(sessions)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    return latencies, errors, elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Concurrent MCP session load test")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/sse", help="SSE endpoint")
+    parser.add_argument("--mode", choices=["overhead", "submit"], default="overhead")
+    parser.add_argument(
+        "--levels", default="1,5,10,25,50", help="Comma-separated concurrent session counts"
+    )
+    parser.add_argument("--calls", type=int, default=10, help="Calls per session per level")
+    parser.add_argument(
+        "--screenshot",
+        default="https://example.com/screenshot.png",
+        help="Screenshot URL for submit mode",
+    )
+    parser.add_argument(
+        "--job-timeout", type=int, default=30, help="Job timeout in seconds for submit mode"
+    )
+    parser.add_argument(
+        "--max-error-rate", type=float, default=0.01, help="Highest error rate that still counts as sustained"
+    )
+    parser.add_argument(
+        "--max-p95-ms", type=float, default=None, help="Highest p95 latency that still counts as sustained"
+    )
+    args = parser.parse_args()
+
+    print(f"Load testing {args.url} in {args.mode} mode, {args.calls} calls per session")
+    print(f"{'sessions':>8} {'calls':>7} {'errors':>7} {'calls/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+
+    sustained = None
+    for sessions in [int(level) for level in args.levels.split(",")]:
+        latencies, errors, elapsed = await run_level(args, sessions)
+        total = len(latencies) + len(errors)
+        error_rate = len(errors) / total if total else 1.0
+        if latencies:
+            p50 = statistics.median(latencies)
+            p95 = percentile(latencies, 0.95)
+            print(
+                f"{sessions:>8} {total:>7} {len(errors):>7} {len(latencies) / elapsed:>8.1f} "
+                f"{p50:>8.1f} {p95:>8.1f} {max(latencies):>8.1f}"
+            )
+        else:
+            p95 = float("inf")
+            print(f"{sessions:>8} {total:>7} {len(errors):>7}  no successful calls")
+        if errors:
+            print(f"         first error: {errors[0][:120]}")
+
+        if error_rate <= args.max_error_rate and (
+            args.max_p95_ms is None or p95 <= args.max_p95_ms
+        ):
+            sustained = (sessions, p95)
+
+    if sustained:
+        print(f"\nSustained {sustained[0]} concurrent sessions (p95 {sustained[1]:.1f}ms)")
+    else:
+        print("\nNo level met the error rate / latency limits")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Run help requests through the loopback marketplace and report throughput.
+
+Every request takes the full request_visual_help path: the 5109 is signed and
+published, the scripted worker offers, the invoice is paid through the loopback
+wallet, and the 6109 result goes through result handling and execute_actions.
+Nothing leaves the process, so this is also a quick end-to-end check.
+
+  python utility/loopback_throughput.py --requests 2000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Make the server importable when run from the mcp_server directory
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "unstuck_ai"))
+
+os.environ["MARKETPLACE_BACKEND"] = "loopback"
+os.environ["ANSWER_CACHE_ENABLED"] = "false"
+os.environ.setdefault(
+    "BID_LEDGER_PATH", os.path.join(tempfile.mkdtemp(), "bid_ledger.json")
+)
+
+import server  # noqa: E402
+
+
+async def run(requests, concurrency, timeout):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failures = [], []
+
+    async def one(i):
+        async with semaphore:
+            started = time.perf_counter()
+            result = await server.request_visual_help(
+                description=f"loopback request {i}: click the OK button",
+                screenshot_url="https://example.com/screenshot.png",
+                max_price_sats=50,
+                timeout=timeout,
+                use_cache=False,
+            )
+            if result.get("status") in ("failed", "timeout") or not result.get("offers"):
+                failures.append(result)
+            else:
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies, failures, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Loopback marketplace throughput")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--timeout", type=int, default=30)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    latencies, failures, elapsed = asyncio.run(
+        run(args.requests, args.concurrency, args.timeout)
+    )
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {elapsed:.1f}s")
+    print(f"  completed:  {len(latencies)}")
+    print(f"  failed:     {len(failures)}")
+    print(f"  throughput: {len(latencies) / elapsed * 60:.0f} requests/minute")
+    if latencies:
+        ordered = sorted(latencies)
+        print(f"  latency:    p50 {statistics.median(ordered):.1f}ms, "
+              f"p95 {ordered[int(len(ordered) * 0.95) - 1]:.1f}ms")
+    print(f"  marketplace: {server.loopback_market.stats()}")
+    if failures:
+        print(f"  first failure: {failures[0].get('result')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import os
+import random
+import statistics
+import sys
+import time
+from dotenv import load_dotenv
+from nostr_sdk import Keys
+
+# Make the server's helper modules importable when run from the mcp_server directory
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "unstuck_ai"))
+from blossom import upload_to_blossom  # noqa: E402
+from blossom_stand_in import start_stand_in  # noqa: E402
+
+# Load environment variables from .env file
+load_dotenv()
+
+LOCAL_IMAGE_PATH = "test_screenshots/test_captcha.png"
+ROUNDS = int(os.getenv("BENCHMARK_ROUNDS", "5"))
+
+
+def time_blossom(servers, data, keys):
+    """Milliseconds until the first Blossom server confirms the upload."""
+    timings = []
+    for i in range(ROUNDS):
+        # Change one byte each round so every upload is a new blob
+        blob = data + random.randbytes(8)
+        started = time.perf_counter()
+        urls = upload_to_blossom(blob, servers, keys)
+        elapsed = (time.perf_counter() - started) * 1000
+        if not urls:
+            print(f"  round {i + 1}: FAILED")
+            continue
+        timings.append(elapsed)
+        print(f"  round {i + 1}: {elapsed:.0f}ms, {len(urls)} mirror urls")
+    return timings
+
+
+def time_spaces():
+    """Milliseconds per upload to Digital Ocean Spaces, if credentials are set."""
+    if not os.getenv("DIGITAL_OCEAN_SPACES_ACCESS_KEY"):
+        print("  skipped, DIGITAL_OCEAN_SPACES_ACCESS_KEY not set")
+        return []
+
+    from test_do_spaces_upload import upload_to_space
+
+    timings = []
+    for i in range(ROUNDS):
+        remote_path = f"uploads/benchmark_{random.randint(1, 100000)}.png"
+        started = time.perf_counter()
+        if upload_to_space(LOCAL_IMAGE_PATH, remote_path):
+            timings.append((time.perf_counter() - started) * 1000)
+            print(f"  round {i + 1}: {timings[-1]:.0f}ms")
+    return timings
+
+
+def summarize(name, timings):
+    if not timings:
+        print(f"{name:>20}: no successful uploads")
+        return
+    print(
+        f"{name:>20}: median {statistics.median(timings):.0f}ms, "
+        f"min {min(timings):.0f}ms, max {max(timings):.0f}ms"
+    )
+
+
+def test_blossom_upload():
+    """Compare Blossom first-confirmation latency with Digital Ocean Spaces."""
+    if not os.path.exists(LOCAL_IMAGE_PATH):
+        print(f"ERROR: Test image not found at {LOCAL_IMAGE_PATH}")
+        print("Make sure you're running this script from the mcp_server directory")
+        return False
+
+    with open(LOCAL_IMAGE_PATH, "rb") as f:
+        data = f.read()
+    keys = Keys.generate()
+
+    # Three local stand-ins, one fast, one slow and one very slow
+    local_servers = []
+    for port, latency in [(3101, 0.0), (3102, 0.3), (3103, 1.5)]:
+        start_stand_in(port, latency)
+        local_servers.append(f"http://127.0.0.1:{port}")
+
+    print("Blossom (local stand-ins):")
+    results = {"blossom (local)": time_blossom(local_servers, data, keys)}
+
+    remote_servers = [
+        s.strip() for s in os.getenv("BLOSSOM_SERVERS", "").split(",") if s.strip()
+    ]
+    if remote_servers:
+        print(f"Blossom ({', '.join(remote_servers)}):")
+        results["blossom (remote)"] = time_blossom(remote_servers, data, keys)
+
+    print("Digital Ocean Spaces:")
+    results["spaces"] = time_spaces()
+
+    print("\nUpload latency until the screenshot URL is usable:")
+    for name, timings in results.items():
+        summarize(name, timings)
+
+    return bool(results["blossom (local)"])
+
+
+if __name__ == "__main__":
+    test_blossom_upload()